@@ -4,90 +4,448 @@ Main application with MA Cross, MA Pullback, Technical Analysis, and News tabs
 """
 import sys
 import os
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, Response, render_template, jsonify, request
 from datetime import datetime
 import threading
 import time
+import hmac
+import json
+import math
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from screener_v3 import V3ForexScreener
 from utils.news_fetcher import NewsFetcher
 from utils.risk_calculator import RiskCalculator
-from notifications import TelegramNotifier
-from config.api_config import TELEGRAM_ENABLED, MIN_CONFIDENCE_THRESHOLD
+from utils.scan_coordinator import ScanCoordinator
+from utils.results_snapshot import SnapshotStore, build_delta_body, strip_instrument
+from utils.change_log import ChangeLog
+from utils.event_stream import EventBroadcaster, format_sse
+from utils.shared_snapshot import SharedSnapshotReader, SharedSnapshotWriter, read_snapshot_file
+from utils.metrics import registry as metrics_registry, merge_exposition, timed
+from utils import memory  # Registers the RSS collector in every process (no pandas)
+from utils.profiler import MIN_SAMPLE_INTERVAL, SORT_KEYS, ProfilerBusy, profile_call
+from utils.alert_store import OVERALL, AlertStore
+from utils.event_calendar import event_calendar
+from utils.database import create_database
+from utils.signal_recorder import SignalRecorder
+from utils.win_rates import win_rates
+from utils.performance import read_performance
+from utils.export import EXPORTS_REJECTED, FORMATS, parse_export_filters, stream_export
+from utils.scan_archive import create_scan_archive
+from notifications import NotificationDispatcher, TelegramNotifier
+from config.instruments import get_display_name
+from config.settings import get_settings, print_config_summary
+
+settings = get_settings()
 
 app = Flask(__name__)
 
-# Global storage for latest results
+# Global storage for latest results (scanner working state)
 latest_results = {
     'screener_results': {},
     'news': {},
     'last_update': None,
-    'scanning': False,
     'scan_count': 0
 }
 
+# Immutable, pre-serialized snapshot served by the API
+# In 'web' mode it is read from the file published by the scanner process
+if settings.SCANNER_MODE == 'web':
+    results_store = SharedSnapshotReader(settings.SHARED_SNAPSHOT_PATH, settings.SHARED_SNAPSHOT_POLL_INTERVAL)
+else:
+    results_store = SnapshotStore()
+    if settings.SCANNER_MODE == 'scanner':
+        results_store.add_listener(SharedSnapshotWriter(settings.SHARED_SNAPSHOT_PATH).write)
+
+# Web workers ask the scanner process for a scan by creating this file
+SCAN_REQUEST_PATH = settings.SHARED_SNAPSHOT_PATH + '.scan-request'
+
+# The scanner process exports its metrics here for the web workers' /metrics
+SCANNER_METRICS_PATH = settings.SHARED_SNAPSHOT_PATH + '.metrics'
+
+# ...and its correlation matrices / currency strengths for /api/correlation and /api/strength
+SCANNER_CORRELATION_PATH = settings.SHARED_SNAPSHOT_PATH + '.correlation'
+SCANNER_STRENGTH_PATH = settings.SHARED_SNAPSHOT_PATH + '.strength'
+
+# Last completed scan, persisted for warm restarts (scanning processes only)
+snapshot_persister = SharedSnapshotWriter(settings.PERSISTED_SNAPSHOT_PATH) if settings.SCANNER_MODE != 'web' else None
+
+# Per-instrument change log behind /api/results?since=<seq>
+change_log = ChangeLog()
+
+# Server-Sent Events fan-out for /api/stream (each open stream holds a server
+# thread, so they are capped below the worker's thread count)
+event_broadcaster = EventBroadcaster(max_subscribers=settings.MAX_SSE_STREAMS)
+
 # Alert tracking - Send ONLY ONCE per signal direction
-# Format: {instrument: 'BUY' or 'SELL'} - tracks last alerted signal
-# Never re-alert same direction, only alert on direction change
-alert_history = {}
+# Last alerted direction per (instrument, strategy) in SQLite, shared across
+# processes and restarts. Never re-alert same direction, only alert on direction change
+alert_store = AlertStore(settings.ALERT_STORE_PATH) if settings.SCANNER_MODE != 'web' else None
+
+def create_screener():
+    """Import and build the screener (pandas and the strategies load only here)"""
+    from screener_v3 import V3ForexScreener
+    return V3ForexScreener()
+
+# Initialize components (web workers never scan, so they skip the screener)
+screener = create_screener() if settings.SCANNER_MODE != 'web' else None
+
+def create_signal_recorder():
+    """Signal history writer for the scanning process (None if disabled or unavailable)"""
+    if screener is None or not settings.SIGNAL_RECORDING:
+        return None
+    database = create_database()
+    if database is None:
+        return None
+    from utils.outcome_tracker import OutcomeTracker  # numpy; scanning processes only
+
+    # Historical win rates for the confidence scorer, then kept current by the tracker
+    try:
+        loaded = win_rates.load(database)
+        print(f"[OK] Loaded win rates from {loaded} resolved signals")
+    except Exception as e:
+        print(f"[ERROR] Could not load win rates: {str(e)}")
+
+    # Outcomes are resolved against the screener's candle store after every write
+    tracker = OutcomeTracker(database, screener.candle_store, win_rates=win_rates)
+    return SignalRecorder(database, max_queue=settings.SIGNAL_QUEUE_SIZE, outcome_tracker=tracker)
+
+# Every scan's signals are written to the signals table by a background thread
+signal_recorder = create_signal_recorder()
+
+# Full per-timeframe results of every scan as date-partitioned Parquet
+scan_archive = create_scan_archive() if screener is not None else None
 
-# Initialize components
-screener = V3ForexScreener()
 news_fetcher = NewsFetcher()
 risk_calculator = RiskCalculator()
-telegram = TelegramNotifier() if TELEGRAM_ENABLED else None
+telegram = TelegramNotifier() if settings.TELEGRAM_ENABLED else None
+
+# Alerts are delivered by a background thread so Telegram never blocks the scan loop
+telegram_dispatcher = NotificationDispatcher(
+    telegram,
+    max_queue=settings.NOTIFICATION_QUEUE_SIZE,
+    rate_per_chat=settings.TELEGRAM_RATE_PER_CHAT,
+    digest=settings.TELEGRAM_DIGEST,
+    max_retries=settings.NOTIFICATION_MAX_RETRIES
+) if telegram and settings.SCANNER_MODE != 'web' else None
+
+def perform_scan():
+    """
+    Run one screener scan and store the results
+
+    Only ever called through scan_coordinator, so scans never overlap.
+    """
+    snapshot = results_store.publish(scanning=True)
+    event_broadcaster.publish('scan_started', {'scan_id': snapshot.scan_id + 1})
+
+    try:
+        results = screener.scan_all_instruments(on_result=stream_instrument_update)
+    except Exception:
+        snapshot = results_store.publish(scanning=False)
+        event_broadcaster.publish('scan_failed', {'scan_id': snapshot.scan_id + 1, 'etag': snapshot.etag})
+        raise
+
+    latest_results['screener_results'] = results
+    latest_results['last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    latest_results['scan_count'] += 1
+    seq, instrument_seqs = change_log.record_scan(results)
+
+    results_store.publish(
+        screener_results=results,
+        seq=seq,
+        instrument_seqs=instrument_seqs,
+        changes=change_log.export(),
+        last_update=latest_results['last_update'],
+        scan_id=latest_results['scan_count'],
+        scanning=False,
+        stale=False
+    )
+    persist_snapshot()
+    if signal_recorder:
+        signal_recorder.record_scan(results, scan_id=latest_results['scan_count'])
+    if scan_archive:
+        scan_archive.submit(results, scan_id=latest_results['scan_count'])
+    snapshot = results_store.current
+    event_broadcaster.publish('scan_complete', {
+        'scan_id': snapshot.scan_id,
+        'seq': snapshot.seq,
+        'etag': snapshot.etag,
+        'last_update': snapshot.last_update
+    })
+    return results
+
+_persist_lock = threading.Lock()
+
+def persist_snapshot():
+    """Write the current snapshot to disk so a restart can serve it right away"""
+    try:
+        # Scanner and news threads both persist; don't let an older write land last
+        with _persist_lock:
+            snapshot_persister.write(results_store.current)
+    except Exception as e:
+        print(f"[ERROR] Failed to persist snapshot: {str(e)}")
+
+def restore_persisted_state():
+    """
+    Load the last persisted snapshot
+
+    The snapshot is published marked stale, so the API serves it
+    immediately while the first background scan refreshes it.
+
+    Returns:
+        bool: True if a snapshot was restored
+    """
+    snapshot = read_snapshot_file(settings.PERSISTED_SNAPSHOT_PATH)
+    if snapshot is None or not snapshot.screener_results:
+        print("[INFO] No persisted snapshot; serving empty results until the first scan")
+        return False
+
+    latest_results['screener_results'] = snapshot.screener_results
+    latest_results['news'] = snapshot.news
+    latest_results['last_update'] = snapshot.last_update
+    latest_results['scan_count'] = snapshot.scan_id
+    change_log.restore(snapshot.screener_results, snapshot.seq, snapshot.instrument_seqs, snapshot.changes)
+
+    results_store.publish(
+        screener_results=snapshot.screener_results,
+        news=snapshot.news,
+        seq=snapshot.seq,
+        instrument_seqs=snapshot.instrument_seqs,
+        changes=change_log.export(),
+        last_update=snapshot.last_update,
+        scan_id=snapshot.scan_id,
+        scanning=False,
+        stale=True
+    )
+    print(f"[OK] Restored snapshot from {snapshot.last_update} "
+          f"({len(snapshot.screener_results)} instruments, stale until the next scan)")
+    return True
+
+def stream_instrument_update(instrument, results):
+    """
+    Push a compact delta for one instrument as soon as its analysis finishes
+
+    Only the top-level fields that differ from the last published snapshot
+    are sent; the dashboard merges them into its copy.
+    """
+    if event_broadcaster.subscriber_count == 0:
+        return
+
+    try:
+        previous = results_store.current.screener_results.get(instrument, {})
+        current = strip_instrument(results)
+        changes = {k: v for k, v in current.items() if previous.get(k) != v}
+        event_broadcaster.publish('instrument', {
+            'instrument': instrument,
+            'scan_id': results_store.current.scan_id + 1,
+            'changes': changes
+        })
+    except Exception as e:
+        print(f"[ERROR] Stream update failed for {instrument}: {str(e)}")
+
+# Single-flight scan coordination (background scanner, /api/scan, initial scan)
+scan_coordinator = ScanCoordinator(perform_scan)
 
 def background_scanner():
-    """Run screener in background every 5 minutes"""
+    """Run screener in background every 15 minutes"""
     while True:
         try:
-            latest_results['scanning'] = True
             print(f"\n[{datetime.now().strftime('%H:%M:%S')}] Starting background scan...")
 
-            # Run screener
-            results = screener.scan_all_instruments()
-            latest_results['screener_results'] = results
-            latest_results['last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            latest_results['scan_count'] += 1
-
-            # Fetch news (every 3rd scan to reduce API calls)
-            if latest_results['scan_count'] % 3 == 0:
-                try:
-                    print(f"[{datetime.now().strftime('%H:%M:%S')}] Fetching news...")
-                    news = news_fetcher.fetch_all_news()
-                    latest_results['news'] = news
-                except Exception as e:
-                    print(f"[ERROR] News fetch failed: {str(e)}")
+            # Run screener (joins a manual scan if one is already in flight)
+            ticket = scan_coordinator.run_scan()
+            if ticket.error is not None:
+                raise ticket.error
+            results = ticket.result
 
-            # Send Telegram alerts for high-confidence signals
-            if telegram:
-                send_high_confidence_alerts(results)
+            # Queue Telegram alerts for high-confidence signals
+            if telegram_dispatcher:
+                with timed('alerting'):
+                    send_high_confidence_alerts(results)
 
-            latest_results['scanning'] = False
+            if settings.SCANNER_MODE == 'scanner':
+                export_scanner_metrics()
+                export_analytics()
 
             print(f"[{datetime.now().strftime('%H:%M:%S')}] Scan complete! Next scan in 15 minutes...")
 
-            # Wait 15 minutes
-            time.sleep(900)
+            # Wait 15 minutes (or until a web worker requests a scan)
+            wait_for_next_scan(900)
 
         except Exception as e:
             print(f"[ERROR] Background scan failed: {str(e)}")
             import traceback
             traceback.print_exc()
-            latest_results['scanning'] = False
             time.sleep(60)  # Wait 1 minute before retry
 
+def refresh_news():
+    """Fetch news and publish it (the results are left untouched)"""
+    print(f"[{datetime.now().strftime('%H:%M:%S')}] Fetching news...")
+    with timed('news'):
+        news = news_fetcher.fetch_all_news()
+    latest_results['news'] = news
+    snapshot = results_store.publish(news=news)
+    persist_snapshot()
+    event_broadcaster.publish('news', {'etag': snapshot.etag})
+
+def news_refresher():
+    """Refresh news on startup and then every NEWS_REFRESH_INTERVAL, beside the scan loop"""
+    while True:
+        try:
+            refresh_news()
+        except Exception as e:
+            print(f"[ERROR] News fetch failed: {str(e)}")
+        time.sleep(settings.NEWS_REFRESH_INTERVAL)
+
+def start_background_threads():
+    """Start the news refresher; the caller runs or starts background_scanner"""
+    news_thread = threading.Thread(target=news_refresher, daemon=True, name='news-refresher')
+    news_thread.start()
+
+def wait_for_next_scan(interval):
+    """
+    Sleep until the next scheduled scan
+
+    In 'scanner' mode this wakes up early when a web worker drops a scan
+    request file.
+    """
+    if settings.SCANNER_MODE != 'scanner':
+        time.sleep(interval)
+        return
+
+    deadline = time.monotonic() + interval
+    while time.monotonic() < deadline:
+        if os.path.exists(SCAN_REQUEST_PATH):
+            try:
+                os.remove(SCAN_REQUEST_PATH)
+            except FileNotFoundError:
+                pass
+            print(f"[{datetime.now().strftime('%H:%M:%S')}] Scan requested by web worker")
+            return
+        time.sleep(1)
+
+def export_scanner_metrics():
+    """Write this process's metrics where web workers can serve them ('scanner' mode)"""
+    try:
+        tmp_path = SCANNER_METRICS_PATH + '.tmp'
+        with open(tmp_path, 'w') as f:
+            f.write(metrics_registry.render())
+        os.replace(tmp_path, SCANNER_METRICS_PATH)
+    except Exception as e:
+        print(f"[ERROR] Failed to export metrics: {str(e)}")
+
+def export_analytics():
+    """Write correlation matrices and currency strengths where web workers can serve them ('scanner' mode)"""
+    for path, build in ((SCANNER_CORRELATION_PATH, screener.correlation.snapshot),
+                        (SCANNER_STRENGTH_PATH, screener.currency_strength.snapshot)):
+        try:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(build(), f)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            print(f"[ERROR] Failed to export {os.path.basename(path)}: {str(e)}")
+
+def read_scanner_export(path):
+    """JSON exported by the scanner process ('web' mode), or None"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def get_correlation(timeframe):
+    """Correlation matrix of one timeframe (from the scanner process's export in 'web' mode), or None"""
+    if screener is not None:
+        return screener.correlation.matrix(timeframe)
+    return (read_scanner_export(SCANNER_CORRELATION_PATH) or {}).get(timeframe)
+
+def get_currency_strength():
+    """Currency strength snapshot (from the scanner process's export in 'web' mode), or None"""
+    if screener is not None:
+        return screener.currency_strength.snapshot()
+    return read_scanner_export(SCANNER_STRENGTH_PATH)
+
+def request_external_scan():
+    """Ask the scanner process for a scan ('web' mode)"""
+    with open(SCAN_REQUEST_PATH, 'a'):
+        pass
+
+def watch_shared_snapshot():
+    """
+    Turn snapshot changes published by the scanner process into stream events
+
+    Runs in each web worker that has /api/stream clients ('web' mode). The
+    scanner process publishes once per scan, so instrument deltas arrive
+    when the scan completes rather than per instrument.
+    """
+    previous = results_store.current
+    while True:
+        time.sleep(settings.SHARED_SNAPSHOT_POLL_INTERVAL)
+        try:
+            snapshot = results_store.current
+            if snapshot is previous:
+                continue
+
+            if snapshot.scanning and not previous.scanning:
+                event_broadcaster.publish('scan_started', {'scan_id': snapshot.scan_id + 1})
+
+            if snapshot.scan_id != previous.scan_id:
+                for instrument, data in snapshot.screener_results.items():
+                    before = previous.screener_results.get(instrument, {})
+                    changes = {k: v for k, v in data.items() if before.get(k) != v}
+                    if changes:
+                        event_broadcaster.publish('instrument', {
+                            'instrument': instrument,
+                            'scan_id': snapshot.scan_id,
+                            'changes': changes
+                        })
+                event_broadcaster.publish('scan_complete', {
+                    'scan_id': snapshot.scan_id,
+                    'seq': snapshot.seq,
+                    'etag': snapshot.etag,
+                    'last_update': snapshot.last_update
+                })
+
+            if snapshot.news_body != previous.news_body:
+                event_broadcaster.publish('news', {'etag': snapshot.etag})
+
+            previous = snapshot
+        except Exception as e:
+            print(f"[ERROR] Snapshot watcher failed: {str(e)}")
+
+_snapshot_watcher_lock = threading.Lock()
+_snapshot_watcher = None
+
+def ensure_snapshot_watcher():
+    """Start watch_shared_snapshot once per web worker"""
+    global _snapshot_watcher
+    with _snapshot_watcher_lock:
+        if _snapshot_watcher is None:
+            _snapshot_watcher = threading.Thread(target=watch_shared_snapshot, daemon=True)
+            _snapshot_watcher.start()
+
 def send_high_confidence_alerts(results):
     """
     Send Telegram alerts for signals above confidence threshold
     Option C: Alert ONLY on BUY/SELL changes, ignore NEUTRAL
-    Send each signal direction ONLY ONCE (never repeat)
+    Send each signal direction ONLY ONCE (never repeat) per instrument and
+    the strategy that produced it (best_strategy)
+
+    Alerts are queued on telegram_dispatcher (one digest per scan when
+    TELEGRAM_DIGEST is set); a claim is reverted if delivery finally fails.
+    Alerts are held (not claimed) within EVENT_RISK_CONFIG['blackout_minutes']
+    of a high-impact event for either leg, so they go out on the first scan after.
+    When several alerts go out together and some are highly correlated, a
+    note with their combined exposure is added.
     """
+    pending = []
+    alerted = []
+
     for instrument, data in results.items():
         confidence = data.get('best_confidence', 0)
         signal = data.get('overall_signal', 'NEUTRAL')
+        strategy = data.get('best_strategy') or OVERALL
 
         # Normalize signal to BUY, SELL, or NEUTRAL
         if 'BUY' in signal:
@@ -98,24 +456,33 @@ def send_high_confidence_alerts(results):
             signal_direction = 'NEUTRAL'
 
         # Only process BUY/SELL signals above confidence threshold
-        if confidence >= MIN_CONFIDENCE_THRESHOLD and signal_direction in ['BUY', 'SELL']:
+        if confidence >= settings.MIN_CONFIDENCE_THRESHOLD and signal_direction in ['BUY', 'SELL']:
 
-            # Check if we've already alerted this direction
-            last_alerted_direction = alert_history.get(instrument)
+            # Check if this strategy already alerted this direction
+            last_alerted_direction = alert_store.get(instrument, strategy)
 
             if last_alerted_direction != signal_direction:
+                event = event_calendar.next_event(instrument, window_minutes=settings.EVENT_RISK_CONFIG['blackout_minutes'])
+                if event:
+                    print(f"[HOLD] {instrument}: {signal_direction} {confidence}% "
+                          f"({event['currency']} {event['title']} at {event['date']})")
+                    continue
+
+                # Claim the alert before sending so no other process sends it too
+                if not alert_store.compare_and_set(instrument, last_alerted_direction, signal_direction,
+                                                   strategy=strategy, confidence=confidence):
+                    print(f"[SKIP] {instrument}: {signal_direction} {confidence}% (alerted by another process)")
+                    continue
+
                 # Signal changed direction (or first time) - send alert!
                 message = format_alert_message(instrument, data)
-                success = telegram.send_message(message)
+                pending.append((message, alert_delivery_callback(instrument, strategy, signal_direction, last_alerted_direction)))
+                alerted.append({'instrument': instrument, 'direction': signal_direction})
 
-                if success:
-                    # Update alert history
-                    alert_history[instrument] = signal_direction
-
-                    if last_alerted_direction:
-                        print(f"[ALERT] {instrument}: {signal_direction} {confidence}% (changed from {last_alerted_direction})")
-                    else:
-                        print(f"[ALERT] {instrument}: {signal_direction} {confidence}% (NEW)")
+                if last_alerted_direction:
+                    print(f"[ALERT] {instrument}: {signal_direction} {confidence}% (changed from {last_alerted_direction})")
+                else:
+                    print(f"[ALERT] {instrument}: {signal_direction} {confidence}% (NEW)")
             else:
                 # Same direction as last alert - skip
                 print(f"[SKIP] {instrument}: {signal_direction} {confidence}% (already alerted)")
@@ -123,8 +490,45 @@ def send_high_confidence_alerts(results):
         # If signal is NEUTRAL or below threshold, just track it (no alert)
         elif signal_direction == 'NEUTRAL':
             # Don't alert on NEUTRAL, but log it
-            if instrument in alert_history:
-                print(f"[INFO] {instrument}: NEUTRAL (was {alert_history[instrument]})")
+            last_alerted_direction = alert_store.get(instrument, strategy)
+            if last_alerted_direction:
+                print(f"[INFO] {instrument}: NEUTRAL (was {last_alerted_direction})")
+
+    if len(alerted) > 1:
+        message = format_exposure_message(alerted)
+        if message:
+            pending.append((message, None))
+
+    if pending:
+        # Dropped alerts (queue full) are reported through their callbacks
+        telegram_dispatcher.submit_batch(pending)
+
+def format_exposure_message(positions):
+    """Telegram note on correlated alerts of one scan (None if none are correlated)"""
+    correlation = screener.correlation.matrix(settings.CORRELATION_CONFIG['exposure_timeframe'])
+    exposure = risk_calculator.aggregate_exposure(positions, correlation)
+    if not exposure['correlated_pairs']:
+        return None
+
+    print(f"[WARN] {exposure['positions']} alerts carry ${exposure['correlated_risk']:,.0f} correlated risk "
+          f"(${exposure['total_risk']:,.0f} total, {exposure['effective_bets']} effective bets)")
+    lines = [f"<b>⚠️ Correlated exposure ({exposure['timeframe']})</b>"]
+    for pair in exposure['correlated_pairs']:
+        a, b = pair['instruments']
+        lines.append(f"{a} / {b}: {pair['correlation']:+.2f}{' (hedged)' if pair['hedged'] else ''}")
+    lines.append(f"Combined risk ≈ ${exposure['correlated_risk']:,.0f} "
+                 f"({exposure['correlated_risk_percent']}%) across {exposure['positions']} signals, "
+                 f"≈ {exposure['effective_bets']} independent bets")
+    return "\n".join(lines)
+
+def alert_delivery_callback(instrument, strategy, direction, previous_direction):
+    """Callback for the dispatcher: give the alert claim back if delivery failed"""
+    def on_done(success):
+        if not success:
+            # Next scan sees the old direction again and retries
+            alert_store.compare_and_set(instrument, direction, previous_direction, strategy=strategy)
+            print(f"[WARN] {instrument}: {direction} alert not delivered - will retry next scan")
+    return on_done
 
 def format_alert_message(instrument, data):
     """Format Telegram alert message"""
@@ -179,41 +583,192 @@ def index():
     """Main dashboard page"""
     return render_template('dashboard.html')
 
+def snapshot_response(body, etag):
+    """
+    Serve a pre-serialized JSON body with an ETag
+
+    Returns 304 Not Modified when the client already has this version.
+    """
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype='application/json')
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
 @app.route('/api/results')
 def get_results():
-    """API endpoint to get latest screener results"""
-    # Remove DataFrames from results before serializing to JSON
-    clean_results = {
-        'screener_results': {},
-        'news': latest_results.get('news', {}),
-        'last_update': latest_results.get('last_update'),
-        'scanning': latest_results.get('scanning', False),
-        'scan_count': latest_results.get('scan_count', 0)
-    }
+    """
+    API endpoint to get latest screener results
+
+    With ?since=<seq>, returns only the instruments whose signal,
+    confidence or key fields changed after that sequence number.
+    """
+    snapshot = results_store.current
+    since = request.args.get('since', type=int)
 
-    # Copy screener results without data_dict (which contains DataFrames)
-    for instrument, data in latest_results.get('screener_results', {}).items():
-        clean_data = {k: v for k, v in data.items() if k != 'data_dict'}
-        clean_results['screener_results'][instrument] = clean_data
+    if since is None:
+        return snapshot_response(snapshot.body, snapshot.etag)
 
-    return jsonify(clean_results)
+    body = build_delta_body(snapshot, since)
+    return snapshot_response(body, f"{snapshot.etag}-since-{since}")
 
 @app.route('/api/instrument/<instrument>')
 def get_instrument_details(instrument):
     """Get detailed analysis for specific instrument"""
-    results = latest_results.get('screener_results', {}).get(instrument, {})
+    snapshot = results_store.current
+    body = snapshot.instrument_bodies.get(instrument)
 
-    if not results:
+    if body is None:
         return jsonify({'error': 'Instrument not found'}), 404
 
-    # Remove data_dict (DataFrames) before serializing
-    clean_results = {k: v for k, v in results.items() if k != 'data_dict'}
-    return jsonify(clean_results)
+    return snapshot_response(body, snapshot.instrument_etags[instrument])
 
 @app.route('/api/news')
 def get_news():
     """Get news categorized by pairs"""
-    return jsonify(latest_results.get('news', {}))
+    snapshot = results_store.current
+    return snapshot_response(snapshot.news_body, f"news-{snapshot.etag}")
+
+@app.route('/api/stream')
+def stream():
+    """
+    Server-Sent Events stream of per-instrument deltas, scan events and heartbeats
+
+    Beyond MAX_SSE_STREAMS open streams the worker answers 503 with
+    Retry-After; the dashboard polls /api/results until it gets a stream.
+    """
+    subscriber = event_broadcaster.subscribe()
+    if subscriber is None:
+        response = jsonify({'error': 'Too many open streams; poll /api/results instead'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    if settings.SCANNER_MODE == 'web':
+        ensure_snapshot_watcher()
+
+    snapshot = results_store.current
+    hello = format_sse('hello', {
+        'scan_id': snapshot.scan_id,
+        'seq': snapshot.seq,
+        'etag': snapshot.etag,
+        'scanning': snapshot.scanning,
+        'stale': snapshot.stale,
+        'last_update': snapshot.last_update
+    })
+
+    response = Response(event_broadcaster.stream(subscriber, [hello]), mimetype='text/event-stream')
+    # Also frees the slot if the client goes away before the stream starts
+    response.call_on_close(lambda: event_broadcaster.unsubscribe(subscriber))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # Don't let proxies buffer the stream
+    return response
+
+@app.route('/metrics')
+def metrics():
+    """Prometheus text metrics (scan stage timings and memory, API errors, rate-limit waits, RSS)"""
+    body = metrics_registry.render()
+
+    if settings.SCANNER_MODE == 'web':
+        # Scans run in the scanner process; merge in its last export
+        try:
+            with open(SCANNER_METRICS_PATH) as f:
+                body = merge_exposition(body, f.read())
+        except FileNotFoundError:
+            pass
+
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+def admin_authorized():
+    """Check the X-Admin-Token header (or ?token=) against ADMIN_TOKEN"""
+    token = request.headers.get('X-Admin-Token') or request.args.get('token', '')
+    return bool(settings.ADMIN_TOKEN) and hmac.compare_digest(token.encode('utf-8'), settings.ADMIN_TOKEN.encode('utf-8'))
+
+def resolve_instrument(instrument):
+    """Map a display name (EURUSD, XAUUSD) or raw symbol to (symbol, source)"""
+    for pair in settings.OANDA_PAIRS:
+        if instrument in (pair, get_display_name(pair)):
+            return pair, 'oanda'
+    for yf_symbol, standard_symbol, name in settings.YFINANCE_INSTRUMENTS:
+        if instrument in (yf_symbol, standard_symbol):
+            return yf_symbol, 'yfinance'
+    return None, None
+
+_profiling_screener = None
+
+def get_profiling_screener():
+    """
+    Dedicated screener used for profiling
+
+    Never the live screener: a profiled scan runs outside the scan
+    coordinator, and sharing the candle store, indicator cache, correlation
+    and strength state with the background scan would race with it and feed
+    the same bars into the rolling sums twice.
+    """
+    global _profiling_screener
+    if _profiling_screener is None:
+        _profiling_screener = create_screener()
+    return _profiling_screener
+
+@app.route('/api/admin/profile')
+def profile_scan():
+    """
+    Run one scan (or one instrument's analysis) under a profiler
+
+    Query params:
+        mode: 'cprofile' (default) or 'sample'
+        instrument: Profile analyze_instrument for this symbol only
+        sort: pstats sort key (default 'cumulative')
+        limit: Rows in the stats table (default 50)
+        interval: Seconds between stack samples in 'sample' mode
+        format: 'json' (default), 'stats' or 'collapsed' (flame graph input)
+
+    Runs on a separate screener instance (its own candle store and
+    analytics), so results are not published and the live scan is untouched.
+    """
+    if not admin_authorized():
+        # Don't advertise the endpoint when it's disabled or the token is wrong
+        return jsonify({'error': 'Not found'}), 404
+
+    mode = request.args.get('mode', 'cprofile')
+    sort = request.args.get('sort', 'cumulative')
+    limit = request.args.get('limit', 50, type=int)
+    interval = request.args.get('interval', 0.005, type=float)
+    output = request.args.get('format', 'json')
+    instrument = request.args.get('instrument')
+
+    if sort not in SORT_KEYS:
+        return jsonify({'error': f"sort must be one of {', '.join(SORT_KEYS)}"}), 400
+    if mode == 'sample' and not interval >= MIN_SAMPLE_INTERVAL:
+        return jsonify({'error': f"interval must be at least {MIN_SAMPLE_INTERVAL}s"}), 400
+
+    profiled_screener = get_profiling_screener()
+    if instrument:
+        symbol, source = resolve_instrument(instrument)
+        if symbol is None:
+            return jsonify({'error': 'Instrument not found'}), 404
+        target = lambda: profiled_screener.analyze_instrument(symbol, source=source)
+    else:
+        target = profiled_screener.scan_all_instruments
+
+    try:
+        profile = profile_call(target, mode=mode, sort=sort, limit=limit, interval=interval)
+    except ProfilerBusy as e:
+        return jsonify({'error': str(e)}), 409
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    print(f"[INFO] Profiled {instrument or 'full scan'} ({mode}): {profile['duration']}s")
+
+    if output == 'stats':
+        return Response(profile['stats'], mimetype='text/plain')
+    if output == 'collapsed':
+        return Response(profile['collapsed'], mimetype='text/plain')
+
+    profile['instrument'] = instrument
+    return jsonify(profile)
 
 @app.route('/api/risk_calculate', methods=['POST'])
 def calculate_risk():
@@ -239,62 +794,324 @@ def calculate_risk():
     except Exception as e:
         return jsonify({'error': str(e)}), 400
 
-@app.route('/api/scan')
-def trigger_scan():
-    """Manually trigger a scan"""
-    if not latest_results['scanning']:
-        threading.Thread(target=run_single_scan, daemon=True).start()
-        return jsonify({'status': 'Scan started'})
-    else:
-        return jsonify({'status': 'Scan already in progress'})
+MAX_BATCH_TRADES = 1000
+
+@app.route('/api/risk_calculate/batch', methods=['POST'])
+def calculate_risk_batch():
+    """
+    Position sizing for many trades at once
+
+    Body: {"trades": [{"instrument", "entry", "stop_loss", "take_profit"?}, ...]}
+    (or the list itself). Without trades, returns the current scan's signals
+    with their ATR-based SL/TP, sized when the scan finished.
+    """
+    data = request.get_json(silent=True)
+    trades = data.get('trades') if isinstance(data, dict) else data
+
+    if not trades:
+        setups = [
+            {'instrument': instrument, **results['trade_setup']}
+            for instrument, results in results_store.current.screener_results.items()
+            if results.get('trade_setup')
+        ]
+        return jsonify({
+            'source': 'signals',
+            'count': len(setups),
+            'total_risk': round(sum(setup['risk_amount'] for setup in setups), 2),
+            'trades': setups,
+        })
+
+    if not isinstance(trades, list):
+        return jsonify({'error': 'trades must be a list'}), 400
+    if len(trades) > MAX_BATCH_TRADES:
+        return jsonify({'error': f'At most {MAX_BATCH_TRADES} trades per request'}), 400
 
-def run_single_scan():
-    """Run a single scan cycle"""
-    latest_results['scanning'] = True
+    parsed = []
+    for i, trade in enumerate(trades):
+        try:
+            parsed.append({
+                'instrument': str(trade.get('instrument', 'EURUSD')),
+                'entry': float(trade['entry']),
+                'stop_loss': float(trade['stop_loss']),
+                'take_profit': float(trade.get('take_profit') or 0) or None,
+            })
+        except (AttributeError, KeyError, TypeError, ValueError) as e:
+            return jsonify({'error': f'trades[{i}]: {e!r}'}), 400
+        # "nan" / "inf" parse as floats but would come back as invalid JSON
+        prices = (parsed[-1]['entry'], parsed[-1]['stop_loss'], parsed[-1]['take_profit'] or 0)
+        if not all(math.isfinite(price) for price in prices):
+            return jsonify({'error': f'trades[{i}]: prices must be finite numbers'}), 400
+
+    recommendations = risk_calculator.calculate_position_sizes(parsed)
+    return jsonify({
+        'source': 'request',
+        'count': len(recommendations),
+        'total_risk': round(sum(r['risk_amount'] for r in recommendations), 2),
+        'trades': recommendations,
+    })
+
+_performance_database = None
+_performance_database_lock = threading.Lock()
+
+def get_performance_database():
+    """Database behind /api/performance and /api/export: the recorder's, or opened on first use by web workers"""
+    global _performance_database
+    if signal_recorder is not None:
+        return signal_recorder.database
+    if settings.SCANNER_MODE != 'web' or not settings.SIGNAL_RECORDING:
+        return None
+    with _performance_database_lock:
+        if _performance_database is None:
+            _performance_database = create_database()
+    return _performance_database
+
+@app.route('/api/performance')
+def get_performance():
+    """
+    Signal performance from the incrementally maintained aggregate tables
+
+    ?days=<n> (default 30, max 365) selects the window of signal days.
+    """
+    days = min(max(request.args.get('days', 30, type=int), 1), 365)
+
+    database = get_performance_database()
+    if database is None:
+        return jsonify({'error': 'Signal recording is disabled'}), 503
 
     try:
-        results = screener.scan_all_instruments()
-        latest_results['screener_results'] = results
-        latest_results['last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        return jsonify(read_performance(database, days))
     except Exception as e:
-        print(f"[ERROR] Scan failed: {str(e)}")
+        print(f"[ERROR] Performance query failed: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+def high_confidence_positions(results):
+    """BUY/SELL instruments at or above MIN_CONFIDENCE_THRESHOLD as aggregate_exposure() positions"""
+    positions = []
+    for instrument, data in results.items():
+        signal = data.get('overall_signal', 'NEUTRAL')
+        if data.get('best_confidence', 0) < settings.MIN_CONFIDENCE_THRESHOLD:
+            continue
+        if 'BUY' in signal:
+            positions.append({'instrument': instrument, 'direction': 'BUY'})
+        elif 'SELL' in signal:
+            positions.append({'instrument': instrument, 'direction': 'SELL'})
+    return positions
+
+@app.route('/api/correlation')
+def get_correlation_matrix():
+    """
+    Rolling return correlation between all instruments
+
+    ?timeframe=M5|M15|H1|H4|D (default CORRELATION_CONFIG['exposure_timeframe']).
+    Includes the aggregate exposure of the current high-confidence signals.
+    """
+    timeframe = request.args.get('timeframe', settings.CORRELATION_CONFIG['exposure_timeframe'])
+    if timeframe not in settings.TIMEFRAMES:
+        return jsonify({'error': f"timeframe must be one of {', '.join(settings.TIMEFRAMES)}"}), 400
+
+    correlation = get_correlation(timeframe)
+    if correlation is None:
+        return jsonify({'error': 'No correlation data yet'}), 503
+
+    positions = high_confidence_positions(results_store.current.screener_results)
+    correlation['exposure'] = risk_calculator.aggregate_exposure(positions, correlation) if positions else None
+    return jsonify(correlation)
+
+@app.route('/api/strength')
+def get_strength():
+    """
+    Currency strength per timeframe, solved from the forex pairs
+
+    Strength (%) is the mean of the return and MA-slope solutions; each
+    timeframe's currencies sum to zero.
+    """
+    strength = get_currency_strength()
+    if not strength or not strength['timeframes']:
+        return jsonify({'error': 'No currency strength yet'}), 503
+    return jsonify(strength)
+
+@app.route('/api/export/<table>')
+def export_table(table):
+    """
+    Stream the signals or trades table as CSV (default) or NDJSON
 
-    latest_results['scanning'] = False
+    ?format=csv|ndjson, ?instrument=EURUSD,GBPUSD, ?strategy=ma_cross,
+    ?min_confidence=/?max_confidence=, ?start=/?end=YYYY-MM-DD (inclusive).
+    The response is chunked and rows are read from a server-side cursor as
+    the client consumes them. Beyond EXPORT_MAX_STREAMS concurrent exports
+    the worker answers 503 with Retry-After, so downloads can't exhaust the
+    connection pool the signal writer needs.
+    """
+    if table not in ('signals', 'trades'):
+        return jsonify({'error': f"Unknown export '{table}'"}), 404
 
-def run_initial_scan():
-    """Run one scan before starting the server"""
-    print("\n[INFO] Running initial scan...")
-    latest_results['scanning'] = True
+    fmt = request.args.get('format', 'csv').lower()
+    if fmt not in FORMATS:
+        return jsonify({'error': f"format must be one of {', '.join(FORMATS)}"}), 400
 
     try:
-        results = screener.scan_all_instruments()
-        latest_results['screener_results'] = results
-        latest_results['last_update'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"[OK] Initial scan complete: {len(results)} instruments analyzed")
+        filters = parse_export_filters(request.args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
-        # Fetch news
-        try:
-            news = news_fetcher.fetch_all_news()
-            latest_results['news'] = news
-            print(f"[OK] News fetched")
-        except:
-            print(f"[WARN] News fetch failed (continuing without news)")
+    database = get_performance_database()
+    if database is None:
+        return jsonify({'error': 'Signal recording is disabled'}), 503
 
-    except Exception as e:
-        print(f"[ERROR] Initial scan failed: {str(e)}")
+    release = database.reserve_stream()
+    if release is None:
+        EXPORTS_REJECTED.inc()
+        response = jsonify({'error': 'Too many exports in progress; try again shortly'})
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+
+    filename = f"{table}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+    response = Response(stream_export(database, table, filters, fmt), mimetype=FORMATS[fmt])
+    # Runs once the response is closed, whether or not it was ever iterated
+    response.call_on_close(release)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+@app.route('/api/scan')
+def trigger_scan():
+    """
+    Manually trigger a scan
+
+    Joins the in-flight scan instead of starting a second one. Pass
+    ?wait=1 (optionally &timeout=<seconds>) to block until it completes.
+    """
+    wait = request.args.get('wait', '0').lower() in ('1', 'true', 'yes')
+    timeout = request.args.get('timeout', 300, type=float)
+
+    if settings.SCANNER_MODE == 'web':
+        return trigger_external_scan(wait, timeout)
+
+    ticket, started = scan_coordinator.request_scan()
+
+    if wait:
+        if not ticket.wait(timeout):
+            return jsonify({'status': 'Scan still running', 'scan_number': ticket.scan_number}), 202
+        return jsonify(scan_ticket_status(ticket))
+
+    if started:
+        return jsonify({'status': 'Scan started', 'scan_number': ticket.scan_number})
+    else:
+        return jsonify({'status': 'Scan already in progress', 'scan_number': ticket.scan_number})
+
+def scanner_stalled(snapshot):
+    """
+    'web' mode: the snapshot says a scan is running, but the scanner hasn't
+    published anything for SCAN_STALL_TIMEOUT (it most likely died mid-scan)
+    """
+    age = results_store.age()
+    return snapshot.scanning and age is not None and age > settings.SCAN_STALL_TIMEOUT
+
+def trigger_external_scan(wait, timeout):
+    """/api/scan for 'web' mode: signal the scanner process and optionally wait"""
+    snapshot = results_store.current
+    if snapshot.scanning and not scanner_stalled(snapshot):
+        status = 'Scan already in progress'
+    else:
+        if snapshot.scanning:
+            print(f"[WARN] Scanner hasn't published for over {settings.SCAN_STALL_TIMEOUT}s; ignoring its scanning flag")
+        request_external_scan()
+        status = 'Scan requested'
+
+    if not wait:
+        return jsonify({'status': status, 'scan_id': snapshot.scan_id + 1})
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        current = results_store.current
+        if current.scan_id > snapshot.scan_id and not current.scanning:
+            return jsonify({
+                'status': 'Scan complete',
+                'scan_id': current.scan_id,
+                'finished_at': current.last_update,
+                'instruments': len(current.screener_results)
+            })
+        time.sleep(settings.SHARED_SNAPSHOT_POLL_INTERVAL)
+
+    return jsonify({'status': 'Scan still running', 'scan_id': snapshot.scan_id + 1}), 202
+
+@app.route('/api/scan/status')
+def scan_status():
+    """Get the state of the current or most recent scan"""
+    if settings.SCANNER_MODE == 'web':
+        snapshot = results_store.current
+        stalled = scanner_stalled(snapshot)
+        return jsonify({
+            'scanning': snapshot.scanning and not stalled,
+            'stalled': stalled,
+            'stale': snapshot.stale or stalled,
+            'last_update': snapshot.last_update,
+            'scan_count': snapshot.scan_id,
+            'last_scan': None
+        })
+
+    ticket = scan_coordinator.last_ticket
+    status = {
+        'scanning': scan_coordinator.scanning,
+        'stale': results_store.current.stale,
+        'last_update': latest_results.get('last_update'),
+        'scan_count': latest_results.get('scan_count', 0),
+        'last_scan': scan_ticket_status(ticket) if ticket else None
+    }
+    return jsonify(status)
+
+def scan_ticket_status(ticket):
+    """Summarize a finished scan ticket for the API"""
+    return {
+        'status': 'Scan failed' if ticket.error is not None else 'Scan complete',
+        'scan_number': ticket.scan_number,
+        'started_at': ticket.started_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'finished_at': ticket.finished_at.strftime('%Y-%m-%d %H:%M:%S') if ticket.finished_at else None,
+        'instruments': len(ticket.result or {}),
+        'error': str(ticket.error) if ticket.error is not None else None
+    }
+
+def warm_start():
+    """
+    Get ready to serve without waiting for a scan
+
+    Restores the persisted snapshot (served as stale) and leaves the first
+    scan and news fetch to the background threads.
+
+    Returns:
+        bool: True if a snapshot was restored
+    """
+    print("\n[INFO] Restoring last snapshot...")
+    return restore_persisted_state()
+
+def run_scanner_process():
+    """Entry point of the dedicated scanner process ('scanner' mode)"""
+    print("=" * 80)
+    print("V3 FOREX SCREENER - SCANNER PROCESS")
+    print("=" * 80)
+    print_config_summary()
+    print(f"\n[INFO] Publishing snapshots to {settings.SHARED_SNAPSHOT_PATH}")
+
+    # Publish right away (restored or empty) so web workers have a file to read
+    if not warm_start():
+        results_store.publish(scanning=False)
 
-    latest_results['scanning'] = False
+    start_background_threads()
+    background_scanner()
 
 if __name__ == '__main__':
     print("=" * 80)
     print("V3 FOREX SCREENER WEB DASHBOARD")
     print("=" * 80)
+    print_config_summary()
     print("\nStarting web server...")
 
-    # Run initial scan
-    run_initial_scan()
+    # Serve the last snapshot right away; the first scan runs in the background
+    warm_start()
 
-    # Start background scanner
+    # Start background scanner and news refresher
+    start_background_threads()
     scanner_thread = threading.Thread(target=background_scanner, daemon=True)
     scanner_thread.start()
 
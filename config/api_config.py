@@ -24,6 +24,18 @@ REQUEST_DELAY = 0.1  # seconds between requests (to be safe)
 # Candle count for calculations (increased for 200 SMA)
 CANDLE_COUNT = 500  # number of historical candles to fetch
 
+# Cross pairs derived from the majors' candles instead of fetched from OANDA
+# 'all' (or 'true') for EURAUD, AUDJPY, GBPJPY and GBPAUD, or a comma-separated
+# subset, e.g. 'EURAUD,GBPAUD'; empty fetches every pair
+SYNTHETIC_CROSSES = os.getenv('SYNTHETIC_CROSSES', '')
+
+# Memory settings (for small instances, e.g. 512 MB)
+# LOW_MEMORY drops raw DataFrames after analysis and stores candles as float32
+LOW_MEMORY = os.getenv('LOW_MEMORY', '').lower() in ('1', 'true', 'yes')
+MEMORY_TRACING = os.getenv('MEMORY_TRACING', '').lower() in ('1', 'true', 'yes')  # tracemalloc per scan stage
+CANDLE_STORE_MAX_SERIES = int(os.getenv('CANDLE_STORE_MAX_SERIES', '64'))  # 11 instruments x 5 timeframes = 55
+CANDLE_STORE_MAX_MB = float(os.getenv('CANDLE_STORE_MAX_MB', '16' if LOW_MEMORY else '64'))
+
 # Alert thresholds
 STRONG_SIGNAL_THRESHOLD = 5  # Score >= 5 or <= -5
 TREND_CHANGE_THRESHOLD = 3   # Score crosses above 3 or below -3
@@ -40,14 +52,61 @@ MAX_TOTAL_LOSS = 10.0  # 10% max total loss (FTMO rule)
 TELEGRAM_BOT_TOKEN = os.getenv('TELEGRAM_BOT_TOKEN', '')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID', '')
 TELEGRAM_ENABLED = bool(TELEGRAM_BOT_TOKEN and TELEGRAM_CHAT_ID)
+TELEGRAM_DIGEST = os.getenv('TELEGRAM_DIGEST', '').lower() in ('1', 'true', 'yes')  # One message per scan
+TELEGRAM_RATE_PER_CHAT = 1.0   # messages per second per chat (Telegram limit)
+NOTIFICATION_QUEUE_SIZE = 100  # queued messages before new ones are dropped
+NOTIFICATION_MAX_RETRIES = 5   # retries (exponential backoff) for transient send failures
+
+# Deployment mode
+# 'embedded': scanner runs as a thread inside the web process (python app.py)
+# 'web':      web worker only; serves the snapshot published by the scanner process
+# 'scanner':  dedicated scanner process (scanner_worker.py), no HTTP serving
+SCANNER_MODE = os.getenv('SCANNER_MODE', 'embedded')
+
+# Local data directory (snapshots, SQLite files)
+DATA_DIR = os.getenv('DATA_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'data'))
+
+# Snapshot file shared between the scanner process and web workers
+# (memory-mapped; /dev/shm keeps it in shared memory when available)
+SHARED_SNAPSHOT_PATH = os.getenv(
+    'SHARED_SNAPSHOT_PATH',
+    '/dev/shm/forex_screener_snapshot.bin' if os.path.isdir('/dev/shm') else os.path.join(DATA_DIR, 'snapshot.bin')
+)
+SHARED_SNAPSHOT_POLL_INTERVAL = 1.0  # seconds between checks for a newer snapshot
+# A 'scanning' snapshot not replaced for this long means the scanner died mid-scan
+SCAN_STALL_TIMEOUT = int(os.getenv('SCAN_STALL_TIMEOUT', '600'))  # seconds
+
+# Open /api/stream connections per process; each holds a server thread, so keep
+# this below the worker's thread count (gunicorn.conf.py derives it from threads)
+MAX_SSE_STREAMS = int(os.getenv('MAX_SSE_STREAMS', '24'))
+
+# Last scan's snapshot, persisted for warm restarts
+PERSISTED_SNAPSHOT_PATH = os.getenv('PERSISTED_SNAPSHOT_PATH', os.path.join(DATA_DIR, 'last_snapshot.bin'))
+
+# Last alerted direction per instrument/strategy (SQLite, shared across processes)
+ALERT_STORE_PATH = os.getenv('ALERT_STORE_PATH', os.path.join(DATA_DIR, 'alerts.db'))
+
+# Signal history (signals / signal_outcomes tables in database_schema.sql)
+# DATABASE_URL=postgresql://... uses PostgreSQL; otherwise a local SQLite file
+DATABASE_URL = os.getenv('DATABASE_URL', '')
+SIGNAL_DB_PATH = os.getenv('SIGNAL_DB_PATH', os.path.join(DATA_DIR, 'signals.db'))
+DATABASE_POOL_SIZE = int(os.getenv('DATABASE_POOL_SIZE', '5'))
+# Concurrent /api/export downloads per process; each holds a pooled connection
+# until the client finishes, so at least one connection stays free for writes
+EXPORT_MAX_STREAMS = int(os.getenv('EXPORT_MAX_STREAMS', '2'))
+SIGNAL_RECORDING = os.getenv('SIGNAL_RECORDING', 'true').lower() in ('1', 'true', 'yes')
+SIGNAL_QUEUE_SIZE = int(os.getenv('SIGNAL_QUEUE_SIZE', '20'))  # Scans waiting to be written
+
+# Columnar archive of every scan's full results (needs pyarrow)
+SCAN_ARCHIVE = os.getenv('SCAN_ARCHIVE', 'true').lower() in ('1', 'true', 'yes')
+SCAN_ARCHIVE_DIR = os.getenv('SCAN_ARCHIVE_DIR', os.path.join(DATA_DIR, 'archive'))
+
+# Admin endpoints (/api/admin/*) are disabled unless a token is set
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN', '')
 
 # News API Configuration (for news impact feature)
 NEWS_API_KEY = os.getenv('NEWS_API_KEY', '')  # Get free key from newsapi.org
 FOREX_FACTORY_URL = 'https://nfs.faireconomy.media/ff_calendar_thisweek.json'
-
-print("[CONFIG V3] API configuration loaded")
-print(f"[CONFIG V3] OANDA URL: {OANDA_BASE_URL}")
-print(f"[CONFIG V3] Account Size: ${ACCOUNT_SIZE:,}")
-print(f"[CONFIG V3] Risk per Trade: {RISK_PER_TRADE}%")
-print(f"[CONFIG V3] Scan interval: {SCAN_INTERVAL}s ({SCAN_INTERVAL/60:.1f} minutes)")
-print(f"[CONFIG V3] Telegram: {'ENABLED' if TELEGRAM_ENABLED else 'DISABLED'}")
+NEWS_REFRESH_INTERVAL = 2700  # seconds between news refreshes (runs beside the scan loop)
+NEWS_CACHE_TTL = 900          # seconds a NewsAPI response is reused without a request
+CALENDAR_CACHE_TTL = 21600    # seconds the weekly Forex Factory calendar is reused (6 hours)
@@ -58,6 +58,40 @@ def get_display_name(symbol):
     # OANDA forex pair - format nicely
     return symbol.replace('_', '')
 
+# Contract specs per instrument (display name)
+# pip_size:       price change of one pip
+# contract_size:  units in one standard lot
+# quote_currency: currency the price (and P&L) is quoted in
+# pip_value:      account-currency value of one pip per standard lot used for
+#                 sizing (nominal: not converted from the quote currency)
+INSTRUMENT_SPECS = {
+    'EURUSD': {'pip_size': 0.0001, 'contract_size': 100000, 'quote_currency': 'USD', 'pip_value': 10},
+    'USDJPY': {'pip_size': 0.01, 'contract_size': 100000, 'quote_currency': 'JPY', 'pip_value': 10},
+    'GBPUSD': {'pip_size': 0.0001, 'contract_size': 100000, 'quote_currency': 'USD', 'pip_value': 10},
+    'AUDUSD': {'pip_size': 0.0001, 'contract_size': 100000, 'quote_currency': 'USD', 'pip_value': 10},
+    'EURAUD': {'pip_size': 0.0001, 'contract_size': 100000, 'quote_currency': 'AUD', 'pip_value': 10},
+    'AUDJPY': {'pip_size': 0.01, 'contract_size': 100000, 'quote_currency': 'JPY', 'pip_value': 10},
+    'GBPJPY': {'pip_size': 0.01, 'contract_size': 100000, 'quote_currency': 'JPY', 'pip_value': 10},
+    'GBPAUD': {'pip_size': 0.0001, 'contract_size': 100000, 'quote_currency': 'AUD', 'pip_value': 10},
+    'XAUUSD': {'pip_size': 0.1, 'contract_size': 100, 'quote_currency': 'USD', 'pip_value': 10},
+    'WTI': {'pip_size': 0.01, 'contract_size': 1000, 'quote_currency': 'USD', 'pip_value': 10},
+    'NAS100': {'pip_size': 0.1, 'contract_size': 10, 'quote_currency': 'USD', 'pip_value': 1},
+}
+
+def get_instrument_spec(instrument):
+    """
+    Spec for an instrument (display, OANDA or yfinance name)
+
+    Unknown symbols get standard forex specs (0.01 pips when quoted in JPY).
+    """
+    name = get_display_name(instrument).replace('/', '').upper()
+    spec = INSTRUMENT_SPECS.get(name)
+    if spec is None:
+        quote = name[3:6] if len(name) == 6 else 'USD'
+        spec = {'pip_size': 0.01 if quote == 'JPY' else 0.0001, 'contract_size': 100000,
+                'quote_currency': quote, 'pip_value': 10}
+    return spec
+
 # Total instrument count
 TOTAL_FOREX = len(OANDA_PAIRS)  # 8
 TOTAL_INSTRUMENTS_YF = len(YFINANCE_INSTRUMENTS)  # 3
@@ -66,7 +100,3 @@ TOTAL_TIMEFRAMES = len(TIMEFRAMES)  # 5
 
 # Expected API calls per scan (significantly reduced from V2's 114)
 API_CALLS_PER_SCAN = TOTAL_INSTRUMENTS * TOTAL_TIMEFRAMES  # 55 calls
-
-print(f"[CONFIG V3] Loaded {TOTAL_FOREX} forex pairs + {TOTAL_INSTRUMENTS_YF} instruments = {TOTAL_INSTRUMENTS} total")
-print(f"[CONFIG V3] {TOTAL_TIMEFRAMES} timeframes = {API_CALLS_PER_SCAN} API calls per scan")
-print(f"[CONFIG V3] Reduction: 114 → {API_CALLS_PER_SCAN} calls (52% faster)")
@@ -0,0 +1,72 @@
+"""
+Settings for V3
+Single cached, read-only view of the configuration modules.
+
+The config modules only define constants (no output at import); the startup
+banner they used to print is now print_config_summary(), called once by the
+process entry points.
+"""
+from functools import lru_cache
+
+from config import api_config, instruments, strategies
+
+
+class Settings:
+    """
+    Read-only snapshot of every UPPER_CASE config value
+
+    Values are exposed as attributes (settings.SCAN_INTERVAL) and loaded once
+    per process; environment variables are read when config is first imported.
+    """
+
+    def __init__(self, *modules):
+        values = {}
+        for module in modules:
+            values.update({name: getattr(module, name) for name in dir(module) if name.isupper()})
+        object.__setattr__(self, '_values', values)
+
+    def __getattr__(self, name):
+        try:
+            return self._values[name]
+        except KeyError:
+            raise AttributeError(f"Unknown setting: {name}") from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Settings are read-only")
+
+    def get(self, name, default=None):
+        return self._values.get(name, default)
+
+    def as_dict(self):
+        return dict(self._values)
+
+
+@lru_cache(maxsize=None)
+def get_settings():
+    """The process-wide Settings (built on first call)"""
+    return Settings(api_config, instruments, strategies)
+
+
+def print_config_summary(settings=None):
+    """Print the configuration banner (once, from the process entry point)"""
+    s = settings or get_settings()
+
+    print("[CONFIG V3] API configuration loaded")
+    print(f"[CONFIG V3] OANDA URL: {s.OANDA_BASE_URL}")
+    print(f"[CONFIG V3] Account Size: ${s.ACCOUNT_SIZE:,}")
+    print(f"[CONFIG V3] Risk per Trade: {s.RISK_PER_TRADE}%")
+    print(f"[CONFIG V3] Scan interval: {s.SCAN_INTERVAL}s ({s.SCAN_INTERVAL/60:.1f} minutes)")
+    print(f"[CONFIG V3] Telegram: {'ENABLED' if s.TELEGRAM_ENABLED else 'DISABLED'}")
+
+    print(f"[CONFIG V3] Loaded {s.TOTAL_FOREX} forex pairs + {s.TOTAL_INSTRUMENTS_YF} instruments = {s.TOTAL_INSTRUMENTS} total")
+    print(f"[CONFIG V3] {s.TOTAL_TIMEFRAMES} timeframes = {s.API_CALLS_PER_SCAN} API calls per scan")
+    print(f"[CONFIG V3] Reduction: 114 → {s.API_CALLS_PER_SCAN} calls (52% faster)")
+    if s.SYNTHETIC_CROSSES:
+        print(f"[CONFIG V3] Synthetic crosses: {s.SYNTHETIC_CROSSES} (derived from the majors, not fetched)")
+
+    print("[CONFIG V3] Strategy parameters loaded")
+    print(f"[CONFIG V3] SMMA: {s.SMA_CONFIG['fast_sma']}/{s.SMA_CONFIG['medium_sma']}/{s.SMA_CONFIG['slow_sma']}")
+    print(f"[CONFIG V3] MA Cross: {s.MA_CROSS_CONFIG['fast_ma']}/{s.MA_CROSS_CONFIG['slow_ma']}")
+    print(f"[CONFIG V3] Supertrend: {'ENABLED' if s.SUPERTREND_CONFIG['enabled'] else 'DISABLED'}")
+    print(f"[CONFIG V3] Min Confidence: {s.MIN_CONFIDENCE_THRESHOLD}%")
+    print(f"[CONFIG V3] Mode: {s.SCANNER_MODE}{' (low memory)' if s.LOW_MEMORY else ''}")
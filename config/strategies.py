@@ -53,11 +53,47 @@ CONFIDENCE_WEIGHTS = {
     'historical_win_rate': 15,    # 15 points for strategy win rate
 }
 
+# High-impact economic events (NFP, CPI, rate decisions) near a signal
+EVENT_RISK_CONFIG = {
+    'penalty_window_minutes': 120,  # Confidence penalty within ±2h of an event for either leg
+    'penalty': 15,                  # Points subtracted from confidence
+    'blackout_minutes': 30,         # Alerts held within ±30 min of an event
+}
+
+# Stop loss / take profit recorded with each signal
+TRADE_SETUP_CONFIG = {
+    'atr_multiplier': 1.5,  # Stop loss = entry -/+ 1.5 x H4 ATR
+    'reward_risk': 2.0,     # Take profit at 2R
+    'expiry_hours': 72,     # Signals that hit neither level by then are EXPIRED
+}
+
+# Historical win rates (signal_outcomes) behind the win-rate confidence factor
+WIN_RATE_CONFIG = {
+    'min_samples': 20,     # Resolved signals before a win rate replaces the default
+    'lookback_days': 90,   # Days of signals counted; older days drop out of the counts
+}
+
+# Rolling return correlation between instruments (utils/correlation.py)
+CORRELATION_CONFIG = {
+    'window': 120,               # Bars per timeframe in the rolling window
+    'min_periods': 30,           # Shared bars before a pair's correlation is reported
+    'high_correlation': 0.7,     # |correlation| at which two positions count as one bet
+    'exposure_timeframe': 'H1',  # Matrix used for aggregate exposure
+}
+
+# Per-bar values cached for every instrument/timeframe (utils/indicator_cache.py)
+INDICATOR_CACHE_CONFIG = {
+    'return_bars': 20,                   # Return over the last 20 bars
+    'ma_period': SMA_CONFIG['fast_sma'], # MA whose slope is measured
+    'slope_bars': 5,                     # MA change over the last 5 bars
+}
+
+# Currency strength from the forex pairs (utils/currency_strength.py)
+CURRENCY_STRENGTH_CONFIG = {
+    'timeframe': 'H4',       # Timeframe behind the confidence factor
+    'max_points': 5,         # +/- points when base vs quote strength agrees / disagrees
+    'full_points_at': 1.0,   # Strength differential (%) that earns the full points
+}
+
 # Minimum confidence threshold for alerts
 MIN_CONFIDENCE_THRESHOLD = 70  # Only alert on signals >= 70%
-
-print("[CONFIG V3] Strategy parameters loaded")
-print(f"[CONFIG V3] SMMA: {SMA_CONFIG['fast_sma']}/{SMA_CONFIG['medium_sma']}/{SMA_CONFIG['slow_sma']}")
-print(f"[CONFIG V3] MA Cross: {MA_CROSS_CONFIG['fast_ma']}/{MA_CROSS_CONFIG['slow_ma']}")
-print(f"[CONFIG V3] Supertrend: {'ENABLED' if SUPERTREND_CONFIG['enabled'] else 'DISABLED'}")
-print(f"[CONFIG V3] Min Confidence: {MIN_CONFIDENCE_THRESHOLD}%")
@@ -11,21 +11,24 @@ import os
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.api_config import OANDA_API_KEY, OANDA_ACCOUNT_ID, OANDA_BASE_URL, CANDLE_COUNT, REQUEST_DELAY
-from config.instruments import OANDA_TIMEFRAME_MAP
+from config.instruments import get_display_name
+from config.settings import get_settings
+from utils.metrics import API_ERRORS, API_REQUESTS, rate_limit_sleep, timed
+
+settings = get_settings()
 
 
 class OandaConnector:
     def __init__(self, api_key=None, account_id=None):
-        self.api_key = api_key or OANDA_API_KEY
-        self.account_id = account_id or OANDA_ACCOUNT_ID
-        self.base_url = OANDA_BASE_URL
+        self.api_key = api_key or settings.OANDA_API_KEY
+        self.account_id = account_id or settings.OANDA_ACCOUNT_ID
+        self.base_url = settings.OANDA_BASE_URL
         self.headers = {
             'Authorization': f'Bearer {self.api_key}',
             'Content-Type': 'application/json'
         }
 
-    def get_candles(self, instrument, timeframe, count=CANDLE_COUNT):
+    def get_candles(self, instrument, timeframe, count=settings.CANDLE_COUNT):
         """
         Fetch historical candles from OANDA
 
@@ -37,9 +40,11 @@ class OandaConnector:
         Returns:
             pd.DataFrame: DataFrame with OHLC data
         """
+        display_name = get_display_name(instrument)
+
         try:
             # Map timeframe
-            granularity = OANDA_TIMEFRAME_MAP.get(timeframe, timeframe)
+            granularity = settings.OANDA_TIMEFRAME_MAP.get(timeframe, timeframe)
 
             # Build request
             endpoint = f"{self.base_url}/v3/instruments/{instrument}/candles"
@@ -50,40 +55,46 @@ class OandaConnector:
             }
 
             # Make request
-            response = requests.get(endpoint, headers=self.headers, params=params)
+            with timed('http_fetch', display_name, timeframe):
+                response = requests.get(endpoint, headers=self.headers, params=params)
+            API_REQUESTS.inc(source='oanda', status=response.status_code)
 
             if response.status_code != 200:
+                API_ERRORS.inc(source='oanda', kind=f'http_{response.status_code}')
                 print(f"[ERROR] OANDA API error for {instrument} {timeframe}: {response.status_code}")
                 return None
 
-            data = response.json()
-
-            if 'candles' not in data or len(data['candles']) == 0:
-                print(f"[WARN] No candles returned for {instrument} {timeframe}")
-                return None
-
-            # Parse candles
-            candles = []
-            for candle in data['candles']:
-                if candle['complete']:
-                    candles.append({
-                        'time': pd.to_datetime(candle['time']),
-                        'open': float(candle['mid']['o']),
-                        'high': float(candle['mid']['h']),
-                        'low': float(candle['mid']['l']),
-                        'close': float(candle['mid']['c']),
-                        'volume': int(candle['volume'])
-                    })
-
-            df = pd.DataFrame(candles)
-            df.set_index('time', inplace=True)
+            with timed('decode', display_name, timeframe):
+                data = response.json()
+
+                if 'candles' not in data or len(data['candles']) == 0:
+                    API_ERRORS.inc(source='oanda', kind='empty')
+                    print(f"[WARN] No candles returned for {instrument} {timeframe}")
+                    return None
+
+                # Parse candles
+                candles = []
+                for candle in data['candles']:
+                    if candle['complete']:
+                        candles.append({
+                            'time': pd.to_datetime(candle['time']),
+                            'open': float(candle['mid']['o']),
+                            'high': float(candle['mid']['h']),
+                            'low': float(candle['mid']['l']),
+                            'close': float(candle['mid']['c']),
+                            'volume': int(candle['volume'])
+                        })
+
+                df = pd.DataFrame(candles)
+                df.set_index('time', inplace=True)
 
             # Add delay to respect rate limits
-            time.sleep(REQUEST_DELAY)
+            rate_limit_sleep(settings.REQUEST_DELAY, 'oanda')
 
             return df
 
         except Exception as e:
+            API_ERRORS.inc(source='oanda', kind='exception')
             print(f"[ERROR] Failed to fetch {instrument} {timeframe}: {str(e)}")
             return None
 
@@ -1,7 +1,6 @@
 """
 yfinance Connector for fetching index/commodity data
 """
-import yfinance as yf
 import pandas as pd
 from datetime import datetime, timedelta
 import time
@@ -11,15 +10,24 @@ import os
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from config.api_config import CANDLE_COUNT, REQUEST_DELAY
-from config.instruments import YFINANCE_TIMEFRAME_MAP
+from config.instruments import get_display_name
+from config.settings import get_settings
+from utils.metrics import API_ERRORS, API_REQUESTS, rate_limit_sleep, timed
+
+settings = get_settings()
+
+
+def _yfinance():
+    """Import yfinance on first use (its dependency tree dominates startup time)"""
+    import yfinance
+    return yfinance
 
 
 class YFinanceConnector:
     def __init__(self):
         pass
 
-    def get_candles(self, symbol, timeframe, count=CANDLE_COUNT):
+    def get_candles(self, symbol, timeframe, count=settings.CANDLE_COUNT):
         """
         Fetch historical candles from yfinance
 
@@ -31,42 +39,50 @@ class YFinanceConnector:
         Returns:
             pd.DataFrame: DataFrame with OHLC data
         """
+        display_name = get_display_name(symbol)
+
         try:
             # Map timeframe
-            interval = YFINANCE_TIMEFRAME_MAP.get(timeframe, '1h')
+            interval = settings.YFINANCE_TIMEFRAME_MAP.get(timeframe, '1h')
 
             # Calculate period based on interval and count
             period = self._calculate_period(interval, count)
 
-            # Fetch data
-            ticker = yf.Ticker(symbol)
-            df = ticker.history(period=period, interval=interval)
+            # Fetch data (yfinance downloads and decodes in one call)
+            with timed('http_fetch', display_name, timeframe):
+                ticker = _yfinance().Ticker(symbol)
+                df = ticker.history(period=period, interval=interval)
 
             if df is None or len(df) == 0:
+                API_REQUESTS.inc(source='yfinance', status='empty')
+                API_ERRORS.inc(source='yfinance', kind='empty')
                 print(f"[WARN] No data returned for {symbol} {timeframe}")
                 return None
+            API_REQUESTS.inc(source='yfinance', status='ok')
 
-            # Rename columns to match OANDA format
-            df = df.rename(columns={
-                'Open': 'open',
-                'High': 'high',
-                'Low': 'low',
-                'Close': 'close',
-                'Volume': 'volume'
-            })
+            with timed('decode', display_name, timeframe):
+                # Rename columns to match OANDA format
+                df = df.rename(columns={
+                    'Open': 'open',
+                    'High': 'high',
+                    'Low': 'low',
+                    'Close': 'close',
+                    'Volume': 'volume'
+                })
 
-            # Select only needed columns
-            df = df[['open', 'high', 'low', 'close', 'volume']]
+                # Select only needed columns
+                df = df[['open', 'high', 'low', 'close', 'volume']]
 
-            # Take last 'count' candles
-            df = df.tail(count)
+                # Take last 'count' candles
+                df = df.tail(count)
 
             # Add delay to respect rate limits
-            time.sleep(REQUEST_DELAY * 2)  # yfinance is more sensitive
+            rate_limit_sleep(settings.REQUEST_DELAY * 2, 'yfinance')  # yfinance is more sensitive
 
             return df
 
         except Exception as e:
+            API_ERRORS.inc(source='yfinance', kind='exception')
             print(f"[ERROR] Failed to fetch {symbol} {timeframe}: {str(e)}")
             return None
 
@@ -104,7 +120,7 @@ class YFinanceConnector:
         """Test yfinance connection"""
         try:
             # Try fetching a simple ticker
-            ticker = yf.Ticker('^GSPC')
+            ticker = _yfinance().Ticker('^GSPC')
             info = ticker.info
 
             if info and 'symbol' in info:
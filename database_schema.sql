@@ -29,6 +29,7 @@ CREATE TABLE IF NOT EXISTS signals (
 
     -- Overall score
     overall_score INTEGER,
+    alignment_score INTEGER,  -- Timeframes (0-5) agreeing with the signal; win-rate bucket
 
     -- Technical analysis
     daily_pivot DECIMAL(10,5),
@@ -44,9 +45,20 @@ CREATE TABLE IF NOT EXISTS signals (
 
     -- Metadata
     scan_id INTEGER,
+    is_new BOOLEAN,  -- Direction differs from the previous recorded scan; only these get outcomes
     alerted BOOLEAN DEFAULT FALSE
 );
 
+-- Added after the first release; brings existing databases up to date
+ALTER TABLE signals ADD COLUMN IF NOT EXISTS alignment_score INTEGER;
+ALTER TABLE signals ADD COLUMN IF NOT EXISTS is_new BOOLEAN;
+CREATE INDEX IF NOT EXISTS idx_signals_series ON signals(instrument, strategy, scan_id);
+-- Rows recorded before is_new: new unless the previous scan had the same direction
+UPDATE signals SET is_new = NOT EXISTS (SELECT 1 FROM signals p
+    WHERE p.instrument = signals.instrument AND p.strategy = signals.strategy
+    AND p.signal_type = signals.signal_type AND p.scan_id = signals.scan_id - 1)
+WHERE is_new IS NULL;
+
 -- Signal outcomes table - tracks what happened to signals
 CREATE TABLE IF NOT EXISTS signal_outcomes (
     id SERIAL PRIMARY KEY,
@@ -73,7 +85,8 @@ CREATE TABLE IF NOT EXISTS daily_performance (
     max_drawdown DECIMAL(10,2),
     best_trade DECIMAL(10,2),
     worst_trade DECIMAL(10,2),
-    average_confidence DECIMAL(5,2)
+    average_confidence DECIMAL(5,2),
+    confidence_sum DECIMAL(14,2) DEFAULT 0  -- Running sum behind average_confidence
 );
 
 -- Strategy performance table - performance by strategy
@@ -88,8 +101,10 @@ CREATE TABLE IF NOT EXISTS strategy_performance (
     losses INTEGER DEFAULT 0,
     win_rate DECIMAL(5,2),
     average_pips DECIMAL(10,2),
+    total_pips DECIMAL(12,2) DEFAULT 0,      -- Running sum behind average_pips
     total_profit DECIMAL(10,2),
     average_confidence DECIMAL(5,2),
+    confidence_sum DECIMAL(14,2) DEFAULT 0,  -- Running sum behind average_confidence
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
@@ -105,11 +120,24 @@ CREATE TABLE IF NOT EXISTS instrument_performance (
     losses INTEGER DEFAULT 0,
     win_rate DECIMAL(5,2),
     average_pips DECIMAL(10,2),
+    total_pips DECIMAL(12,2) DEFAULT 0,
     total_profit DECIMAL(10,2),
     best_strategy VARCHAR(50),
+    average_confidence DECIMAL(5,2),
+    confidence_sum DECIMAL(14,2) DEFAULT 0,
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Performance tables are maintained incrementally: each batch of outcomes is
+-- upserted as deltas keyed by day (strategy/instrument rows use period 'daily').
+-- Rebuild from scratch with: python utils/performance.py --rebuild
+ALTER TABLE daily_performance ADD COLUMN IF NOT EXISTS confidence_sum DECIMAL(14,2) DEFAULT 0;
+ALTER TABLE strategy_performance ADD COLUMN IF NOT EXISTS total_pips DECIMAL(12,2) DEFAULT 0;
+ALTER TABLE strategy_performance ADD COLUMN IF NOT EXISTS confidence_sum DECIMAL(14,2) DEFAULT 0;
+ALTER TABLE instrument_performance ADD COLUMN IF NOT EXISTS total_pips DECIMAL(12,2) DEFAULT 0;
+ALTER TABLE instrument_performance ADD COLUMN IF NOT EXISTS average_confidence DECIMAL(5,2);
+ALTER TABLE instrument_performance ADD COLUMN IF NOT EXISTS confidence_sum DECIMAL(14,2) DEFAULT 0;
+
 -- Trades table - actual trades taken
 CREATE TABLE IF NOT EXISTS trades (
     id SERIAL PRIMARY KEY,
@@ -153,6 +181,17 @@ CREATE TABLE IF NOT EXISTS account_snapshots (
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Alert state - last alerted direction per instrument/strategy (never re-alert same direction)
+-- Updated with compare-and-set: UPDATE ... WHERE direction IS NOT DISTINCT FROM <expected>
+CREATE TABLE IF NOT EXISTS alert_state (
+    instrument VARCHAR(20) NOT NULL,
+    strategy VARCHAR(50) NOT NULL,  -- 'overall' for the best-strategy signal
+    direction VARCHAR(10),          -- BUY/SELL
+    confidence DECIMAL(5,2),
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (instrument, strategy)
+);
+
 -- Create indexes for performance
 CREATE INDEX IF NOT EXISTS idx_signals_instrument ON signals(instrument);
 CREATE INDEX IF NOT EXISTS idx_signals_timestamp ON signals(timestamp);
@@ -161,9 +200,17 @@ CREATE INDEX IF NOT EXISTS idx_outcomes_signal_id ON signal_outcomes(signal_id);
 CREATE INDEX IF NOT EXISTS idx_trades_instrument ON trades(instrument);
 CREATE INDEX IF NOT EXISTS idx_trades_opened_at ON trades(opened_at);
 
+-- Upsert targets for the incremental performance tables
+CREATE UNIQUE INDEX IF NOT EXISTS idx_strategy_performance_key
+    ON strategy_performance(strategy, period, start_date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_instrument_performance_key
+    ON instrument_performance(instrument, period, start_date);
+
 -- Create views for easy querying
 
 -- View: High confidence signals
+-- (dropped first: s.* changes when columns are added to signals)
+DROP VIEW IF EXISTS high_confidence_signals;
 CREATE OR REPLACE VIEW high_confidence_signals AS
 SELECT
     s.*,
@@ -174,19 +221,19 @@ WHERE s.confidence >= 70
 ORDER BY s.timestamp DESC;
 
 -- View: Recent performance (last 30 days)
+-- Sums the incrementally maintained daily rows instead of re-aggregating signals
+DROP VIEW IF EXISTS recent_performance;
 CREATE OR REPLACE VIEW recent_performance AS
 SELECT
     strategy,
-    COUNT(*) as total_signals,
-    SUM(CASE WHEN o.outcome = 'WIN' THEN 1 ELSE 0 END) as wins,
-    SUM(CASE WHEN o.outcome = 'LOSS' THEN 1 ELSE 0 END) as losses,
-    ROUND(AVG(CASE WHEN o.outcome IN ('WIN', 'LOSS') THEN
-        CASE WHEN o.outcome = 'WIN' THEN 1.0 ELSE 0.0 END
-    END) * 100, 2) as win_rate,
-    ROUND(AVG(s.confidence), 2) as avg_confidence
-FROM signals s
-LEFT JOIN signal_outcomes o ON s.id = o.signal_id
-WHERE s.timestamp >= CURRENT_DATE - INTERVAL '30 days'
+    SUM(total_signals) as total_signals,
+    SUM(wins) as wins,
+    SUM(losses) as losses,
+    ROUND(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 2) as win_rate,
+    ROUND(SUM(confidence_sum) / NULLIF(SUM(total_signals), 0), 2) as avg_confidence
+FROM strategy_performance
+WHERE period = 'daily'
+    AND start_date >= CURRENT_DATE - INTERVAL '30 days'
 GROUP BY strategy;
 
 -- Sample query functions
@@ -199,19 +246,14 @@ DECLARE
 BEGIN
     SELECT
         COALESCE(
-            ROUND(
-                AVG(CASE WHEN o.outcome IN ('WIN', 'LOSS') THEN
-                    CASE WHEN o.outcome = 'WIN' THEN 1.0 ELSE 0.0 END
-                END) * 100,
-                2
-            ),
+            ROUND(SUM(wins) * 100.0 / NULLIF(SUM(wins) + SUM(losses), 0), 2),
             0
         )
     INTO win_rate
-    FROM signals s
-    LEFT JOIN signal_outcomes o ON s.id = o.signal_id
-    WHERE s.strategy = strategy_name
-        AND s.timestamp >= CURRENT_DATE - INTERVAL '90 days';
+    FROM strategy_performance
+    WHERE strategy = strategy_name
+        AND period = 'daily'
+        AND start_date >= CURRENT_DATE - INTERVAL '90 days';
 
     RETURN win_rate;
 END;
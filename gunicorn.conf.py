@@ -0,0 +1,93 @@
+"""
+Gunicorn configuration for production deployment
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Starts N web workers in 'web' mode plus one dedicated scanner process
+(scanner_worker.py). The scanner publishes each results snapshot to a
+memory-mapped file that the workers serve, so pandas-heavy analysis never
+runs inside a request-serving process and scans are never duplicated.
+"""
+import os
+import subprocess
+import sys
+import threading
+import time
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+
+# Threaded workers so long-lived /api/stream (SSE) connections don't pin a whole worker.
+# Every open stream still holds one thread, so each worker caps its streams at
+# MAX_SSE_STREAMS (default: threads minus STREAM_RESERVED_THREADS) and answers
+# further ones with 503 + Retry-After; those dashboards poll instead.
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', '32'))
+timeout = 120
+
+# Threads per worker always left for ordinary requests
+STREAM_RESERVED_THREADS = 8
+
+# Web workers only read the shared snapshot
+raw_env = [
+    'SCANNER_MODE=web',
+    f"MAX_SSE_STREAMS={os.getenv('MAX_SSE_STREAMS', max(threads - STREAM_RESERVED_THREADS, 1))}",
+]
+
+# Seconds between scanner liveness checks, and the longest restart backoff
+SCANNER_CHECK_INTERVAL = 5
+SCANNER_MAX_BACKOFF = 300
+
+_scanner_process = None
+_scanner_started_at = 0.0
+_stopping = threading.Event()
+
+
+def start_scanner(server):
+    """Spawn the scanner process"""
+    global _scanner_process, _scanner_started_at
+    env = dict(os.environ, SCANNER_MODE='scanner')
+    script = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scanner_worker.py')
+    _scanner_process = subprocess.Popen([sys.executable, script], env=env)
+    _scanner_started_at = time.monotonic()
+    server.log.info(f"Started scanner process (pid {_scanner_process.pid})")
+
+
+def supervise_scanner(server):
+    """
+    Restart the scanner process whenever it exits
+
+    A restarted scanner restores the persisted snapshot and publishes it, which
+    also clears a 'scanning' flag left behind by a scanner that died mid-scan.
+    Crash loops back off exponentially up to SCANNER_MAX_BACKOFF.
+    """
+    backoff = SCANNER_CHECK_INTERVAL
+    while not _stopping.wait(SCANNER_CHECK_INTERVAL):
+        code = _scanner_process.poll()
+        if code is None:
+            continue
+
+        uptime = time.monotonic() - _scanner_started_at
+        # A scanner that ran for a while gets restarted right away
+        backoff = SCANNER_CHECK_INTERVAL if uptime > SCANNER_MAX_BACKOFF else min(backoff * 2, SCANNER_MAX_BACKOFF)
+        server.log.error(f"Scanner process exited with code {code} after {uptime:.0f}s; restarting in {backoff}s")
+        if _stopping.wait(backoff):
+            return
+        start_scanner(server)
+
+
+def when_ready(server):
+    """Start the scanner process (and its supervisor) once the master is up"""
+    start_scanner(server)
+    threading.Thread(target=supervise_scanner, args=(server,), daemon=True, name='scanner-supervisor').start()
+
+
+def on_exit(server):
+    """Stop the scanner process with the master"""
+    _stopping.set()
+    if _scanner_process is not None and _scanner_process.poll() is None:
+        _scanner_process.terminate()
+        try:
+            _scanner_process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            _scanner_process.kill()
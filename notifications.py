@@ -4,11 +4,40 @@ Supports: Telegram, Discord, Email, Desktop notifications
 """
 import sys
 import os
+import heapq
+import itertools
+import queue
+import random
 import requests
 import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from utils.metrics import API_ERRORS, API_REQUESTS, registry
+
+NOTIFICATIONS = registry.counter(
+    'screener_notifications_total',
+    'Notification deliveries by channel and outcome',
+    ('channel', 'outcome')
+)
+NOTIFICATION_QUEUE_DEPTH = registry.gauge(
+    'screener_notification_queue_depth',
+    'Notifications waiting in the dispatcher queue (including scheduled retries)'
+)
+
+# Telegram rejects messages longer than this
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+class RetryableSendError(Exception):
+    """Delivery failed for a transient reason (rate limit, 5xx, network)"""
+
+    def __init__(self, message, retry_after=None):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class TelegramNotifier:
@@ -21,6 +50,23 @@ class TelegramNotifier:
 
     def send_message(self, message):
         """Send a message to Telegram"""
+        try:
+            return self.deliver(message)
+        except RetryableSendError as e:
+            print(f"[ERROR] Failed to send Telegram: {str(e)}")
+            return False
+
+    def deliver(self, message):
+        """
+        Send a message once, distinguishing transient failures
+
+        Returns:
+            bool: True if sent, False on a permanent failure (bad request, auth)
+
+        Raises:
+            RetryableSendError: On 429 (with Telegram's retry_after), 5xx or
+                network errors
+        """
         if not self.bot_token or not self.chat_id:
             print("[WARN] Telegram credentials not configured")
             return False
@@ -34,17 +80,30 @@ class TelegramNotifier:
             }
 
             response = requests.post(url, data=data, timeout=10)
-
-            if response.status_code == 200:
-                print("[OK] Telegram message sent!")
-                return True
-            else:
-                print(f"[ERROR] Telegram error: {response.status_code}")
-                return False
+            API_REQUESTS.inc(source='telegram', status=response.status_code)
 
         except Exception as e:
-            print(f"[ERROR] Failed to send Telegram: {str(e)}")
-            return False
+            API_ERRORS.inc(source='telegram', kind='exception')
+            raise RetryableSendError(str(e))
+
+        if response.status_code == 200:
+            print("[OK] Telegram message sent!")
+            return True
+
+        API_ERRORS.inc(source='telegram', kind=f'http_{response.status_code}')
+
+        if response.status_code == 429:
+            try:
+                retry_after = response.json().get('parameters', {}).get('retry_after')
+            except ValueError:
+                retry_after = None
+            raise RetryableSendError("Telegram rate limit (429)", retry_after)
+
+        if response.status_code >= 500:
+            raise RetryableSendError(f"Telegram error: {response.status_code}")
+
+        print(f"[ERROR] Telegram error: {response.status_code}")
+        return False
 
     def send_signal(self, symbol, score, trend, timeframes):
         """Send a formatted trading signal"""
@@ -231,6 +290,231 @@ class DesktopNotifier:
         return self.send_notification(title, message)
 
 
+class TokenBucket:
+    """Rate limiter: `rate` tokens per second, bursts of up to `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+
+    def wait_time(self):
+        """Seconds until a token is available (0 = send now)"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def consume(self):
+        self.tokens -= 1
+
+    def block(self, seconds):
+        """Stop sending for `seconds` (server-requested retry_after)"""
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+        self.tokens = 0
+
+
+class _Notification:
+    __slots__ = ('message', 'callbacks', 'attempts')
+
+    def __init__(self, message, callbacks):
+        self.message = message
+        self.callbacks = callbacks
+        self.attempts = 0
+
+
+class NotificationDispatcher:
+    """
+    Background Telegram delivery with a bounded queue
+
+    Messages are sent by one worker thread, so a slow or rate-limited
+    Telegram API never blocks the scanner. Sends respect a per-chat token
+    bucket; transient failures are retried with exponential backoff (or
+    after Telegram's retry_after on 429).
+    """
+
+    def __init__(self, notifier, max_queue=100, rate_per_chat=1.0, burst=3, digest=False,
+                 max_retries=5, backoff_base=2.0, backoff_max=300.0):
+        """
+        Args:
+            notifier: TelegramNotifier used for delivery
+            max_queue: Messages held before new ones are dropped
+            rate_per_chat: Messages per second per chat (Telegram allows ~1)
+            burst: Messages that may be sent back to back
+            digest: Merge each submit_batch() into one digest message
+            max_retries: Transient failures tolerated per message
+            backoff_base: Backoff is base ** attempt seconds (plus jitter)
+            backoff_max: Upper bound of a single backoff
+        """
+        self.notifier = notifier
+        self.digest = digest
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.rate_per_chat = rate_per_chat
+        self.burst = burst
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._retries = []  # heap of (due, tiebreak, notification)
+        self._tiebreak = itertools.count()
+        self._buckets = {}
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='notification-dispatcher')
+        self._thread.start()
+
+    def submit(self, message, on_done=None):
+        """
+        Queue one message
+
+        Args:
+            message: Message text
+            on_done: Optional callback(success) run once delivery finished or
+                was given up
+
+        Returns:
+            bool: False if the queue was full and the message was dropped
+        """
+        return self._enqueue(_Notification(message, [on_done] if on_done else []))
+
+    def submit_batch(self, items):
+        """
+        Queue the alerts of one scan
+
+        With digest mode on, they are merged into as few messages as fit
+        Telegram's length limit; otherwise each is queued on its own.
+
+        Args:
+            items: List of (message, on_done) tuples
+
+        Returns:
+            list: (message, on_done) tuples that were dropped (queue full)
+        """
+        if not self.digest or len(items) < 2:
+            return [(message, on_done) for message, on_done in items if not self.submit(message, on_done)]
+
+        dropped = []
+        for chunk in self._digest_chunks(items):
+            header = f"<b>📬 {len(chunk)} new signal{'s' if len(chunk) > 1 else ''}</b>\n"
+            digest = header + "\n➖➖➖➖➖\n".join(message.strip('\n') for message, _ in chunk)
+            callbacks = [on_done for _, on_done in chunk if on_done]
+            if not self._enqueue(_Notification(digest, callbacks)):
+                dropped.extend(chunk)
+        return dropped
+
+    def _digest_chunks(self, items):
+        chunks = [[]]
+        length = 0
+        limit = TELEGRAM_MAX_MESSAGE_LENGTH - 100  # Header and separators
+        for message, on_done in items:
+            if chunks[-1] and length + len(message) > limit:
+                chunks.append([])
+                length = 0
+            chunks[-1].append((message, on_done))
+            length += len(message) + 12
+        return chunks
+
+    def _enqueue(self, notification):
+        try:
+            self._queue.put_nowait(notification)
+        except queue.Full:
+            NOTIFICATIONS.inc(channel='telegram', outcome='dropped')
+            print("[ERROR] Notification queue full - dropping message")
+            self._finish(notification, False)
+            return False
+        self._update_depth()
+        return True
+
+    @property
+    def pending(self):
+        return self._queue.qsize() + len(self._retries)
+
+    def _update_depth(self):
+        NOTIFICATION_QUEUE_DEPTH.set(self.pending)
+
+    def stop(self, timeout=10):
+        """Deliver what is queued (up to timeout), then stop the worker"""
+        deadline = time.monotonic() + timeout
+        while self.pending and time.monotonic() < deadline:
+            time.sleep(0.1)
+        self._stopping.set()
+        self._thread.join(max(deadline - time.monotonic(), 0.1))
+
+    def _next(self):
+        """Next notification to send: a due retry first, then the queue"""
+        while not self._stopping.is_set():
+            now = time.monotonic()
+            if self._retries and self._retries[0][0] <= now:
+                return heapq.heappop(self._retries)[2]
+
+            timeout = min(self._retries[0][0] - now, 1.0) if self._retries else 1.0
+            try:
+                return self._queue.get(timeout=timeout)
+            except queue.Empty:
+                continue
+        return None
+
+    def _run(self):
+        while True:
+            notification = self._next()
+            if notification is None:
+                return
+
+            bucket = self._buckets.get(self.notifier.chat_id)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_per_chat, self.burst)
+                self._buckets[self.notifier.chat_id] = bucket
+
+            wait = bucket.wait_time()
+            while wait > 0 and not self._stopping.is_set():
+                time.sleep(min(wait, 1.0))
+                wait = bucket.wait_time()
+            bucket.consume()
+
+            try:
+                success = self.notifier.deliver(notification.message)
+            except RetryableSendError as e:
+                if e.retry_after:
+                    bucket.block(e.retry_after)
+                self._retry(notification, e)
+                continue
+            except Exception as e:
+                print(f"[ERROR] Notification delivery failed: {str(e)}")
+                success = False
+
+            NOTIFICATIONS.inc(channel='telegram', outcome='sent' if success else 'failed')
+            self._finish(notification, success)
+
+    def _retry(self, notification, error):
+        notification.attempts += 1
+        if notification.attempts > self.max_retries:
+            NOTIFICATIONS.inc(channel='telegram', outcome='failed')
+            print(f"[ERROR] Giving up on Telegram message after {self.max_retries} retries: {str(error)}")
+            self._finish(notification, False)
+            return
+
+        backoff = min(self.backoff_base ** notification.attempts, self.backoff_max)
+        delay = max(error.retry_after or 0, backoff * random.uniform(0.8, 1.2))
+        NOTIFICATIONS.inc(channel='telegram', outcome='retried')
+        print(f"[WARN] {str(error)} - retry {notification.attempts}/{self.max_retries} in {delay:.1f}s")
+        heapq.heappush(self._retries, (time.monotonic() + delay, next(self._tiebreak), notification))
+        self._update_depth()
+
+    def _finish(self, notification, success):
+        self._update_depth()
+        for callback in notification.callbacks:
+            try:
+                callback(success)
+            except Exception as e:
+                print(f"[ERROR] Notification callback failed: {str(e)}")
+
+
 class NotificationManager:
     """Manage all notification channels"""
 
@@ -254,15 +538,32 @@ class NotificationManager:
 
         print(f"[INFO] Notification channels: {[n[0] for n in self.notifiers]}")
 
+        # One thread per channel so a slow channel doesn't hold up the others
+        self.executor = ThreadPoolExecutor(max_workers=max(len(self.notifiers), 1),
+                                           thread_name_prefix='notify')
+
+    def _send_one(self, name, notifier, symbol, score, trend, timeframes):
+        if isinstance(notifier, DesktopNotifier):
+            return notifier.send_signal(symbol, score, trend)
+        return notifier.send_signal(symbol, score, trend, timeframes)
+
     def send_signal(self, symbol, score, trend, timeframes):
-        """Send signal to all configured channels"""
-        success_count = 0
+        """Send signal to all configured channels in parallel"""
+        futures = [
+            (name, self.executor.submit(self._send_one, name, notifier, symbol, score, trend, timeframes))
+            for name, notifier in self.notifiers
+        ]
 
-        for name, notifier in self.notifiers:
+        success_count = 0
+        for name, future in futures:
             try:
-                if notifier.send_signal(symbol, score, trend, timeframes):
+                if future.result():
                     success_count += 1
+                    NOTIFICATIONS.inc(channel=name.lower(), outcome='sent')
+                else:
+                    NOTIFICATIONS.inc(channel=name.lower(), outcome='failed')
             except Exception as e:
+                NOTIFICATIONS.inc(channel=name.lower(), outcome='failed')
                 print(f"[ERROR] {name} notification failed: {str(e)}")
 
         return success_count > 0
@@ -0,0 +1,24 @@
+"""
+Dedicated scanner process for the gunicorn deployment
+
+Runs the initial scan and the 15-minute background scanner, publishing each
+snapshot to SHARED_SNAPSHOT_PATH for the web workers to serve. Started by
+gunicorn.conf.py; can also be run by hand:
+
+    python scanner_worker.py
+"""
+import os
+import sys
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+# Must be set before app (and config) are imported
+os.environ['SCANNER_MODE'] = 'scanner'
+
+import app
+
+if __name__ == "__main__":
+    try:
+        app.run_scanner_process()
+    except KeyboardInterrupt:
+        print("\n[INFO] Scanner process stopped")
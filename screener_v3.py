@@ -6,10 +6,12 @@ import sys
 import os
 from datetime import datetime
 
+import numpy as np
+
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from config.instruments import OANDA_PAIRS, YFINANCE_INSTRUMENTS, TIMEFRAMES, get_display_name
-from config.api_config import CANDLE_COUNT
+from config.instruments import get_display_name
+from config.settings import get_settings
 from connectors.oanda_connector import OandaConnector
 from connectors.yfinance_connector import YFinanceConnector
 from strategies.sma_strategy import SMAStrategy
@@ -17,8 +19,17 @@ from strategies.ma_cross_strategy import MACrossStrategy
 from strategies.ma_pullback_strategy import MAPullbackStrategy
 from strategies.supertrend_mtf import SupertrendStrategy
 from utils.confidence_scorer import ConfidenceScorer
-from utils.risk_calculator import RiskCalculator
+from utils.risk_calculator import RiskCalculator, price_digits, trade_setup
 from utils.technical_analysis import TechnicalAnalyzer
+from utils.candle_store import CandleStore
+from utils.correlation import CorrelationEngine
+from utils.indicator_cache import IndicatorCache
+from utils.currency_strength import CurrencyStrength
+from utils.synthetic_rates import APPROXIMATED, configured_crosses, synthesize_from_store
+from utils.metrics import SCAN_DURATION, timed
+from utils import memory
+
+settings = get_settings()
 
 
 class V3ForexScreener:
@@ -33,15 +44,39 @@ class V3ForexScreener:
         self.ma_pullback_strategy = MAPullbackStrategy()
         self.supertrend_strategy = SupertrendStrategy()
 
+        # Latest candles per instrument/timeframe (float32 in low-memory mode)
+        self.low_memory = settings.LOW_MEMORY
+        self.candle_store = CandleStore(
+            max_series=settings.CANDLE_STORE_MAX_SERIES,
+            max_bytes=int(settings.CANDLE_STORE_MAX_MB * 1024 * 1024),
+            dtype=np.float32 if settings.LOW_MEMORY else np.float64
+        )
+
+        # Crosses derived from the majors' candles (majors are scanned first)
+        self.synthetic_crosses = configured_crosses(settings.SYNTHETIC_CROSSES)
+
+        # Rolling return correlations across instruments, fed from the candle store
+        self.correlation = CorrelationEngine()
+
+        # Currency strength, re-solved whenever a forex pair's candles update
+        self.indicator_cache = IndicatorCache(self.candle_store)
+        self.currency_strength = CurrencyStrength(self.indicator_cache)
+
         # Initialize utilities
-        self.confidence_scorer = ConfidenceScorer()
+        self.confidence_scorer = ConfidenceScorer(currency_strength=self.currency_strength)
         self.risk_calculator = RiskCalculator()
         self.technical_analyzer = TechnicalAnalyzer()
 
+        if settings.MEMORY_TRACING:
+            memory.start_tracing()
+
     def fetch_data(self, instrument, source='oanda'):
         """
         Fetch multi-timeframe data for an instrument
 
+        Crosses in SYNTHETIC_CROSSES are derived from the majors already in
+        the candle store; a timeframe that can't be derived is fetched.
+
         Args:
             instrument: Instrument symbol
             source: 'oanda' or 'yfinance'
@@ -51,12 +86,18 @@ class V3ForexScreener:
         """
         data_dict = {}
 
-        for tf in TIMEFRAMES:
+        for tf in settings.TIMEFRAMES:
             try:
+                if source == 'oanda' and instrument in self.synthetic_crosses:
+                    df = synthesize_from_store(instrument, tf, self.candle_store)
+                    if df is not None:
+                        data_dict[tf] = df
+                        continue
+
                 if source == 'oanda':
-                    df = self.oanda.get_candles(instrument, tf, count=CANDLE_COUNT)
+                    df = self.oanda.get_candles(instrument, tf, count=settings.CANDLE_COUNT)
                 else:
-                    df = self.yfinance.get_candles(instrument, tf, count=CANDLE_COUNT)
+                    df = self.yfinance.get_candles(instrument, tf, count=settings.CANDLE_COUNT)
 
                 data_dict[tf] = df
             except Exception as e:
@@ -80,47 +121,63 @@ class V3ForexScreener:
         print(f"[{datetime.now().strftime('%H:%M:%S')}] Analyzing {display_name}...")
 
         # Fetch data
-        data_dict = self.fetch_data(instrument, source)
-
-        # Run strategies
-        sma_results = self.sma_strategy.analyze_timeframes(data_dict)
-        ma_cross_results = self.ma_cross_strategy.analyze_timeframes(data_dict)
-        ma_pullback_results = self.ma_pullback_strategy.analyze_timeframes(data_dict)
-        supertrend_results = self.supertrend_strategy.analyze_timeframes(data_dict)
+        with timed('fetch', display_name, 'all'), memory.trace_stage('fetch'):
+            data_dict = self.fetch_data(instrument, source)
+
+        for tf, df in data_dict.items():
+            self.candle_store.put(display_name, tf, df)
+
+        if display_name in self.currency_strength.pair_names:
+            with timed('currency_strength', display_name, 'all'):
+                self.currency_strength.update()
+
+        # Run strategies (each times its timeframes itself)
+        with memory.trace_stage('sma_strategy'):
+            sma_results = self.sma_strategy.analyze_timeframes(data_dict, display_name)
+        with memory.trace_stage('ma_cross_strategy'):
+            ma_cross_results = self.ma_cross_strategy.analyze_timeframes(data_dict, display_name)
+        with memory.trace_stage('ma_pullback_strategy'):
+            ma_pullback_results = self.ma_pullback_strategy.analyze_timeframes(data_dict, display_name)
+        with memory.trace_stage('supertrend_strategy'):
+            supertrend_results = self.supertrend_strategy.analyze_timeframes(data_dict, display_name)
 
         # Calculate confidence scores for each strategy
-        sma_confidence = self.confidence_scorer.calculate_confidence(
-            sma_results,
-            ma_cross_results,
-            ma_pullback_results,
-            data_dict.get('H4'),
-            'sma_trend'
-        )
-
-        ma_cross_confidence = self.confidence_scorer.calculate_confidence(
-            ma_cross_results,
-            ma_cross_results,
-            ma_pullback_results,
-            data_dict.get('H4'),
-            'ma_cross'
-        )
-
-        ma_pullback_confidence = self.confidence_scorer.calculate_confidence(
-            ma_pullback_results,
-            ma_cross_results,
-            ma_pullback_results,
-            data_dict.get('H4'),
-            'ma_pullback'
-        )
+        with timed('confidence', display_name, 'all'), memory.trace_stage('confidence'):
+            sma_confidence = self.confidence_scorer.calculate_confidence(
+                sma_results,
+                ma_cross_results,
+                ma_pullback_results,
+                data_dict.get('H4'),
+                'sma_trend',
+                display_name
+            )
+
+            ma_cross_confidence = self.confidence_scorer.calculate_confidence(
+                ma_cross_results,
+                ma_cross_results,
+                ma_pullback_results,
+                data_dict.get('H4'),
+                'ma_cross',
+                display_name
+            )
+
+            ma_pullback_confidence = self.confidence_scorer.calculate_confidence(
+                ma_pullback_results,
+                ma_cross_results,
+                ma_pullback_results,
+                data_dict.get('H4'),
+                'ma_pullback',
+                display_name
+            )
 
         # Technical analysis
-        technical_analysis = self.technical_analyzer.analyze_instrument(data_dict, display_name)
+        with memory.trace_stage('technical_analysis'):
+            technical_analysis = self.technical_analyzer.analyze_instrument(data_dict, display_name)
 
         # Compile results
         results = {
             'instrument': display_name,
             'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'data_dict': data_dict,
 
             # Strategy results
             'sma': sma_results,
@@ -136,6 +193,13 @@ class V3ForexScreener:
             # Technical analysis
             'technical_analysis': technical_analysis,
 
+            # Timeframes whose candles were derived from the majors (None if all fetched)
+            'synthetic': None,
+
+            # ATR-based SL/TP and position size for the overall signal (set
+            # for the whole scan at once by attach_trade_setups)
+            'trade_setup': None,
+
             # Overall signal (based on highest confidence strategy)
             'best_strategy': None,
             'best_confidence': 0,
@@ -154,15 +218,33 @@ class V3ForexScreener:
         results['best_confidence'] = best[1]
         results['overall_signal'] = best[2]
 
+        synthetic = [tf for tf, df in data_dict.items() if df is not None and df.attrs.get('synthetic')]
+        if synthetic:
+            results['synthetic'] = {'timeframes': synthetic, 'approximated': list(APPROXIMATED)}
+
+        # Raw frames are only kept outside low-memory mode; the candle store
+        # holds a compact copy either way
+        if not self.low_memory:
+            results['data_dict'] = data_dict
+
         return results
 
-    def scan_all_instruments(self):
+    def scan_all_instruments(self, on_result=None):
         """
         Scan all 11 FTMO instruments
 
+        Args:
+            on_result: Optional callback(instrument, results) invoked as soon
+                as each instrument's analysis finishes
+
         Returns:
             dict: {instrument: results}
         """
+        with SCAN_DURATION.time():
+            return self._scan_all_instruments(on_result)
+
+    def _scan_all_instruments(self, on_result):
+        """Body of scan_all_instruments (timed as a whole)"""
         print("\n" + "=" * 80)
         print(f"V3 FOREX SCREENER - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
         print("=" * 80)
@@ -172,7 +254,7 @@ class V3ForexScreener:
         all_results = {}
 
         # Scan OANDA pairs
-        for pair in OANDA_PAIRS:
+        for pair in settings.OANDA_PAIRS:
             try:
                 results = self.analyze_instrument(pair, source='oanda')
                 display_name = results['instrument']
@@ -185,11 +267,14 @@ class V3ForexScreener:
 
                 print(f"  ✓ {display_name}: {signal} ({strategy}, {confidence}% confidence)")
 
+                if on_result:
+                    on_result(display_name, results)
+
             except Exception as e:
                 print(f"  ✗ {pair}: ERROR - {str(e)}")
 
         # Scan yfinance instruments
-        for item in YFINANCE_INSTRUMENTS:
+        for item in settings.YFINANCE_INSTRUMENTS:
             try:
                 # Unpack the instrument tuple
                 if len(item) == 3:
@@ -209,17 +294,93 @@ class V3ForexScreener:
 
                 print(f"  ✓ {standard_symbol}: {signal} ({strategy}, {confidence}% confidence)")
 
+                if on_result:
+                    on_result(standard_symbol, results)
+
             except Exception as e:
                 import traceback
                 print(f"  ✗ {standard_symbol if 'standard_symbol' in locals() else 'UNKNOWN'}: ERROR - {str(e)}")
                 traceback.print_exc()
 
+        try:
+            with timed('correlation'):
+                self.correlation.update(self.candle_store)
+        except Exception as e:
+            print(f"[ERROR] Correlation update failed: {str(e)}")
+
+        try:
+            with timed('trade_setups'):
+                self.attach_trade_setups(all_results)
+        except Exception as e:
+            print(f"[ERROR] Trade setups failed: {str(e)}")
+
         print("\n" + "=" * 80)
         print(f"Scan complete! Analyzed {len(all_results)} instruments")
+        self.report_memory()
         print("=" * 80 + "\n")
 
         return all_results
 
+    def attach_trade_setups(self, all_results):
+        """
+        Attach ATR-based SL/TP and position size to every directional result
+
+        All signals are sized in one calculate_position_sizes() call.
+
+        Args:
+            all_results: {instrument: analyze_instrument() results}
+
+        Returns:
+            int: Setups attached
+        """
+        trades = []
+        for instrument, results in all_results.items():
+            signal = results.get('overall_signal', 'NEUTRAL')
+            direction = 'BUY' if 'BUY' in signal else 'SELL' if 'SELL' in signal else None
+            technical = results.get('technical_analysis') or {}
+            entry, atr = technical.get('current_price'), technical.get('atr_h4')
+            if direction is None or entry is None:
+                continue
+
+            entry = round(float(entry), price_digits(instrument))
+            stop_loss, take_profit = trade_setup(direction, entry, atr, instrument)
+            if stop_loss is None:
+                continue
+            trades.append({
+                'instrument': instrument,
+                'direction': direction,
+                'atr': round(float(atr), 5),
+                'entry': entry,
+                'stop_loss': stop_loss,
+                'take_profit': take_profit,
+            })
+
+        sizes = self.risk_calculator.calculate_position_sizes(trades)
+        for trade, size in zip(trades, sizes):
+            all_results[trade['instrument']]['trade_setup'] = {
+                'direction': trade['direction'],
+                'atr': trade['atr'],
+                **size,
+            }
+        return len(trades)
+
+    def report_memory(self):
+        """Print and export memory usage after a scan"""
+        store = self.candle_store.stats()
+        memory.CANDLE_STORE_BYTES.set(store['bytes'])
+        memory.CANDLE_STORE_SERIES.set(store['series'])
+
+        parts = [f"candle store {store['series']} series / {memory.format_bytes(store['bytes'])} ({store['dtype']})"]
+        peak_rss = memory.peak_rss_bytes()
+        if peak_rss is not None:
+            parts.append(f"peak RSS {memory.format_bytes(peak_rss)}")
+        if memory.tracing():
+            parts.append(f"traced {memory.format_bytes(memory.traced_bytes())}")
+            for allocation in memory.top_allocations(3):
+                parts.append(f"{allocation['location']} {memory.format_bytes(allocation['size'])}")
+
+        print(f"Memory: {', '.join(parts)}")
+
 
 if __name__ == "__main__":
     print("V3 Forex Screener - Testing Mode")
@@ -0,0 +1,102 @@
+"""
+Startup benchmark for V3
+
+Imports wsgi.py in a fresh interpreter under `python -X importtime` and
+reports the total import time plus the slowest modules, so cold-start
+regressions are easy to spot.
+
+    python startup_benchmark.py                   # web worker (SCANNER_MODE=web)
+    python startup_benchmark.py --mode scanner    # scanner process
+    python startup_benchmark.py --runs 5 --top 20
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# "import time:       self [us] |  cumulative | imported package"
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def run_importtime(mode):
+    """
+    Import wsgi once under -X importtime
+
+    Returns:
+        tuple: (wall seconds, [(module, self_us, cumulative_us, depth)])
+    """
+    env = dict(os.environ, SCANNER_MODE=mode, PYTHONDONTWRITEBYTECODE='1')
+    command = [sys.executable, '-X', 'importtime', '-c', 'import wsgi']
+
+    start = time.perf_counter()
+    completed = subprocess.run(command, cwd=PROJECT_DIR, env=env, capture_output=True, text=True)
+    wall = time.perf_counter() - start
+
+    if completed.returncode != 0:
+        raise RuntimeError(f"Importing wsgi failed:\n{completed.stderr[-2000:]}")
+
+    modules = []
+    for line in completed.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            depth = (len(indent) - 1) // 2
+            modules.append((module, int(self_us), int(cumulative_us), depth))
+    return wall, modules
+
+
+def summarize(modules, top):
+    """Total import time, the heaviest direct dependencies and self-time modules"""
+    roots = [m for m in modules if m[3] == 0]
+    total_us = sum(m[2] for m in roots)
+    # wsgi -> app -> app's imports: depth 2 is where the interesting packages are
+    shallow = [m for m in modules if m[3] <= 2]
+    by_cumulative = sorted(shallow, key=lambda m: m[2], reverse=True)[:top]
+    by_self = sorted(modules, key=lambda m: m[1], reverse=True)[:top]
+    return total_us, by_cumulative, by_self
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report import-time cost of wsgi.py')
+    parser.add_argument('--mode', default='web', choices=['web', 'scanner', 'embedded'],
+                        help='SCANNER_MODE to import with (default: web)')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters to time (default: 3)')
+    parser.add_argument('--top', type=int, default=15, help='Modules to list (default: 15)')
+    args = parser.parse_args()
+
+    walls = []
+    totals = []
+    modules = []
+    for _ in range(args.runs):
+        wall, modules = run_importtime(args.mode)
+        walls.append(wall)
+        totals.append(summarize(modules, args.top)[0])
+
+    total_us, by_cumulative, by_self = summarize(modules, args.top)
+    heavy = {name for name in ('pandas', 'numpy', 'yfinance', 'requests', 'flask') if
+             any(m[0] == name for m in modules)}
+
+    print("=" * 80)
+    print(f"STARTUP BENCHMARK - import wsgi (SCANNER_MODE={args.mode}, {args.runs} runs)")
+    print("=" * 80)
+    print(f"Import time (median):  {statistics.median(totals) / 1000:8.1f} ms")
+    print(f"Process wall (median): {statistics.median(walls) * 1000:8.1f} ms  (includes interpreter start)")
+    print(f"Modules imported:      {len(modules)}")
+    print(f"Heavy packages loaded: {', '.join(sorted(heavy)) or 'none'}")
+
+    print(f"\nTop {len(by_cumulative)} imports by cumulative time (last run):")
+    for module, self_us, cumulative_us, _ in by_cumulative:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+
+    print(f"\nTop {len(by_self)} modules by self time (last run):")
+    for module, self_us, cumulative_us, _ in by_self:
+        print(f"  {self_us / 1000:8.1f} ms  {module}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,15 +8,18 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.strategies import MA_CROSS_CONFIG
+from config.settings import get_settings
+from utils.metrics import timed
+
+settings = get_settings()
 
 
 class MACrossStrategy:
     def __init__(self, fast_ma=None, slow_ma=None, confirm_ma=None):
-        self.fast_ma = fast_ma or MA_CROSS_CONFIG['fast_ma']
-        self.slow_ma = slow_ma or MA_CROSS_CONFIG['slow_ma']
-        self.confirm_ma = confirm_ma or MA_CROSS_CONFIG['confirm_ma']
-        self.min_separation = MA_CROSS_CONFIG['min_separation']
+        self.fast_ma = fast_ma or settings.MA_CROSS_CONFIG['fast_ma']
+        self.slow_ma = slow_ma or settings.MA_CROSS_CONFIG['slow_ma']
+        self.confirm_ma = confirm_ma or settings.MA_CROSS_CONFIG['confirm_ma']
+        self.min_separation = settings.MA_CROSS_CONFIG['min_separation']
 
     def calculate_sma(self, df, period):
         """Calculate Simple Moving Average"""
@@ -117,12 +120,13 @@ class MACrossStrategy:
         else:
             return 0, 0
 
-    def analyze_timeframes(self, data_dict):
+    def analyze_timeframes(self, data_dict, instrument=''):
         """
         Analyze multiple timeframes for MA crosses
 
         Args:
             data_dict (dict): Dictionary of {timeframe: DataFrame}
+            instrument (str): Instrument label for the per-timeframe stage timings
 
         Returns:
             dict: Results with cross signals and trends
@@ -135,22 +139,23 @@ class MACrossStrategy:
 
         for tf in timeframes:
             if tf in data_dict and data_dict[tf] is not None:
-                # Check for cross
-                signal, cross_type, strength = self.detect_cross(data_dict[tf])
-
-                if signal != 0:
-                    cross_detected = True
-                    results[f'{tf}_cross'] = cross_type
-                    results[f'{tf}_strength'] = strength
-                    score += signal * (strength / 100)  # Weight by strength
-                else:
-                    # Check ongoing trend
-                    trend_signal, trend_strength = self.check_ongoing_trend(data_dict[tf])
-                    results[f'{tf}_cross'] = 'ALIGNED' if trend_signal != 0 else 'NONE'
-                    results[f'{tf}_strength'] = trend_strength
-                    score += trend_signal * (trend_strength / 100)
-
-                results[tf] = signal if signal != 0 else (1 if results[f'{tf}_cross'] == 'ALIGNED' and trend_signal > 0 else -1 if results[f'{tf}_cross'] == 'ALIGNED' else 0)
+                with timed('ma_cross_strategy', instrument, tf):
+                    # Check for cross
+                    signal, cross_type, strength = self.detect_cross(data_dict[tf])
+
+                    if signal != 0:
+                        cross_detected = True
+                        results[f'{tf}_cross'] = cross_type
+                        results[f'{tf}_strength'] = strength
+                        score += signal * (strength / 100)  # Weight by strength
+                    else:
+                        # Check ongoing trend
+                        trend_signal, trend_strength = self.check_ongoing_trend(data_dict[tf])
+                        results[f'{tf}_cross'] = 'ALIGNED' if trend_signal != 0 else 'NONE'
+                        results[f'{tf}_strength'] = trend_strength
+                        score += trend_signal * (trend_strength / 100)
+
+                    results[tf] = signal if signal != 0 else (1 if results[f'{tf}_cross'] == 'ALIGNED' and trend_signal > 0 else -1 if results[f'{tf}_cross'] == 'ALIGNED' else 0)
             else:
                 results[tf] = 0
                 results[f'{tf}_cross'] = 'NONE'
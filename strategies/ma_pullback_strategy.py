@@ -8,16 +8,19 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.strategies import MA_PULLBACK_CONFIG
+from config.settings import get_settings
+from utils.metrics import timed
+
+settings = get_settings()
 
 
 class MAPullbackStrategy:
     def __init__(self, fast_ma=None, medium_ma=None, slow_ma=None):
-        self.fast_ma = fast_ma or MA_PULLBACK_CONFIG['fast_ma']
-        self.medium_ma = medium_ma or MA_PULLBACK_CONFIG['medium_ma']
-        self.slow_ma = slow_ma or MA_PULLBACK_CONFIG['slow_ma']
-        self.pullback_threshold = MA_PULLBACK_CONFIG['pullback_threshold']
-        self.min_alignment_bars = MA_PULLBACK_CONFIG['min_alignment_bars']
+        self.fast_ma = fast_ma or settings.MA_PULLBACK_CONFIG['fast_ma']
+        self.medium_ma = medium_ma or settings.MA_PULLBACK_CONFIG['medium_ma']
+        self.slow_ma = slow_ma or settings.MA_PULLBACK_CONFIG['slow_ma']
+        self.pullback_threshold = settings.MA_PULLBACK_CONFIG['pullback_threshold']
+        self.min_alignment_bars = settings.MA_PULLBACK_CONFIG['min_alignment_bars']
 
     def calculate_sma(self, df, period):
         """Calculate Simple Moving Average"""
@@ -163,12 +166,13 @@ class MAPullbackStrategy:
 
         return signal, pullback_type, strength
 
-    def analyze_timeframes(self, data_dict):
+    def analyze_timeframes(self, data_dict, instrument=''):
         """
         Analyze multiple timeframes for pullback opportunities
 
         Args:
             data_dict (dict): Dictionary of {timeframe: DataFrame}
+            instrument (str): Instrument label for the per-timeframe stage timings
 
         Returns:
             dict: Results with pullback signals
@@ -182,7 +186,8 @@ class MAPullbackStrategy:
         for tf in timeframes:
             if tf in data_dict and data_dict[tf] is not None:
                 # Check for pullback
-                signal, pullback_type, strength = self.detect_pullback(data_dict[tf])
+                with timed('ma_pullback_strategy', instrument, tf):
+                    signal, pullback_type, strength = self.detect_pullback(data_dict[tf])
 
                 if signal != 0:
                     pullback_detected = True
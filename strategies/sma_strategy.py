@@ -8,17 +8,20 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.strategies import SMA_CONFIG
+from config.settings import get_settings
+from utils.metrics import timed
+
+settings = get_settings()
 
 
 class SMAStrategy:
     def __init__(self, fast_sma=None, medium_sma=None, slow_sma=None, use_adx=None, adx_period=None, adx_strong=None):
-        self.fast_sma = fast_sma or SMA_CONFIG['fast_sma']
-        self.medium_sma = medium_sma or SMA_CONFIG['medium_sma']
-        self.slow_sma = slow_sma or SMA_CONFIG['slow_sma']
-        self.use_adx = use_adx if use_adx is not None else SMA_CONFIG['use_adx']
-        self.adx_period = adx_period or SMA_CONFIG['adx_period']
-        self.adx_strong = adx_strong or SMA_CONFIG['adx_strong']
+        self.fast_sma = fast_sma or settings.SMA_CONFIG['fast_sma']
+        self.medium_sma = medium_sma or settings.SMA_CONFIG['medium_sma']
+        self.slow_sma = slow_sma or settings.SMA_CONFIG['slow_sma']
+        self.use_adx = use_adx if use_adx is not None else settings.SMA_CONFIG['use_adx']
+        self.adx_period = adx_period or settings.SMA_CONFIG['adx_period']
+        self.adx_strong = adx_strong or settings.SMA_CONFIG['adx_strong']
 
     def calculate_sma(self, df, period):
         """Calculate Smoothed Moving Average (SMMA/RMA)
@@ -117,19 +120,20 @@ class SMAStrategy:
                 adx_val = adx.iloc[-1]
                 if adx_val >= self.adx_strong:
                     adx_strength = 'STRONG'
-                elif adx_val >= SMA_CONFIG['adx_weak']:
+                elif adx_val >= settings.SMA_CONFIG['adx_weak']:
                     adx_strength = 'MODERATE'
                 else:
                     adx_strength = 'WEAK'
 
         return trend, adx_strength, adx_val
 
-    def analyze_timeframes(self, data_dict):
+    def analyze_timeframes(self, data_dict, instrument=''):
         """
         Analyze multiple timeframes
 
         Args:
             data_dict (dict): Dictionary of {timeframe: DataFrame}
+            instrument (str): Instrument label for the per-timeframe stage timings
 
         Returns:
             dict: Results with trend per timeframe and overall score
@@ -142,7 +146,8 @@ class SMAStrategy:
 
         for tf in timeframes:
             if tf in data_dict and data_dict[tf] is not None:
-                trend, adx_strength, adx_val = self.calculate_sma_trend(data_dict[tf])
+                with timed('sma_strategy', instrument, tf):
+                    trend, adx_strength, adx_val = self.calculate_sma_trend(data_dict[tf])
                 results[tf] = trend
                 results[f'{tf}_adx'] = adx_strength
                 results[f'{tf}_adx_value'] = adx_val if adx_val is not None else 0
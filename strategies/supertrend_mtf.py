@@ -8,13 +8,16 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.strategies import SUPERTREND_CONFIG
+from config.settings import get_settings
+from utils.metrics import timed
+
+settings = get_settings()
 
 
 class SupertrendStrategy:
     def __init__(self, atr_period=None, multiplier=None):
-        self.atr_period = atr_period or SUPERTREND_CONFIG['atr_period']
-        self.multiplier = multiplier or SUPERTREND_CONFIG['multiplier']
+        self.atr_period = atr_period or settings.SUPERTREND_CONFIG['atr_period']
+        self.multiplier = multiplier or settings.SUPERTREND_CONFIG['multiplier']
 
     def calculate_atr(self, df):
         """Calculate Average True Range"""
@@ -87,12 +90,13 @@ class SupertrendStrategy:
         # Return latest trend direction
         return int(direction.iloc[-1])
 
-    def analyze_timeframes(self, data_dict):
+    def analyze_timeframes(self, data_dict, instrument=''):
         """
         Analyze multiple timeframes
 
         Args:
             data_dict (dict): Dictionary of {timeframe: DataFrame}
+            instrument (str): Instrument label for the per-timeframe stage timings
 
         Returns:
             dict: Results with trend per timeframe and overall score
@@ -104,7 +108,8 @@ class SupertrendStrategy:
 
         for tf in timeframes:
             if tf in data_dict and data_dict[tf] is not None:
-                trend = self.calculate_supertrend(data_dict[tf])
+                with timed('supertrend_strategy', instrument, tf):
+                    trend = self.calculate_supertrend(data_dict[tf])
                 results[tf] = trend
                 score += trend
             else:
@@ -0,0 +1,8 @@
+"""
+Test configuration for V3
+Puts the project root on sys.path, as the entry points do.
+"""
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,85 @@
+"""
+Tests for utils.currency_strength.solve_strength
+"""
+import numpy as np
+
+from utils.currency_strength import design_matrix, solve_strength
+
+CURRENCIES = ('EUR', 'USD', 'JPY', 'GBP')
+
+PAIRS = (
+    ('EURUSD', 'EUR', 'USD'),
+    ('USDJPY', 'USD', 'JPY'),
+    ('GBPUSD', 'GBP', 'USD'),
+    ('EURJPY', 'EUR', 'JPY'),
+    ('GBPJPY', 'GBP', 'JPY'),
+)
+
+# Zero-sum strengths (EUR, USD, JPY, GBP) and the pair moves they imply
+TRUE_STRENGTHS = np.array([0.6, -0.1, -0.9, 0.4])
+
+
+def setup():
+    design = design_matrix(PAIRS, CURRENCIES)
+    moves = (design @ TRUE_STRENGTHS)[:, None]
+    return design, moves
+
+
+def test_complete_moves_recover_zero_sum_strengths():
+    design, moves = setup()
+    strengths = solve_strength(design, moves)
+    np.testing.assert_allclose(strengths[:, 0], TRUE_STRENGTHS, atol=1e-12)
+    assert abs(strengths[:, 0].sum()) < 1e-12
+
+
+def test_precomputed_pinv_gives_the_same_result():
+    design, moves = setup()
+    np.testing.assert_allclose(
+        solve_strength(design, moves, pinv=np.linalg.pinv(design)),
+        solve_strength(design, moves),
+    )
+
+
+def test_missing_pair_still_solves_when_currencies_stay_connected():
+    design, moves = setup()
+    moves[4, 0] = np.nan  # GBPJPY missing; GBP still reached through GBPUSD
+    strengths = solve_strength(design, moves)
+    np.testing.assert_allclose(strengths[:, 0], TRUE_STRENGTHS, atol=1e-12)
+    assert abs(strengths[:, 0].sum()) < 1e-12
+
+
+def test_currency_without_any_pair_is_nan_and_the_rest_sum_to_zero():
+    design, moves = setup()
+    moves[2, 0] = np.nan  # GBPUSD
+    moves[4, 0] = np.nan  # GBPJPY
+    strengths = solve_strength(design, moves)[:, 0]
+
+    assert np.isnan(strengths[3])
+    covered = strengths[:3]
+    assert abs(covered.sum()) < 1e-12
+    # Differences between the covered currencies are still the true ones
+    np.testing.assert_allclose(covered - covered[1], TRUE_STRENGTHS[:3] - TRUE_STRENGTHS[1], atol=1e-12)
+
+
+def test_disconnected_groups_are_each_zero_sum():
+    design, moves = setup()
+    # Only EURUSD and GBPJPY: {EUR, USD} and {GBP, JPY} can't be compared
+    moves[[1, 2, 3], 0] = np.nan
+    strengths = solve_strength(design, moves)[:, 0]
+
+    eur, usd, jpy, gbp = strengths
+    assert abs(eur + usd) < 1e-12
+    assert abs(gbp + jpy) < 1e-12
+    assert abs((eur - usd) - moves[0, 0]) < 1e-12
+    assert abs((gbp - jpy) - moves[4, 0]) < 1e-12
+
+
+def test_columns_are_solved_independently():
+    design, moves = setup()
+    moves = np.hstack([moves, moves * 2, np.full_like(moves, np.nan)])
+    moves[0, 1] = np.nan  # EURUSD missing from the second column only
+    strengths = solve_strength(design, moves)
+
+    np.testing.assert_allclose(strengths[:, 0], TRUE_STRENGTHS, atol=1e-12)
+    np.testing.assert_allclose(strengths[:, 1], TRUE_STRENGTHS * 2, atol=1e-12)
+    assert np.isnan(strengths[:, 2]).all()
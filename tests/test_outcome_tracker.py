@@ -0,0 +1,104 @@
+"""
+Tests for utils.outcome_tracker.resolve_outcomes
+"""
+import numpy as np
+
+from utils.outcome_tracker import resolve_outcomes
+
+HOUR = 3600 * 10**9
+
+WIN, LOSS, EXPIRED, OPEN = 1, -1, 0, -2
+
+
+def hourly_bars(high, low):
+    """Bars opening at 1h, 2h, ... with the given highs and lows"""
+    times = np.arange(1, len(high) + 1, dtype=np.int64) * HOUR
+    high = np.array(high, dtype=np.float64)
+    low = np.array(low, dtype=np.float64)
+    return times, high, low, (high + low) / 2
+
+
+def resolve(bars, signal_hours, is_buy, stop_loss, take_profit, expiry_hours):
+    times, high, low, close = bars
+    return resolve_outcomes(
+        times, high, low, close,
+        np.array(signal_hours, dtype=np.int64) * HOUR,
+        np.array(is_buy, dtype=bool),
+        np.array(stop_loss, dtype=np.float64),
+        np.array(take_profit, dtype=np.float64),
+        expiry_hours * HOUR,
+    )
+
+
+def test_buy_take_profit_is_a_win_on_the_touching_bar():
+    bars = hourly_bars(high=[1.01, 1.02, 1.06, 1.03], low=[0.99, 0.99, 1.00, 1.00])
+    code, bar = resolve(bars, [0], [True], [0.95], [1.05], expiry_hours=10)
+    assert code.tolist() == [WIN]
+    assert bar.tolist() == [2]
+
+
+def test_sell_levels_are_mirrored():
+    bars = hourly_bars(high=[1.01, 1.02, 1.03], low=[0.99, 0.94, 0.99])
+    code, bar = resolve(bars, [0, 0], [False, False], [1.05, 1.015], [0.95, 0.90], expiry_hours=10)
+    # First SELL: low 0.94 reaches its take profit; second: high 1.02 reaches its stop
+    assert code.tolist() == [WIN, LOSS]
+    assert bar.tolist() == [1, 1]
+
+
+def test_bar_touching_stop_and_target_scores_as_loss():
+    bars = hourly_bars(high=[1.01, 1.10, 1.01], low=[0.99, 0.90, 0.99])
+    code, bar = resolve(bars, [0, 0], [True, False], [0.95, 1.05], [1.05, 0.95], expiry_hours=10)
+    assert code.tolist() == [LOSS, LOSS]
+    assert bar.tolist() == [1, 1]
+
+
+def test_stop_before_target_is_a_loss_even_if_target_follows():
+    bars = hourly_bars(high=[1.01, 1.01, 1.10], low=[0.99, 0.90, 0.99])
+    code, bar = resolve(bars, [0], [True], [0.95], [1.05], expiry_hours=10)
+    assert code.tolist() == [LOSS]
+    assert bar.tolist() == [1]
+
+
+def test_bar_opening_at_the_signal_time_is_not_checked():
+    # The signal at 1h is produced from the bar opening at 1h, so that bar's
+    # range can't count; only the bars after it can
+    bars = hourly_bars(high=[1.10, 1.01, 1.01, 1.01], low=[0.99, 0.99, 0.99, 0.99])
+    code, _ = resolve(bars, [1], [True], [0.95], [1.05], expiry_hours=10)
+    assert code.tolist() == [OPEN]
+
+
+def test_touch_on_the_last_bar_before_expiry_counts():
+    # Signal at 0h with a 3h lifetime: bars opening at 1h and 2h are inside
+    bars = hourly_bars(high=[1.01, 1.06, 1.01, 1.01], low=[0.99, 0.99, 0.99, 0.99])
+    code, bar = resolve(bars, [0], [True], [0.95], [1.05], expiry_hours=3)
+    assert code.tolist() == [WIN]
+    assert bar.tolist() == [1]
+
+
+def test_touch_on_the_bar_opening_at_expiry_is_expired():
+    # The bar opening exactly at signal + expiry is outside the window
+    bars = hourly_bars(high=[1.01, 1.01, 1.06, 1.01], low=[0.99, 0.99, 0.99, 0.99])
+    code, bar = resolve(bars, [0], [True], [0.95], [1.05], expiry_hours=3)
+    assert code.tolist() == [EXPIRED]
+    # Closed on the last bar before expiry
+    assert bar.tolist() == [1]
+
+
+def test_untouched_signal_stays_open_until_candles_reach_expiry():
+    bars = hourly_bars(high=[1.01, 1.01, 1.01], low=[0.99, 0.99, 0.99])
+    # Bars open at 1h, 2h and 3h: a 4h lifetime isn't over yet
+    code, _ = resolve(bars, [0, 0], [True, True], [0.95, 0.95], [1.05, 1.05], expiry_hours=4)
+    assert code.tolist() == [OPEN, OPEN]
+
+    # A bar opening exactly at expiry shows the window has passed
+    code, bar = resolve(bars, [0], [True], [0.95], [1.05], expiry_hours=3)
+    assert code.tolist() == [EXPIRED]
+    assert bar.tolist() == [1]
+
+
+def test_each_signal_uses_its_own_window():
+    bars = hourly_bars(high=[1.06, 1.01, 1.01, 1.01, 1.01], low=[0.99, 0.99, 0.99, 0.99, 0.99])
+    code, bar = resolve(bars, [0, 1], [True, True], [0.95, 0.95], [1.05, 1.05], expiry_hours=3)
+    # Only the first signal's window contains the spike at 1h
+    assert code.tolist() == [WIN, EXPIRED]
+    assert bar.tolist() == [0, 2]
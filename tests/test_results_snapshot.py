@@ -0,0 +1,65 @@
+"""
+Tests for utils.results_snapshot.content_etag and snapshot ETags
+"""
+import re
+
+from utils.results_snapshot import ResultsSnapshot, content_etag
+
+RESULTS = {
+    'EURUSD': {'sma': {'overall': 'BUY'}, 'data_dict': object()},
+    'GBPUSD': {'sma': {'overall': 'SELL'}},
+}
+
+
+def snapshot(**fields):
+    values = dict(scan_id=3, version=5, seq=12, last_update='2026-01-05T10:00:00',
+                  screener_results=RESULTS, news={'events': []})
+    values.update(fields)
+    return ResultsSnapshot(**values)
+
+
+def test_etag_depends_only_on_the_body():
+    assert content_etag(b'{"a":1}') == content_etag(b'{"a":1}')
+    assert content_etag(b'{"a":1}') != content_etag(b'{"a":2}')
+
+
+def test_etag_is_sixteen_hex_characters():
+    assert re.fullmatch(r'[0-9a-f]{16}', content_etag(b'{}'))
+
+
+def test_same_content_gives_the_same_etag_across_instances():
+    # Separately built snapshots stand in for two processes or a restart
+    first, second = snapshot(), snapshot()
+    assert first.etag == second.etag
+    assert first.instrument_etags == second.instrument_etags
+    assert first.etag == content_etag(first.body)
+
+
+def test_instrument_etags_hash_their_own_body():
+    current = snapshot()
+    for instrument, body in current.instrument_bodies.items():
+        assert current.instrument_etags[instrument] == content_etag(body)
+    assert b'data_dict' not in current.instrument_bodies['EURUSD']
+
+
+def test_etag_changes_with_the_scanning_flag():
+    current = snapshot()
+    scanning = current.replace(scanning=True)
+    assert scanning.etag != current.etag
+    # Results weren't touched, so the per-instrument ETags carry over
+    assert scanning.instrument_etags == current.instrument_etags
+
+
+def test_etag_changes_with_the_results():
+    current = snapshot()
+    updated = snapshot(screener_results={**RESULTS, 'GBPUSD': {'sma': {'overall': 'BUY'}}})
+    assert updated.etag != current.etag
+    assert updated.instrument_etags['EURUSD'] == current.instrument_etags['EURUSD']
+    assert updated.instrument_etags['GBPUSD'] != current.instrument_etags['GBPUSD']
+
+
+def test_rebuilt_snapshot_keeps_the_publisher_etags():
+    current = snapshot()
+    rebuilt = ResultsSnapshot.from_serialized(current.meta(), current.instrument_bodies, current.news_body)
+    assert rebuilt.etag == current.etag
+    assert rebuilt.instrument_etags == current.instrument_etags
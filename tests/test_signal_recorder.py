@@ -0,0 +1,74 @@
+"""
+Tests for utils.signal_recorder.build_signal_rows
+"""
+from utils.signal_recorder import SIGNAL_COLUMNS, build_signal_rows
+
+COLUMN = {name: i for i, name in enumerate(SIGNAL_COLUMNS)}
+
+
+def instrument_results(sma='NEUTRAL', ma_cross='NEUTRAL', ma_pullback='NEUTRAL'):
+    return {
+        'timestamp': '2026-01-05T10:00:00',
+        'technical_analysis': {'current_price': 1.1000, 'atr_h4': 0.0020},
+        'sma': {'overall': sma},
+        'ma_cross': {'overall': ma_cross},
+        'ma_pullback': {'overall': ma_pullback},
+        'sma_confidence': {'confidence': 70},
+    }
+
+
+def by_strategy(rows):
+    return {row[COLUMN['strategy']]: row for row in rows}
+
+
+def test_rows_follow_the_column_order():
+    rows = build_signal_rows({'EURUSD': instrument_results(sma='STRONG BUY')}, scan_id=7)
+    assert len(rows) == 1
+    row = rows[0]
+    assert len(row) == len(SIGNAL_COLUMNS)
+    assert row[COLUMN['instrument']] == 'EURUSD'
+    assert row[COLUMN['strategy']] == 'sma_trend'
+    assert row[COLUMN['signal_type']] == 'BUY'
+    assert row[COLUMN['confidence']] == 70
+    assert row[COLUMN['scan_id']] == 7
+    assert row[COLUMN['stop_loss']] < row[COLUMN['entry_price']] < row[COLUMN['take_profit']]
+
+
+def test_neutral_strategies_produce_no_row():
+    rows = build_signal_rows({'EURUSD': instrument_results(ma_cross='SELL')})
+    assert list(by_strategy(rows)) == ['ma_cross']
+
+
+def test_without_a_previous_scan_every_signal_is_new():
+    rows = build_signal_rows({'EURUSD': instrument_results(sma='BUY', ma_pullback='SELL')}, previous=None)
+    assert [row[COLUMN['is_new']] for row in rows] == [True, True]
+
+
+def test_only_changed_directions_are_new():
+    results = {
+        'EURUSD': instrument_results(sma='BUY', ma_cross='STRONG SELL', ma_pullback='BUY'),
+        'GBPUSD': instrument_results(sma='SELL'),
+    }
+    previous = {
+        ('EURUSD', 'sma_trend'): 'BUY',  # unchanged
+        ('EURUSD', 'ma_cross'): 'BUY',  # flipped
+        # EURUSD ma_pullback was neutral last scan
+        ('GBPUSD', 'sma_trend'): 'SELL',
+    }
+    rows = build_signal_rows(results, previous=previous)
+
+    eurusd = by_strategy(row for row in rows if row[COLUMN['instrument']] == 'EURUSD')
+    gbpusd = by_strategy(row for row in rows if row[COLUMN['instrument']] == 'GBPUSD')
+    assert eurusd['sma_trend'][COLUMN['is_new']] is False
+    assert eurusd['ma_cross'][COLUMN['is_new']] is True
+    assert eurusd['ma_pullback'][COLUMN['is_new']] is True
+    assert gbpusd['sma_trend'][COLUMN['is_new']] is False
+
+
+def test_missing_price_or_atr_leaves_the_levels_empty():
+    results = instrument_results(sma='BUY')
+    results['technical_analysis'] = {}
+    row = build_signal_rows({'EURUSD': results})[0]
+    assert row[COLUMN['entry_price']] is None
+    assert row[COLUMN['stop_loss']] is None
+    assert row[COLUMN['take_profit']] is None
@@ -0,0 +1,91 @@
+"""
+Tests for utils.synthetic_rates.synthesize
+"""
+import numpy as np
+
+from utils.candle_store import CandleSeries
+from utils.synthetic_rates import synthesize, usd_legs
+
+HOUR = 3600 * 10**9
+
+PAIRS = ('EUR_USD', 'USD_JPY', 'GBP_USD', 'EUR_JPY')
+
+
+def series(instrument, hours, open, high, low, close, volume=None):
+    times = np.array(hours, dtype=np.int64) * HOUR
+    if volume is None:
+        volume = np.full(len(times), 100, dtype=np.int32)
+    return CandleSeries(
+        instrument, 'H1', times,
+        np.array(open, dtype=np.float64), np.array(high, dtype=np.float64),
+        np.array(low, dtype=np.float64), np.array(close, dtype=np.float64),
+        np.array(volume, dtype=np.int32),
+    )
+
+
+def eurusd(hours=(0, 1, 2)):
+    n = len(hours)
+    return series('EURUSD', hours, [1.10] * n, [1.11] * n, [1.09] * n, [1.105] * n)
+
+
+def usdjpy(hours=(0, 1, 2)):
+    n = len(hours)
+    return series('USDJPY', hours, [150.0] * n, [151.0] * n, [149.0] * n, [150.5] * n)
+
+
+def test_usd_legs_inverts_the_usd_base_major():
+    assert usd_legs('EUR_JPY', PAIRS) == (('EUR_USD', 1), ('USD_JPY', 1))
+    # GBP/EUR: GBP in USD over EUR in USD
+    assert usd_legs('GBP_EUR', PAIRS) == (('GBP_USD', 1), ('EUR_USD', -1))
+    assert usd_legs('EUR_USD', PAIRS) is None
+    assert usd_legs('EUR_CHF', PAIRS) is None
+
+
+def test_open_and_close_are_the_product_of_the_legs():
+    frame = synthesize(((eurusd(), 1), (usdjpy(), 1)))
+    np.testing.assert_allclose(frame['open'], 1.10 * 150.0)
+    np.testing.assert_allclose(frame['close'], 1.105 * 150.5)
+    assert frame.attrs['synthetic'] is True
+    assert frame.index.tz is not None
+
+
+def test_inverted_leg_is_the_reciprocal():
+    frame = synthesize(((usdjpy(), -1),))
+    np.testing.assert_allclose(frame['open'], 1 / 150.0)
+    np.testing.assert_allclose(frame['close'], 1 / 150.5)
+    # USDJPY's low wick becomes JPY/USD's high wick
+    np.testing.assert_allclose(frame['high'], 1 / 149.0)
+    np.testing.assert_allclose(frame['low'], 1 / 151.0)
+
+
+def test_high_and_low_enclose_open_and_close():
+    rng = np.random.default_rng(7)
+    hours = np.arange(200)
+    legs = []
+    for instrument, level in (('EURUSD', 1.1), ('USDJPY', 150.0)):
+        open = level * np.exp(rng.normal(0, 0.002, len(hours)))
+        close = open * np.exp(rng.normal(0, 0.002, len(hours)))
+        high = np.maximum(open, close) * np.exp(np.abs(rng.normal(0, 0.001, len(hours))))
+        low = np.minimum(open, close) * np.exp(-np.abs(rng.normal(0, 0.001, len(hours))))
+        legs.append(series(instrument, hours, open, high, low, close))
+
+    frame = synthesize(((legs[0], 1), (legs[1], -1)))
+    assert (frame['high'] >= frame[['open', 'close']].max(axis=1) - 1e-12).all()
+    assert (frame['low'] <= frame[['open', 'close']].min(axis=1) + 1e-12).all()
+
+
+def test_only_bars_all_legs_share_are_used():
+    frame = synthesize(((eurusd(hours=(0, 1, 2, 3)), 1), (usdjpy(hours=(1, 3, 4)), 1)))
+    assert [ts.hour for ts in frame.index] == [1, 3]
+
+
+def test_volume_is_the_smallest_leg_volume():
+    legs = (
+        (series('EURUSD', (0, 1), [1.1] * 2, [1.1] * 2, [1.1] * 2, [1.1] * 2, volume=[50, 300]), 1),
+        (series('USDJPY', (0, 1), [150.0] * 2, [150.0] * 2, [150.0] * 2, [150.0] * 2, volume=[80, 200]), 1),
+    )
+    assert synthesize(legs)['volume'].tolist() == [50, 200]
+
+
+def test_no_shared_bars_returns_none():
+    assert synthesize(((eurusd(hours=(0, 1)), 1), (usdjpy(hours=(2, 3)), 1))) is None
@@ -0,0 +1,114 @@
+"""
+Alert Store for V3
+Last alerted direction per (instrument, strategy), kept in SQLite so it
+survives restarts and is shared by every process on the host.
+
+SQLite (WAL mode) stands in for the PostgreSQL database in
+database_schema.sql, which defines the same alert_state table.
+"""
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+# Strategy key used when a signal names no strategy
+OVERALL = 'overall'
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alert_state (
+    instrument TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    direction TEXT,
+    confidence REAL,
+    updated_at TEXT NOT NULL,
+    PRIMARY KEY (instrument, strategy)
+)
+"""
+
+
+class AlertStore:
+    def __init__(self, path):
+        """
+        Args:
+            path: SQLite database file
+        """
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # sqlite3 connections can't be shared between threads
+        self._local = threading.local()
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(SCHEMA)
+
+    def _connect(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit; transactions are opened explicitly with BEGIN IMMEDIATE
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA busy_timeout=10000')
+            self._local.conn = conn
+        return conn
+
+    def get(self, instrument, strategy=OVERALL):
+        """Last alerted direction ('BUY'/'SELL') or None"""
+        row = self._connect().execute(
+            'SELECT direction FROM alert_state WHERE instrument = ? AND strategy = ?',
+            (instrument, strategy)
+        ).fetchone()
+        return row[0] if row else None
+
+    def all(self, strategy=OVERALL):
+        """{instrument: direction} for one strategy key"""
+        rows = self._connect().execute(
+            'SELECT instrument, direction FROM alert_state WHERE strategy = ? AND direction IS NOT NULL',
+            (strategy,)
+        ).fetchall()
+        return dict(rows)
+
+    def compare_and_set(self, instrument, expected, direction, strategy=OVERALL, confidence=None):
+        """
+        Atomically change the last alerted direction if it is still `expected`
+
+        Args:
+            instrument: Instrument name (e.g. 'EURUSD')
+            expected: Direction the caller last read (None = never alerted)
+            direction: New direction (None clears it)
+            strategy: Strategy key (default 'overall')
+            confidence: Confidence of the alerted signal
+
+        Returns:
+            bool: True if this caller won and the state now holds `direction`
+        """
+        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        conn = self._connect()
+
+        # BEGIN IMMEDIATE takes the write lock up front, so read + write are atomic
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT direction FROM alert_state WHERE instrument = ? AND strategy = ?',
+                (instrument, strategy)
+            ).fetchone()
+            current = row[0] if row else None
+
+            if current != expected:
+                conn.execute('ROLLBACK')
+                return False
+
+            conn.execute(
+                'INSERT INTO alert_state (instrument, strategy, direction, confidence, updated_at) '
+                'VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT (instrument, strategy) DO UPDATE SET '
+                'direction = excluded.direction, confidence = excluded.confidence, updated_at = excluded.updated_at',
+                (instrument, strategy, direction, confidence, now)
+            )
+            conn.execute('COMMIT')
+            return True
+
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
@@ -0,0 +1,159 @@
+"""
+Candle Store for V3
+Compact, bounded cache of the latest candles per (instrument, timeframe).
+
+Candles are kept as plain numpy arrays instead of DataFrames (float32 in
+low-memory mode), and the least recently used series are evicted once the
+store exceeds its series or byte budget.
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+PRICE_COLUMNS = ('open', 'high', 'low', 'close')
+
+
+class CandleSeries:
+    """OHLCV arrays for one instrument/timeframe"""
+
+    __slots__ = ('instrument', 'timeframe', 'times', 'open', 'high', 'low', 'close', 'volume')
+
+    def __init__(self, instrument, timeframe, times, open, high, low, close, volume):
+        self.instrument = instrument
+        self.timeframe = timeframe
+        self.times = times
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+
+    @classmethod
+    def from_frame(cls, instrument, timeframe, df, dtype=np.float64):
+        """
+        Convert a connector DataFrame (time index, OHLCV columns)
+
+        Args:
+            df: DataFrame from OandaConnector/YFinanceConnector
+            dtype: Price dtype (np.float32 halves the footprint)
+        """
+        index = pd.DatetimeIndex(df.index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+
+        prices = {col: np.ascontiguousarray(df[col].to_numpy(), dtype=dtype) for col in PRICE_COLUMNS}
+        if 'volume' in df:
+            volume = np.ascontiguousarray(df['volume'].to_numpy(), dtype=np.int32)
+        else:
+            volume = np.zeros(len(df), dtype=np.int32)
+
+        times = index.to_numpy().astype('datetime64[ns]').view(np.int64)
+        return cls(instrument, timeframe, times, volume=volume, **prices)
+
+    def __len__(self):
+        return len(self.times)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ('times', 'open', 'high', 'low', 'close', 'volume'))
+
+    def to_frame(self):
+        """Rebuild a float64 DataFrame in the connectors' format (UTC index)"""
+        index = pd.DatetimeIndex(self.times.view('datetime64[ns]')).tz_localize('UTC')
+        index.name = 'time'
+        return pd.DataFrame({
+            'open': self.open.astype(np.float64),
+            'high': self.high.astype(np.float64),
+            'low': self.low.astype(np.float64),
+            'close': self.close.astype(np.float64),
+            'volume': self.volume,
+        }, index=index)
+
+
+class CandleStore:
+    def __init__(self, max_series=64, max_bytes=None, dtype=np.float64):
+        """
+        Args:
+            max_series: Maximum number of (instrument, timeframe) series kept
+            max_bytes: Optional byte budget across all series
+            dtype: Price dtype for stored series
+        """
+        self.max_series = max_series
+        self.max_bytes = max_bytes
+        self.dtype = dtype
+        self._lock = threading.Lock()
+        self._series = OrderedDict()  # (instrument, timeframe) -> CandleSeries, oldest first
+        self._nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def put(self, instrument, timeframe, df):
+        """
+        Store the candles of one DataFrame (None/empty frames are ignored)
+
+        Returns:
+            CandleSeries or None
+        """
+        if df is None or len(df) == 0:
+            return None
+
+        series = CandleSeries.from_frame(instrument, timeframe, df, self.dtype)
+        key = (instrument, timeframe)
+
+        with self._lock:
+            previous = self._series.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+            self._series[key] = series
+            self._nbytes += series.nbytes
+            self._evict()
+
+        return series
+
+    def get(self, instrument, timeframe):
+        """Stored series (marks it as recently used), or None"""
+        key = (instrument, timeframe)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                self.misses += 1
+                return None
+            self._series.move_to_end(key)
+            self.hits += 1
+            return series
+
+    def get_frame(self, instrument, timeframe):
+        """Stored series as a DataFrame, or None"""
+        series = self.get(instrument, timeframe)
+        return series.to_frame() if series is not None else None
+
+    def _evict(self):
+        # Always keep the newest series, even if it alone exceeds the budget
+        while len(self._series) > 1 and (
+                len(self._series) > self.max_series or
+                (self.max_bytes is not None and self._nbytes > self.max_bytes)):
+            _, series = self._series.popitem(last=False)
+            self._nbytes -= series.nbytes
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._series)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def stats(self):
+        """Size and hit/miss/eviction counters"""
+        with self._lock:
+            return {
+                'series': len(self._series),
+                'bytes': self._nbytes,
+                'dtype': np.dtype(self.dtype).name,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,188 @@
+"""
+Change Log for V3
+Tracks which instruments' signals changed at each sequence number so clients
+can ask for "everything that changed since seq N" instead of the full results.
+"""
+import threading
+from collections import deque
+
+# Timeframes tracked per strategy
+TIMEFRAMES = ['M5', 'M15', 'H1', 'H4', 'D']
+
+# Changes remembered per instrument before the oldest are dropped
+MAX_ENTRIES_PER_INSTRUMENT = 50
+
+
+def key_fields(data):
+    """
+    Flatten the fields of an instrument's results that count as a change
+
+    Prices and timestamps move every scan and are deliberately left out.
+
+    Args:
+        data: Instrument results from V3ForexScreener.analyze_instrument
+
+    Returns:
+        dict: {field_name: value}
+    """
+    fields = {
+        'overall_signal': data.get('overall_signal'),
+        'best_confidence': data.get('best_confidence'),
+        'best_strategy': data.get('best_strategy'),
+    }
+
+    for strategy in ('sma', 'ma_cross', 'ma_pullback'):
+        strategy_data = data.get(strategy) or {}
+        fields[f'{strategy}.overall'] = strategy_data.get('overall')
+        fields[f'{strategy}.score'] = strategy_data.get('score')
+        for tf in TIMEFRAMES:
+            fields[f'{strategy}.{tf}'] = strategy_data.get(tf)
+
+        confidence = data.get(f'{strategy}_confidence') or {}
+        fields[f'{strategy}_confidence'] = confidence.get('confidence')
+
+    ma_cross = data.get('ma_cross') or {}
+    fields['ma_cross.cross_detected'] = ma_cross.get('cross_detected')
+    ma_pullback = data.get('ma_pullback') or {}
+    fields['ma_pullback.pullback_detected'] = ma_pullback.get('pullback_detected')
+    fields['supertrend.trend'] = (data.get('supertrend') or {}).get('trend')
+
+    technical = data.get('technical_analysis') or {}
+    fields['technical_analysis.daily_pivots'] = technical.get('daily_pivots')
+    fields['technical_analysis.pattern_h4'] = technical.get('pattern_h4')
+    fields['technical_analysis.pattern_h1'] = technical.get('pattern_h1')
+
+    return fields
+
+
+def changed_fields(log, since, until):
+    """
+    Fields that changed in the range (since, until] according to an exported log
+
+    Args:
+        log: {'floor': seq, 'entries': [[seq, [field, ...]], ...]} from
+            ChangeLog.export(); changes at or before 'floor' are unknown
+
+    Returns:
+        list or None: Sorted field names, or None if the log doesn't reach
+            back to `since` (treat as "everything changed")
+    """
+    if not log or since < log['floor']:
+        return None
+
+    changed = set()
+    for seq, names in log['entries']:
+        if since < seq <= until:
+            changed.update(names)
+    return sorted(changed)
+
+
+class ChangeLog:
+    def __init__(self, max_entries=MAX_ENTRIES_PER_INSTRUMENT):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._entries = {}      # instrument -> deque of (seq, changed field names)
+        self._fields = {}       # instrument -> last recorded key_fields()
+        self._latest_seq = {}   # instrument -> seq of last change
+        self._floor = {}        # instrument -> seq up to which its changes are unknown
+        self._base_floor = 0    # floor of instruments without a log yet
+
+    @property
+    def seq(self):
+        """Sequence number of the most recent change"""
+        with self._lock:
+            return self._seq
+
+    def record_scan(self, results):
+        """
+        Record a completed scan
+
+        Args:
+            results: {instrument: results} from scan_all_instruments
+
+        Returns:
+            tuple: (seq, {instrument: seq of its last change})
+        """
+        with self._lock:
+            for instrument, data in results.items():
+                fields = key_fields(data)
+                previous = self._fields.get(instrument, {})
+                changed = [name for name, value in fields.items() if previous.get(name) != value]
+
+                if not changed:
+                    continue
+
+                self._seq += 1
+                log = self._entries.setdefault(instrument, deque(maxlen=self.max_entries))
+                if len(log) == log.maxlen:
+                    # Oldest entry is evicted; changes up to it are no longer known
+                    self._floor[instrument] = log[0][0]
+                log.append((self._seq, changed))
+                self._fields[instrument] = fields
+                self._latest_seq[instrument] = self._seq
+
+            return self._seq, dict(self._latest_seq)
+
+    def restore(self, results, seq, instrument_seqs, changes=None):
+        """
+        Continue from a persisted snapshot after a restart
+
+        The restored results become the baseline for the next scan's
+        comparison, and sequence numbers carry on from `seq` so clients'
+        ?since= values stay valid.
+
+        Args:
+            results: {instrument: results} of the restored snapshot
+            seq: Snapshot sequence number
+            instrument_seqs: {instrument: seq of its last change}
+            changes: export() of the log that produced the snapshot, if saved
+        """
+        with self._lock:
+            self._seq = seq
+            self._fields = {instrument: key_fields(data) for instrument, data in results.items()}
+            self._latest_seq = dict(instrument_seqs)
+            self._entries = {}
+            self._floor = {}
+            # Without the saved log nothing before the restored seq is known
+            self._base_floor = seq
+            for instrument, log in (changes or {}).items():
+                self._entries[instrument] = deque(
+                    ((entry_seq, list(names)) for entry_seq, names in log['entries']),
+                    maxlen=self.max_entries
+                )
+                self._floor[instrument] = log['floor']
+
+    def export(self):
+        """
+        Per-instrument logs for the results snapshot
+
+        Snapshots carry them so other processes (web workers, restarts) can
+        answer ?since= with changed_fields() without this ChangeLog.
+
+        Returns:
+            dict: {instrument: {'floor': seq, 'entries': [[seq, [field, ...]], ...]}}
+        """
+        with self._lock:
+            return {
+                instrument: {
+                    'floor': self._floor.get(instrument, self._base_floor),
+                    'entries': [[seq, list(names)] for seq, names in log],
+                }
+                for instrument, log in self._entries.items()
+            }
+
+    def changed_fields(self, instrument, since, until):
+        """
+        Fields of an instrument that changed in the range (since, until]
+
+        Returns:
+            list or None: Sorted field names, or None if the log no longer
+                reaches back to `since` (treat as "everything changed")
+        """
+        with self._lock:
+            log = self._entries.get(instrument)
+            if not log:
+                return None
+            floor = self._floor.get(instrument, self._base_floor)
+            return changed_fields({'floor': floor, 'entries': list(log)}, since, until)
@@ -8,13 +8,23 @@ import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.strategies import CONFIDENCE_WEIGHTS, MIN_CONFIDENCE_THRESHOLD
+from config.settings import get_settings
+from utils.event_calendar import event_calendar
+from utils.win_rates import alignment_score, win_rates as default_win_rates
+
+settings = get_settings()
 
 
 class ConfidenceScorer:
-    def __init__(self):
-        self.weights = CONFIDENCE_WEIGHTS
-        self.min_threshold = MIN_CONFIDENCE_THRESHOLD
+    def __init__(self, calendar=None, win_rates=None, currency_strength=None):
+        self.weights = settings.CONFIDENCE_WEIGHTS
+        self.min_threshold = settings.MIN_CONFIDENCE_THRESHOLD
+        self.calendar = event_calendar if calendar is None else calendar
+        self.win_rates = default_win_rates if win_rates is None else win_rates
+        self.event_risk = settings.EVENT_RISK_CONFIG
+        # utils.currency_strength.CurrencyStrength; the factor is 0 without it
+        self.currency_strength = currency_strength
+        self.strength_config = settings.CURRENCY_STRENGTH_CONFIG
 
     def calculate_timeframe_alignment_score(self, signal_data):
         """
@@ -161,32 +171,82 @@ class ConfidenceScorer:
         else:
             return 2   # Extreme volatility (too low or too high)
 
-    def calculate_historical_win_rate_score(self, strategy_name):
+    def calculate_historical_win_rate_score(self, strategy_name, instrument=None, alignment=None):
         """
         Calculate score based on strategy historical win rate (10 points max)
 
         Args:
             strategy_name: Name of the strategy
+            instrument: Instrument name (narrows the win rate when known)
+            alignment: Timeframes agreeing with the signal (0-5)
 
         Returns:
             int: 0-10 points
         """
-        # Placeholder: In production, this would query the performance database
-        # For now, return estimated win rates based on strategy type
-        win_rates = {
-            'ma_cross': 0.65,      # 65% win rate
-            'ma_pullback': 0.70,   # 70% win rate
-            'sma_trend': 0.68,     # 68% win rate
-            'combined': 0.73,      # 73% win rate
-        }
-
-        win_rate = win_rates.get(strategy_name, 0.60)
+        # Recorded outcomes (in-memory counts) once there are enough of them
+        recorded = self.win_rates.win_rate(strategy_name, instrument, alignment)
+        if recorded is not None:
+            win_rate, _ = recorded
+        else:
+            # Estimated win rates until the performance database has history
+            win_rates = {
+                'ma_cross': 0.65,      # 65% win rate
+                'ma_pullback': 0.70,   # 70% win rate
+                'sma_trend': 0.68,     # 68% win rate
+                'combined': 0.73,      # 73% win rate
+            }
+            win_rate = win_rates.get(strategy_name, 0.60)
 
         # Convert win rate to score (10 points max)
         return int(win_rate * 10)
 
+    def calculate_event_risk(self, instrument, when=None):
+        """
+        Penalty for a high-impact event on either leg of the instrument
+
+        Args:
+            instrument: Instrument name (e.g. 'EURUSD')
+            when: Epoch seconds (default: now)
+
+        Returns:
+            tuple: (penalty points (<= 0), nearest event or None)
+        """
+        event = self.calendar.next_event(
+            instrument, when, self.event_risk['penalty_window_minutes']
+        )
+        if event is None:
+            return 0, None
+        return -self.event_risk['penalty'], event
+
+    def calculate_currency_strength_score(self, instrument, signal):
+        """
+        Points for base vs quote currency strength agreeing with the signal
+
+        Args:
+            instrument: Instrument name (forex pairs only score)
+            signal: Signal text ('BUY', 'STRONG SELL', ...)
+
+        Returns:
+            int: -max_points to +max_points (0 for non-forex or NEUTRAL)
+        """
+        if self.currency_strength is None or not signal:
+            return 0
+        if 'BUY' in signal:
+            direction = 1
+        elif 'SELL' in signal:
+            direction = -1
+        else:
+            return 0
+
+        differential = self.currency_strength.differential(instrument, self.strength_config['timeframe'])
+        if differential is None:
+            return 0
+
+        agreement = max(min(direction * differential / self.strength_config['full_points_at'], 1.0), -1.0)
+        return int(round(agreement * self.strength_config['max_points']))
+
     def calculate_confidence(self, signal_data, ma_cross_data=None, ma_pullback_data=None,
-                           h4_df=None, strategy_name='combined'):
+                           h4_df=None, strategy_name='combined', instrument=None):
         """
         Calculate overall confidence score (0-100%)
 
@@ -196,12 +256,15 @@ class ConfidenceScorer:
             ma_pullback_data: dict with MA pullback results
             h4_df: DataFrame for H4 timeframe (for volatility calc)
             strategy_name: Name of strategy for win rate lookup
+            instrument: Instrument name for the economic event penalty and
+                currency strength factor (optional)
 
         Returns:
             dict: {
                 'confidence': int (0-100),
                 'breakdown': dict with individual scores,
-                'meets_threshold': bool
+                'meets_threshold': bool,
+                'event': nearest high-impact event or None
             }
         """
         # Calculate individual scores
@@ -216,7 +279,17 @@ class ConfidenceScorer:
 
         trend_strength_score = self.calculate_trend_strength_score(signal_data)
         volatility_score = self.calculate_volatility_score(h4_df) if h4_df is not None else 8
-        win_rate_score = self.calculate_historical_win_rate_score(strategy_name)
+        win_rate_score = self.calculate_historical_win_rate_score(
+            strategy_name, instrument, alignment_score(signal_data)
+        )
+
+        event_score, event = (0, None)
+        if instrument:
+            event_score, event = self.calculate_event_risk(instrument)
+
+        strength_score = 0
+        if instrument:
+            strength_score = self.calculate_currency_strength_score(instrument, signal_data.get('overall'))
 
         # Calculate total confidence
         confidence = (
@@ -224,11 +297,13 @@ class ConfidenceScorer:
             ma_convergence_score +
             trend_strength_score +
             volatility_score +
-            win_rate_score
+            win_rate_score +
+            event_score +
+            strength_score
         )
 
-        # Cap at 100
-        confidence = min(confidence, 100)
+        # Clamp to 0-100
+        confidence = max(min(confidence, 100), 0)
 
         return {
             'confidence': confidence,
@@ -237,9 +312,12 @@ class ConfidenceScorer:
                 'ma_convergence': ma_convergence_score,
                 'trend_strength': trend_strength_score,
                 'volatility': volatility_score,
-                'win_rate': win_rate_score
+                'win_rate': win_rate_score,
+                'event_risk': event_score,
+                'currency_strength': strength_score
             },
-            'meets_threshold': confidence >= self.min_threshold
+            'meets_threshold': confidence >= self.min_threshold,
+            'event': event
         }
 
 
@@ -268,7 +346,7 @@ if __name__ == "__main__":
     )
 
     print(f"\n[OK] Confidence: {result['confidence']}%")
-    print(f"Meets Threshold (>={MIN_CONFIDENCE_THRESHOLD}%): {result['meets_threshold']}")
+    print(f"Meets Threshold (>={settings.MIN_CONFIDENCE_THRESHOLD}%): {result['meets_threshold']}")
     print(f"\nBreakdown:")
     for key, value in result['breakdown'].items():
         print(f"  {key}: {value}")
@@ -0,0 +1,217 @@
+"""
+Correlation Engine for V3
+Rolling correlation of bar returns between all 11 instruments, per timeframe.
+
+Log close-to-close returns from the candle store are lined up by bar and kept
+in a window of CORRELATION_CONFIG['window'] bars per timeframe. Bars are
+bucketed by period, and H4/D are shifted so OANDA candles (21:00/22:00 UTC
+opens) and yfinance candles land in the same session. For every pair the
+window keeps the pairwise-complete sums: n, Σx, Σx² and Σxy over the bars
+where both instruments have a return. A new bar adds its outer products and
+the bar leaving the window subtracts its own, so each update is O(N²) per new
+bar instead of a full recomputation. The sums are rebuilt from the window
+every `window` bars so floating-point drift can't accumulate.
+
+Returns that span a gap (weekends, closed index/commodity sessions) are left
+out rather than counted as one bar.
+"""
+import sys
+import os
+import threading
+from collections import deque
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.instruments import get_display_name
+from config.settings import get_settings
+
+settings = get_settings()
+
+TIMEFRAME_SECONDS = {'M5': 300, 'M15': 900, 'H1': 3600, 'H4': 14400, 'D': 86400}
+
+# Bucket shift (seconds) so sessions opening at 21:00-22:00 UTC (OANDA) and
+# 00:00 ET (yfinance daily) share a bucket
+BUCKET_OFFSETS = {'H4': 3 * 3600, 'D': 3 * 3600}
+
+INSTRUMENTS = tuple(
+    [get_display_name(pair) for pair in settings.OANDA_PAIRS] +
+    [standard_symbol for _, standard_symbol, _ in settings.YFINANCE_INSTRUMENTS]
+)
+
+
+def bar_returns(series, timeframe):
+    """
+    Bucketed log returns of one CandleSeries
+
+    Returns:
+        tuple: (buckets int64, returns float64) for bars whose previous bar is
+            the preceding bucket; (empty, empty) if there are fewer than 2 bars
+    """
+    period = TIMEFRAME_SECONDS[timeframe]
+    seconds = series.times // 1_000_000_000
+    buckets = (seconds + BUCKET_OFFSETS.get(timeframe, 0)) // period
+    close = series.close.astype(np.float64)
+
+    # Several candles in one bucket (shifted sessions): keep the last
+    if len(buckets) > 1:
+        last = np.append(buckets[1:] != buckets[:-1], True)
+        buckets, close = buckets[last], close[last]
+    if len(buckets) < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        returns = np.log(close[1:] / close[:-1])
+    contiguous = (buckets[1:] == buckets[:-1] + 1) & np.isfinite(returns)
+    return buckets[1:][contiguous], returns[contiguous]
+
+
+class _RollingWindow:
+    """Return rows of one timeframe and their pairwise-complete sums"""
+
+    def __init__(self, size, window):
+        self.window = window
+        self.rows = deque()  # (bucket, returns[size] with NaN for missing)
+        self.last_bucket = None
+        self._pushes = 0
+        shape = (size, size)
+        self.n = np.zeros(shape)
+        self.sx = np.zeros(shape)    # sx[i, j] = Σ x_i over bars where i and j both have returns
+        self.sxx = np.zeros(shape)
+        self.sxy = np.zeros(shape)
+
+    def _apply(self, returns, sign):
+        valid = ~np.isnan(returns)
+        x = np.where(valid, returns, 0.0)
+        v = valid.astype(np.float64)
+        self.n += sign * np.outer(v, v)
+        self.sx += sign * np.outer(x, v)
+        self.sxx += sign * np.outer(x * x, v)
+        self.sxy += sign * np.outer(x, x)
+
+    def push(self, bucket, returns):
+        self.rows.append((bucket, returns))
+        self._apply(returns, 1.0)
+        if len(self.rows) > self.window:
+            _, oldest = self.rows.popleft()
+            self._apply(oldest, -1.0)
+        self.last_bucket = bucket
+
+        self._pushes += 1
+        if self._pushes >= self.window:
+            self._rebuild()
+
+    def _rebuild(self):
+        """Recompute the sums from the rows (bounds drift from add/subtract)"""
+        matrix = np.array([returns for _, returns in self.rows])
+        valid = ~np.isnan(matrix)
+        x = np.where(valid, matrix, 0.0)
+        v = valid.astype(np.float64)
+        self.n = v.T @ v
+        self.sx = x.T @ v
+        self.sxx = (x * x).T @ v
+        self.sxy = x.T @ x
+        self._pushes = 0
+
+    def correlation(self, min_periods):
+        """Correlation matrix; NaN where a pair shares fewer than min_periods bars"""
+        n = self.n
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self.sxy - self.sx * self.sx.T / n
+            var = self.sxx - self.sx ** 2 / n
+            corr = cov / np.sqrt(var * var.T)
+        corr = np.clip(corr, -1.0, 1.0)
+        corr[(n < min_periods) | ~np.isfinite(corr)] = np.nan
+        return corr
+
+
+class CorrelationEngine:
+    def __init__(self, instruments=INSTRUMENTS, timeframes=settings.TIMEFRAMES, window=None, min_periods=None):
+        """
+        Args:
+            instruments: Display names, in matrix order
+            timeframes: Timeframes tracked
+            window: Bars in the rolling window (default CORRELATION_CONFIG)
+            min_periods: Shared bars before a pair is reported (default CORRELATION_CONFIG)
+        """
+        self.instruments = tuple(instruments)
+        self.timeframes = tuple(timeframes)
+        self.window = window or settings.CORRELATION_CONFIG['window']
+        self.min_periods = min_periods or settings.CORRELATION_CONFIG['min_periods']
+        self._lock = threading.Lock()
+        self._windows = {tf: _RollingWindow(len(self.instruments), self.window) for tf in self.timeframes}
+
+    def update(self, candle_store):
+        """
+        Add the bars that closed since the last update
+
+        A bar is added once a later bar exists for any instrument, so candles
+        still forming (yfinance) are only counted after they close.
+
+        Args:
+            candle_store: utils.candle_store.CandleStore holding the latest scan
+
+        Returns:
+            dict: {timeframe: bars added}
+        """
+        added = {}
+        for tf in self.timeframes:
+            returns = {}
+            for index, instrument in enumerate(self.instruments):
+                series = candle_store.get(instrument, tf)
+                if series is not None and len(series) > 1:
+                    returns[index] = bar_returns(series, tf)
+            with self._lock:
+                added[tf] = self._add_bars(self._windows[tf], returns)
+        return added
+
+    def _add_bars(self, state, returns):
+        latest = [buckets[-1] for buckets, _ in returns.values() if len(buckets)]
+        if not latest:
+            return 0
+        horizon = max(latest)
+        start = state.last_bucket if state.last_bucket is not None else horizon - self.window - 1
+
+        # Closed buckets not seen yet, across all instruments
+        new = [buckets[(buckets > start) & (buckets < horizon)] for buckets, _ in returns.values()]
+        new = np.unique(np.concatenate(new))
+        if not len(new):
+            return 0
+
+        rows = np.full((len(new), len(self.instruments)), np.nan)
+        for index, (buckets, values) in returns.items():
+            keep = (buckets > start) & (buckets < horizon)
+            rows[np.searchsorted(new, buckets[keep]), index] = values[keep]
+
+        for bucket, row in zip(new.tolist(), rows):
+            state.push(bucket, row)
+        return len(new)
+
+    def matrix(self, timeframe):
+        """
+        Current correlation matrix of one timeframe
+
+        Returns:
+            dict: {'timeframe', 'instruments', 'matrix' (rows of floats, None
+                where a pair has too few shared bars), 'samples' (shared bars
+                per pair), 'bars', 'window', 'min_periods'}
+        """
+        with self._lock:
+            state = self._windows[timeframe]
+            corr = state.correlation(self.min_periods)
+            samples = state.n.astype(np.int64)
+            bars = len(state.rows)
+
+        return {
+            'timeframe': timeframe,
+            'instruments': list(self.instruments),
+            'matrix': [[None if np.isnan(value) else round(float(value), 4) for value in row] for row in corr],
+            'samples': samples.tolist(),
+            'bars': bars,
+            'window': self.window,
+            'min_periods': self.min_periods,
+        }
+
+    def snapshot(self):
+        """{timeframe: matrix(timeframe)} for every timeframe"""
+        return {tf: self.matrix(tf) for tf in self.timeframes}
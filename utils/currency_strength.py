@@ -0,0 +1,166 @@
+"""
+Currency Strength for V3
+Per-currency strength (USD, EUR, GBP, JPY, AUD) solved from the 8 forex pairs.
+
+Every pair BASE/QUOTE contributes one equation, strength[BASE] -
+strength[QUOTE] = pair move, for two measures read from the indicator cache
+(return over the last bars and MA slope, in %). The least-squares solution
+with strengths summing to zero is the minimum-norm one, so one
+pseudo-inverse of the pair/currency design matrix, computed once, solves
+every timeframe and measure in a single matrix product. A timeframe that is
+missing pairs falls back to lstsq over the pairs it has.
+
+Strength is the mean of the return and MA-slope solutions. The confidence
+scorer rewards signals whose base is stronger than the quote in the
+direction traded (CURRENCY_STRENGTH_CONFIG).
+"""
+import sys
+import os
+import threading
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.instruments import get_display_name
+from config.settings import get_settings
+
+settings = get_settings()
+
+MEASURES = ('return', 'ma_slope')
+
+# (display name, base, quote) per forex pair
+PAIRS = tuple((get_display_name(pair), *pair.split('_')) for pair in settings.OANDA_PAIRS)
+
+# Currencies in order of first appearance
+CURRENCIES = tuple(dict.fromkeys(currency for _, base, quote in PAIRS for currency in (base, quote)))
+
+
+def design_matrix(pairs, currencies):
+    """+1 for the base and -1 for the quote of every pair (pairs x currencies)"""
+    index = {currency: i for i, currency in enumerate(currencies)}
+    matrix = np.zeros((len(pairs), len(currencies)))
+    for row, (_, base, quote) in enumerate(pairs):
+        matrix[row, index[base]] = 1.0
+        matrix[row, index[quote]] = -1.0
+    return matrix
+
+
+def solve_strength(design, moves, pinv=None):
+    """
+    Sum-zero least-squares strengths for every column of moves
+
+    Args:
+        design: design_matrix() (pairs x currencies)
+        moves: Pair moves (pairs x columns), NaN where a pair is missing
+        pinv: Precomputed pseudo-inverse of design
+
+    Returns:
+        ndarray: Strengths (currencies x columns); NaN for currencies with no
+            pair in a column
+    """
+    pinv = np.linalg.pinv(design) if pinv is None else pinv
+    present = ~np.isnan(moves)
+    complete = present.all(axis=0)
+
+    strengths = np.full((design.shape[1], moves.shape[1]), np.nan)
+    strengths[:, complete] = pinv @ moves[:, complete]
+
+    for column in np.flatnonzero(~complete):
+        rows = present[:, column]
+        if not rows.any():
+            continue
+        # Minimum-norm again: zero-sum within every connected group of currencies
+        solution = np.linalg.lstsq(design[rows], moves[rows, column], rcond=None)[0]
+        covered = np.abs(design[rows]).sum(axis=0) > 0
+        strengths[covered, column] = solution[covered]
+    return strengths
+
+
+class CurrencyStrength:
+    def __init__(self, indicator_cache, pairs=PAIRS, timeframes=settings.TIMEFRAMES):
+        """
+        Args:
+            indicator_cache: utils.indicator_cache.IndicatorCache
+            pairs: (display name, base, quote) tuples
+            timeframes: Timeframes solved
+        """
+        self.indicator_cache = indicator_cache
+        self.pairs = tuple(pairs)
+        self.pair_names = frozenset(name for name, _, _ in self.pairs)
+        self.currencies = tuple(dict.fromkeys(c for _, base, quote in self.pairs for c in (base, quote)))
+        self.timeframes = tuple(timeframes)
+        self.design = design_matrix(self.pairs, self.currencies)
+        self._pinv = np.linalg.pinv(self.design)
+        self._lock = threading.Lock()
+        self._strength = {}  # timeframe -> {measure: ndarray[currencies]}
+        self.updated_at = None
+
+    def update(self):
+        """
+        Re-solve all timeframes from the indicator cache
+
+        Returns:
+            int: Pair readings used
+        """
+        # Columns: every (measure, timeframe)
+        moves = np.full((len(self.pairs), len(MEASURES) * len(self.timeframes)), np.nan)
+        for row, (name, _, _) in enumerate(self.pairs):
+            for t, tf in enumerate(self.timeframes):
+                values = self.indicator_cache.get(name, tf)
+                if values is None:
+                    continue
+                for m, measure in enumerate(MEASURES):
+                    moves[row, m * len(self.timeframes) + t] = values[measure]
+
+        solved = solve_strength(self.design, moves, self._pinv)
+
+        strength = {}
+        for t, tf in enumerate(self.timeframes):
+            by_measure = {measure: solved[:, m * len(self.timeframes) + t] for m, measure in enumerate(MEASURES)}
+            by_measure['strength'] = np.mean([by_measure[measure] for measure in MEASURES], axis=0)
+            by_measure['pairs'] = int((~np.isnan(moves[:, t])).sum())
+            strength[tf] = by_measure
+
+        with self._lock:
+            self._strength = strength
+            self.updated_at = time.time()
+        return int((~np.isnan(moves)).sum())
+
+    def differential(self, instrument, timeframe):
+        """strength[base] - strength[quote] for a forex pair, or None"""
+        pair = next((p for p in self.pairs if p[0] == instrument), None)
+        with self._lock:
+            solved = self._strength.get(timeframe)
+        if pair is None or solved is None:
+            return None
+        _, base, quote = pair
+        value = solved['strength'][self.currencies.index(base)] - solved['strength'][self.currencies.index(quote)]
+        return None if np.isnan(value) else float(value)
+
+    def snapshot(self):
+        """
+        Strengths for the API / dashboard
+
+        Returns:
+            dict: {'currencies', 'updated_at', 'timeframes': {tf: {'pairs',
+                'strength', 'return', 'ma_slope' ({currency: % or None})}}}
+        """
+        with self._lock:
+            solved = dict(self._strength)
+            updated_at = self.updated_at
+
+        def by_currency(values):
+            return {c: None if np.isnan(v) else round(float(v), 4) for c, v in zip(self.currencies, values)}
+
+        return {
+            'currencies': list(self.currencies),
+            'updated_at': updated_at,
+            'timeframes': {
+                tf: {
+                    'pairs': values['pairs'],
+                    **{key: by_currency(values[key]) for key in ('strength',) + MEASURES},
+                }
+                for tf, values in solved.items()
+            },
+        }
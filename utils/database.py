@@ -0,0 +1,379 @@
+"""
+Database for V3
+Thin access layer for the performance-tracking tables in database_schema.sql.
+
+PostgreSQL (DATABASE_URL=postgresql://...) is used through a psycopg2
+connection pool; without it a local SQLite file (WAL mode) holds the same
+tables. Statements are written with '?' placeholders and translated for
+PostgreSQL.
+"""
+import os
+import sqlite3
+import threading
+import uuid
+from contextlib import contextmanager
+
+# SQLite version of the tables in database_schema.sql that the screener writes
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS signals (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    timestamp TEXT DEFAULT CURRENT_TIMESTAMP,
+    instrument TEXT NOT NULL,
+    strategy TEXT NOT NULL,
+    signal_type TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    entry_price REAL,
+    stop_loss REAL,
+    take_profit REAL,
+    m5_signal INTEGER,
+    m15_signal INTEGER,
+    h1_signal INTEGER,
+    h4_signal INTEGER,
+    d_signal INTEGER,
+    m5_adx TEXT,
+    m15_adx TEXT,
+    h1_adx TEXT,
+    h4_adx TEXT,
+    d_adx TEXT,
+    overall_score INTEGER,
+    alignment_score INTEGER,
+    daily_pivot REAL,
+    r1 REAL,
+    r2 REAL,
+    r3 REAL,
+    s1 REAL,
+    s2 REAL,
+    s3 REAL,
+    pattern TEXT,
+    scan_id INTEGER,
+    is_new INTEGER,
+    alerted INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS signal_outcomes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    signal_id INTEGER REFERENCES signals(id),
+    outcome TEXT,
+    close_price REAL,
+    pips_gained REAL,
+    profit_loss REAL,
+    closed_at TEXT,
+    duration_hours INTEGER,
+    notes TEXT
+);
+
+CREATE TABLE IF NOT EXISTS daily_performance (
+    date TEXT PRIMARY KEY,
+    total_signals INTEGER DEFAULT 0,
+    signals_taken INTEGER DEFAULT 0,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    win_rate REAL,
+    total_pips REAL,
+    total_profit REAL,
+    max_drawdown REAL,
+    best_trade REAL,
+    worst_trade REAL,
+    average_confidence REAL,
+    confidence_sum REAL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS strategy_performance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    strategy TEXT NOT NULL,
+    period TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    total_signals INTEGER DEFAULT 0,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    win_rate REAL,
+    average_pips REAL,
+    total_pips REAL DEFAULT 0,
+    total_profit REAL,
+    average_confidence REAL,
+    confidence_sum REAL DEFAULT 0,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS instrument_performance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    instrument TEXT NOT NULL,
+    period TEXT,
+    start_date TEXT,
+    end_date TEXT,
+    total_signals INTEGER DEFAULT 0,
+    wins INTEGER DEFAULT 0,
+    losses INTEGER DEFAULT 0,
+    win_rate REAL,
+    average_pips REAL,
+    total_pips REAL DEFAULT 0,
+    total_profit REAL,
+    best_strategy TEXT,
+    average_confidence REAL,
+    confidence_sum REAL DEFAULT 0,
+    updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    signal_id INTEGER REFERENCES signals(id),
+    opened_at TEXT DEFAULT CURRENT_TIMESTAMP,
+    instrument TEXT NOT NULL,
+    direction TEXT NOT NULL,
+    entry_price REAL NOT NULL,
+    stop_loss REAL NOT NULL,
+    take_profit REAL NOT NULL,
+    position_size REAL NOT NULL,
+    risk_amount REAL NOT NULL,
+    risk_percent REAL NOT NULL,
+    closed_at TEXT,
+    close_price REAL,
+    outcome TEXT,
+    pips_gained REAL,
+    profit_loss REAL,
+    account_balance_before REAL,
+    account_balance_after REAL,
+    notes TEXT
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS idx_strategy_performance_key
+    ON strategy_performance(strategy, period, start_date);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_instrument_performance_key
+    ON instrument_performance(instrument, period, start_date);
+
+CREATE INDEX IF NOT EXISTS idx_signals_instrument ON signals(instrument);
+CREATE INDEX IF NOT EXISTS idx_signals_timestamp ON signals(timestamp);
+CREATE INDEX IF NOT EXISTS idx_signals_confidence ON signals(confidence);
+CREATE INDEX IF NOT EXISTS idx_signals_series ON signals(instrument, strategy, scan_id);
+CREATE INDEX IF NOT EXISTS idx_outcomes_signal_id ON signal_outcomes(signal_id);
+CREATE INDEX IF NOT EXISTS idx_trades_instrument ON trades(instrument);
+CREATE INDEX IF NOT EXISTS idx_trades_opened_at ON trades(opened_at);
+"""
+
+# Columns added after a table was first created: (table, column, type)
+SQLITE_MIGRATIONS = (
+    ('signals', 'alignment_score', 'INTEGER'),
+    ('signals', 'is_new', 'INTEGER'),
+)
+
+# Fills a migrated column for existing rows: (table, column) -> statement
+SQLITE_BACKFILLS = {
+    # New unless the previous scan had the same direction (as SignalRecorder decides)
+    ('signals', 'is_new'): (
+        "UPDATE signals SET is_new = NOT EXISTS (SELECT 1 FROM signals p "
+        "WHERE p.instrument = signals.instrument AND p.strategy = signals.strategy "
+        "AND p.signal_type = signals.signal_type AND p.scan_id = signals.scan_id - 1) "
+        "WHERE is_new IS NULL"
+    ),
+}
+
+
+def is_postgres_url(url):
+    return bool(url) and url.startswith(('postgres://', 'postgresql://'))
+
+
+class Database:
+    def __init__(self, url=None, sqlite_path=None, pool_size=5, max_streams=2):
+        """
+        Args:
+            url: PostgreSQL URL; if empty, sqlite_path is used
+            sqlite_path: SQLite database file (created with the schema above)
+            pool_size: Maximum PostgreSQL connections
+            max_streams: Concurrent stream() readers; capped at pool_size - 1
+                so a slow export never takes the writer's last connection
+        """
+        self.max_streams = max(1, min(max_streams, pool_size - 1))
+        self._stream_slots = threading.BoundedSemaphore(self.max_streams)
+
+        if is_postgres_url(url):
+            # Imported here so SQLite-only installs don't need psycopg2
+            from psycopg2.pool import ThreadedConnectionPool
+
+            self.dialect = 'postgres'
+            self._pool = ThreadedConnectionPool(1, pool_size, url)
+            self.description = 'PostgreSQL'
+        else:
+            if not sqlite_path:
+                raise ValueError("Database needs a PostgreSQL URL or a SQLite path")
+            self.dialect = 'sqlite'
+            self.path = sqlite_path
+            directory = os.path.dirname(sqlite_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+            # sqlite3 connections can't be shared between threads
+            self._local = threading.local()
+            conn = self._sqlite_connection()
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SQLITE_SCHEMA)
+            self._migrate_sqlite(conn)
+            self.description = f"SQLite ({sqlite_path})"
+
+    def _sqlite_connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit; transaction() opens transactions explicitly
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA busy_timeout=30000')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def _migrate_sqlite(conn):
+        for table, column, column_type in SQLITE_MIGRATIONS:
+            columns = {row[1] for row in conn.execute(f'PRAGMA table_info({table})')}
+            if column not in columns:
+                conn.execute(f'ALTER TABLE {table} ADD COLUMN {column} {column_type}')
+                backfill = SQLITE_BACKFILLS.get((table, column))
+                if backfill:
+                    conn.execute(backfill)
+
+    def sql(self, statement):
+        """Translate '?' placeholders for the active dialect"""
+        if self.dialect == 'postgres':
+            return statement.replace('?', '%s')
+        return statement
+
+    @contextmanager
+    def transaction(self):
+        """
+        Cursor inside one transaction (committed on success, rolled back on error)
+
+        Statements passed to the cursor must already be translated with sql().
+        """
+        if self.dialect == 'postgres':
+            conn = self._pool.getconn()
+            try:
+                with conn:  # psycopg2: commit / rollback
+                    with conn.cursor() as cursor:
+                        yield cursor
+            finally:
+                self._pool.putconn(conn)
+            return
+
+        conn = self._sqlite_connection()
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            yield cursor
+        except Exception:
+            cursor.execute('ROLLBACK')
+            raise
+        else:
+            cursor.execute('COMMIT')
+        finally:
+            cursor.close()
+
+    def execute(self, statement, params=()):
+        """Run one statement in its own transaction; returns the affected row count"""
+        with self.transaction() as cursor:
+            cursor.execute(self.sql(statement), params)
+            return cursor.rowcount
+
+    def executemany(self, statement, rows):
+        """Run one statement for every row in a single transaction"""
+        if not rows:
+            return 0
+        with self.transaction() as cursor:
+            cursor.executemany(self.sql(statement), rows)
+        return len(rows)
+
+    def query(self, statement, params=()):
+        """Fetch all rows of a SELECT as tuples"""
+        with self.transaction() as cursor:
+            cursor.execute(self.sql(statement), params)
+            return cursor.fetchall()
+
+    def reserve_stream(self):
+        """
+        Claim one of the max_streams stream slots without blocking
+
+        Callers hold the slot for as long as their stream() is being consumed
+        (on PostgreSQL each holds a pooled connection for that long).
+
+        Returns:
+            callable: Releases the slot (safe to call more than once), or None
+                if every slot is taken
+        """
+        if not self._stream_slots.acquire(blocking=False):
+            return None
+        released = threading.Event()
+
+        def release():
+            if not released.is_set():
+                released.set()
+                self._stream_slots.release()
+        return release
+
+    def stream(self, statement, params=(), chunk_size=1000):
+        """
+        Yield the rows of a SELECT without loading the whole result
+
+        Hold a reserve_stream() slot while consuming it.
+
+        PostgreSQL uses a server-side (named) cursor that fetches chunk_size
+        rows per round trip. SQLite reads through its own connection in
+        autocommit mode, so a slow consumer never holds the write lock the
+        recorder needs. Closing the generator early releases the cursor.
+
+        Yields:
+            tuple: One row at a time
+        """
+        if self.dialect == 'postgres':
+            conn = self._pool.getconn()
+            try:
+                with conn:
+                    with conn.cursor(name=f'stream_{uuid.uuid4().hex}') as cursor:
+                        cursor.itersize = chunk_size
+                        cursor.execute(self.sql(statement), params)
+                        yield from cursor
+            finally:
+                self._pool.putconn(conn)
+            return
+
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        try:
+            cursor = conn.execute(statement, params)
+            while True:
+                rows = cursor.fetchmany(chunk_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            conn.close()
+
+    def close(self):
+        if self.dialect == 'postgres':
+            self._pool.closeall()
+        else:
+            conn = getattr(self._local, 'conn', None)
+            if conn is not None:
+                conn.close()
+                self._local.conn = None
+
+
+def create_database(url=None, sqlite_path=None, pool_size=None, max_streams=None):
+    """
+    Database from config (DATABASE_URL, else SIGNAL_DB_PATH)
+
+    Args default to the config values; returns None if it can't be opened.
+    """
+    from config.settings import get_settings
+    settings = get_settings()
+
+    url = settings.DATABASE_URL if url is None else url
+    try:
+        database = Database(
+            url,
+            sqlite_path or settings.SIGNAL_DB_PATH,
+            pool_size or settings.DATABASE_POOL_SIZE,
+            max_streams or settings.EXPORT_MAX_STREAMS
+        )
+    except Exception as e:
+        print(f"[ERROR] Could not open signal database: {str(e)}")
+        return None
+
+    print(f"[OK] Signal database: {database.description}")
+    return database
@@ -0,0 +1,144 @@
+"""
+Economic Event Calendar for V3
+Time-indexed Forex Factory events per currency, so "is there a high-impact
+event for either leg of this instrument within ±N minutes?" is a binary
+search instead of a scan over the week's calendar.
+"""
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timezone
+
+# Currencies whose news moves non-FX instruments (6-letter FX symbols split into legs)
+INSTRUMENT_LEGS = {
+    'XAUUSD': ('XAU', 'USD'),
+    'WTI': ('USD',),
+    'NAS100': ('USD',),
+}
+
+# Forex Factory lists some events (e.g. holidays) under 'All'
+ALL_CURRENCIES = 'ALL'
+
+
+def instrument_legs(instrument):
+    """
+    Currencies whose events affect an instrument
+
+    Args:
+        instrument: Display name ('EURUSD', 'XAUUSD', 'WTI') or OANDA symbol ('EUR_USD')
+
+    Returns:
+        tuple: Currency codes
+    """
+    name = instrument.replace('_', '').upper()
+    if name in INSTRUMENT_LEGS:
+        return INSTRUMENT_LEGS[name]
+    if len(name) == 6:
+        return (name[:3], name[3:])
+    return ()
+
+
+def parse_event_time(value):
+    """Forex Factory ISO timestamp -> UTC epoch seconds (None if unparseable)"""
+    if not value:
+        return None
+    try:
+        when = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return when.timestamp()
+
+
+class EventCalendar:
+    def __init__(self, impacts=('High',)):
+        """
+        Args:
+            impacts: Forex Factory impact levels to index
+        """
+        self.impacts = set(impacts)
+        self._lock = threading.Lock()
+        # {currency: (sorted epoch times, events in the same order)}; replaced wholesale
+        self._index = {}
+        self.updated_at = None
+
+    def update(self, events):
+        """
+        Rebuild the index from a Forex Factory calendar
+
+        Args:
+            events: Raw calendar events ({'title', 'country', 'date', 'impact', ...})
+
+        Returns:
+            int: Number of events indexed
+        """
+        by_currency = {}
+        for event in events or []:
+            if event.get('impact') not in self.impacts:
+                continue
+            timestamp = parse_event_time(event.get('date'))
+            if timestamp is None:
+                continue
+
+            currency = (event.get('country') or '').upper()
+            entry = {
+                'title': event.get('title', ''),
+                'currency': currency,
+                'impact': event.get('impact'),
+                'date': event.get('date'),
+                'timestamp': timestamp,
+            }
+            by_currency.setdefault(currency, []).append((timestamp, entry))
+
+        index = {}
+        for currency, entries in by_currency.items():
+            entries.sort(key=lambda item: item[0])
+            index[currency] = ([t for t, _ in entries], [e for _, e in entries])
+
+        with self._lock:
+            self._index = index
+            self.updated_at = time.time()
+
+        return sum(len(times) for times, _ in index.values())
+
+    def events_near(self, instrument, when=None, window_minutes=60):
+        """
+        Indexed events for either leg of an instrument within ±window
+
+        Args:
+            instrument: Instrument name (see instrument_legs)
+            when: Epoch seconds to search around (default: now)
+            window_minutes: Half-width of the window
+
+        Returns:
+            list: Matching events, nearest first
+        """
+        when = time.time() if when is None else when
+        window = window_minutes * 60
+        index = self._index  # Reference read; update() swaps in a new dict
+
+        matches = []
+        for currency in instrument_legs(instrument) + (ALL_CURRENCIES,):
+            entry = index.get(currency)
+            if entry is None:
+                continue
+            times, events = entry
+            lo = bisect_left(times, when - window)
+            hi = bisect_right(times, when + window)
+            matches.extend(events[lo:hi])
+
+        matches.sort(key=lambda event: abs(event['timestamp'] - when))
+        return matches
+
+    def next_event(self, instrument, when=None, window_minutes=60):
+        """Nearest event within the window, or None"""
+        matches = self.events_near(instrument, when, window_minutes)
+        return matches[0] if matches else None
+
+    def __len__(self):
+        return sum(len(times) for times, _ in self._index.values())
+
+
+# Process-wide calendar, refreshed by NewsFetcher and read by the scorer and alerts
+event_calendar = EventCalendar()
@@ -0,0 +1,134 @@
+"""
+Event Stream for V3
+Fan-out of dashboard updates to Server-Sent Events subscribers
+"""
+import json
+import queue
+import threading
+from datetime import datetime
+
+from utils.metrics import registry
+from utils.results_snapshot import json_default
+
+# Seconds between heartbeat events on an idle stream
+HEARTBEAT_INTERVAL = 15
+
+# Events buffered per subscriber before the oldest are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+STREAMS_REJECTED = registry.counter(
+    'screener_sse_streams_rejected_total',
+    'Event stream connections refused because the worker was at its stream limit'
+)
+
+
+def format_sse(event, data, event_id=None):
+    """
+    Format one Server-Sent Events message
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+        event_id: Optional id (lets the browser send Last-Event-ID)
+
+    Returns:
+        str: Wire-format message
+    """
+    message = ''
+    if event_id is not None:
+        message += f'id: {event_id}\n'
+    message += f'event: {event}\n'
+    message += f'data: {json.dumps(data, default=json_default, separators=(",", ":"))}\n\n'
+    return message
+
+
+class EventBroadcaster:
+    """Publishes events to every connected stream without blocking the publisher"""
+
+    def __init__(self, queue_size=SUBSCRIBER_QUEUE_SIZE, max_subscribers=None):
+        """
+        Args:
+            queue_size: Events buffered per subscriber
+            max_subscribers: Concurrent streams allowed (None: unlimited); each
+                open stream holds a server thread
+        """
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def subscribe(self):
+        """
+        Register a new subscriber queue
+
+        Returns:
+            queue.Queue or None: None when max_subscribers streams are open
+        """
+        subscriber = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            if self.max_subscribers is not None and len(self._subscribers) >= self.max_subscribers:
+                STREAMS_REJECTED.inc()
+                return None
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, event, data, event_id=None):
+        """
+        Send an event to all subscribers
+
+        The message is formatted once and shared. A subscriber that has
+        fallen behind loses its oldest buffered message rather than
+        stalling the scanner.
+        """
+        message = format_sse(event, data, event_id)
+
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(message)
+            except queue.Full:
+                try:
+                    subscriber.get_nowait()
+                except queue.Empty:
+                    pass
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    pass
+
+    def stream(self, subscriber, initial_messages=(), heartbeat_interval=HEARTBEAT_INTERVAL):
+        """
+        Generator yielding SSE messages for one client
+
+        Args:
+            subscriber: Queue from subscribe() (unsubscribed when the stream ends)
+            initial_messages: Messages sent right after connecting
+            heartbeat_interval: Seconds of silence before a heartbeat
+
+        Yields:
+            str: Wire-format SSE messages
+        """
+        try:
+            # Ask the browser to wait 5s before reconnecting
+            yield 'retry: 5000\n\n'
+            for message in initial_messages:
+                yield message
+
+            while True:
+                try:
+                    yield subscriber.get(timeout=heartbeat_interval)
+                except queue.Empty:
+                    yield format_sse('heartbeat', {'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S')})
+        finally:
+            self.unsubscribe(subscriber)
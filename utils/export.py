@@ -0,0 +1,261 @@
+"""
+Signal Export for V3
+CSV / NDJSON exports of the signals and trades tables.
+
+Rows are streamed from a server-side cursor (Database.stream) through a
+generator into the response, so memory stays flat however many months are
+exported. Filters: instrument, strategy, min/max confidence and a date range.
+Each export holds a Database.reserve_stream() slot until its response closes.
+"""
+import csv
+import io
+import json
+import sys
+import os
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import registry
+
+EXPORT_ROWS = registry.counter(
+    'screener_export_rows_total',
+    'Rows streamed by /api/export',
+    ('table',)
+)
+EXPORTS_REJECTED = registry.counter(
+    'screener_exports_rejected_total',
+    'Exports refused because every stream slot was taken'
+)
+
+FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Rows per response chunk
+CHUNK_ROWS = 500
+
+# Per export: (header, SQL expression) columns, FROM clause, date column,
+# and the columns the instrument / strategy / confidence filters apply to
+EXPORTS = {
+    'signals': {
+        'columns': (
+            ('id', 's.id'),
+            ('timestamp', 's.timestamp'),
+            ('instrument', 's.instrument'),
+            ('strategy', 's.strategy'),
+            ('signal_type', 's.signal_type'),
+            ('confidence', 's.confidence'),
+            ('entry_price', 's.entry_price'),
+            ('stop_loss', 's.stop_loss'),
+            ('take_profit', 's.take_profit'),
+            ('overall_score', 's.overall_score'),
+            ('alignment_score', 's.alignment_score'),
+            ('pattern', 's.pattern'),
+            ('scan_id', 's.scan_id'),
+            ('is_new', 's.is_new'),
+            ('outcome', 'o.outcome'),
+            ('close_price', 'o.close_price'),
+            ('pips_gained', 'o.pips_gained'),
+            ('profit_loss', 'o.profit_loss'),
+            ('closed_at', 'o.closed_at'),
+            ('duration_hours', 'o.duration_hours'),
+        ),
+        'from': 'signals s LEFT JOIN signal_outcomes o ON o.signal_id = s.id',
+        'date': 's.timestamp',
+        'instrument': 's.instrument',
+        'order': 's.timestamp, s.id',
+    },
+    'trades': {
+        'columns': (
+            ('id', 't.id'),
+            ('signal_id', 't.signal_id'),
+            ('opened_at', 't.opened_at'),
+            ('instrument', 't.instrument'),
+            ('strategy', 's.strategy'),
+            ('confidence', 's.confidence'),
+            ('direction', 't.direction'),
+            ('entry_price', 't.entry_price'),
+            ('stop_loss', 't.stop_loss'),
+            ('take_profit', 't.take_profit'),
+            ('position_size', 't.position_size'),
+            ('risk_amount', 't.risk_amount'),
+            ('risk_percent', 't.risk_percent'),
+            ('closed_at', 't.closed_at'),
+            ('close_price', 't.close_price'),
+            ('outcome', 't.outcome'),
+            ('pips_gained', 't.pips_gained'),
+            ('profit_loss', 't.profit_loss'),
+            ('account_balance_before', 't.account_balance_before'),
+            ('account_balance_after', 't.account_balance_after'),
+            ('notes', 't.notes'),
+        ),
+        'from': 'trades t LEFT JOIN signals s ON s.id = t.signal_id',
+        'date': 't.opened_at',
+        'instrument': 't.instrument',
+        'order': 't.opened_at, t.id',
+    },
+}
+
+
+def _split(value):
+    """'EURUSD, gbpusd' -> ['EURUSD', 'GBPUSD']"""
+    return [part.strip() for part in (value or '').split(',') if part.strip()]
+
+
+def _parse_date(value, name):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"{name} must be YYYY-MM-DD, got '{value}'")
+
+
+def parse_export_filters(args):
+    """
+    Export filters from query parameters
+
+    Args:
+        args: Mapping with any of instrument, strategy (comma-separated),
+            min_confidence, max_confidence, start, end (YYYY-MM-DD, inclusive)
+
+    Returns:
+        dict: Normalized filters
+
+    Raises:
+        ValueError: On an unparseable confidence or date
+    """
+    filters = {
+        'instruments': [name.upper().replace('/', '').replace('_', '') for name in _split(args.get('instrument'))],
+        'strategies': _split(args.get('strategy')),
+    }
+
+    for name in ('min_confidence', 'max_confidence'):
+        value = args.get(name)
+        if value in (None, ''):
+            filters[name] = None
+            continue
+        try:
+            filters[name] = float(value)
+        except ValueError:
+            raise ValueError(f"{name} must be a number, got '{value}'")
+
+    filters['start'] = _parse_date(args['start'], 'start') if args.get('start') else None
+    filters['end'] = _parse_date(args['end'], 'end') if args.get('end') else None
+    if filters['start'] and filters['end'] and filters['start'] > filters['end']:
+        raise ValueError('start is after end')
+    return filters
+
+
+def export_query(table, filters):
+    """
+    SELECT for one export with its filters applied
+
+    Args:
+        table: 'signals' or 'trades'
+        filters: parse_export_filters() result
+
+    Returns:
+        tuple: (statement with '?' placeholders, params, header)
+    """
+    spec = EXPORTS[table]
+    where, params = [], []
+
+    if filters['instruments']:
+        where.append(f"{spec['instrument']} IN ({', '.join('?' * len(filters['instruments']))})")
+        params.extend(filters['instruments'])
+    if filters['strategies']:
+        where.append(f"s.strategy IN ({', '.join('?' * len(filters['strategies']))})")
+        params.extend(filters['strategies'])
+    if filters['min_confidence'] is not None:
+        where.append('s.confidence >= ?')
+        params.append(filters['min_confidence'])
+    if filters['max_confidence'] is not None:
+        where.append('s.confidence <= ?')
+        params.append(filters['max_confidence'])
+    # Timestamps are compared as text on SQLite, so bounds are plain dates and
+    # the end day is made inclusive by comparing against the following day
+    if filters['start']:
+        where.append(f"{spec['date']} >= ?")
+        params.append(filters['start'].isoformat())
+    if filters['end']:
+        where.append(f"{spec['date']} < ?")
+        params.append((filters['end'] + timedelta(days=1)).isoformat())
+
+    statement = (
+        f"SELECT {', '.join(expression for _, expression in spec['columns'])} FROM {spec['from']}"
+        + (f" WHERE {' AND '.join(where)}" if where else '')
+        + f" ORDER BY {spec['order']}"
+    )
+    return statement, params, [name for name, _ in spec['columns']]
+
+
+def _json_value(value):
+    """DECIMAL / TIMESTAMP (PostgreSQL) -> JSON-friendly values"""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def csv_chunks(header, rows, chunk_rows=CHUNK_ROWS):
+    """Header line, then CSV text in chunks of chunk_rows rows"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    count = 0
+    for row in rows:
+        writer.writerow([_json_value(value) for value in row])
+        count += 1
+        if count % chunk_rows == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_chunks(header, rows, chunk_rows=CHUNK_ROWS):
+    """One JSON object per line, in chunks of chunk_rows rows"""
+    lines = []
+    for row in rows:
+        lines.append(json.dumps({name: _json_value(value) for name, value in zip(header, row)}))
+        if len(lines) == chunk_rows:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def stream_export(database, table, filters, fmt='csv'):
+    """
+    Generator of response chunks for one export
+
+    The query only runs once the generator is first advanced, i.e. when the
+    response starts streaming.
+
+    Args:
+        database: utils.database.Database
+        table: 'signals' or 'trades'
+        filters: parse_export_filters() result
+        fmt: 'csv' or 'ndjson'
+    """
+    statement, params, header = export_query(table, filters)
+    chunks = csv_chunks if fmt == 'csv' else ndjson_chunks
+
+    def counted(rows):
+        count = 0
+        try:
+            for row in rows:
+                count += 1
+                yield row
+        finally:
+            EXPORT_ROWS.inc(count, table=table)
+
+    rows = database.stream(statement, params, chunk_size=CHUNK_ROWS * 2)
+    try:
+        yield from chunks(header, counted(rows))
+    finally:
+        rows.close()
@@ -0,0 +1,98 @@
+"""
+Indicator Cache for V3
+Per-bar indicator values shared across instruments, read from the candle store.
+
+Values are computed once per (instrument, timeframe) and bar; until a new
+candle arrives (or the last close changes) reads are dict lookups. Analytics
+that look at every instrument at once, such as the currency strength engine,
+can therefore recompute on every update without redoing the indicators.
+
+Entries are bounded like the candle store they mirror: at most max_series of
+them (least recently used evicted first), and an entry is dropped as soon as
+its series has left the store.
+"""
+import sys
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import get_settings
+
+settings = get_settings()
+
+
+class IndicatorCache:
+    def __init__(self, candle_store, return_bars=None, ma_period=None, slope_bars=None, max_entries=None):
+        """
+        Args:
+            candle_store: utils.candle_store.CandleStore
+            return_bars: Bars behind 'return' (default INDICATOR_CACHE_CONFIG)
+            ma_period: Simple MA behind 'ma_slope' (default INDICATOR_CACHE_CONFIG)
+            slope_bars: Bars behind 'ma_slope' (default INDICATOR_CACHE_CONFIG)
+            max_entries: Entries kept (default: the candle store's max_series)
+        """
+        self.candle_store = candle_store
+        self.return_bars = return_bars or settings.INDICATOR_CACHE_CONFIG['return_bars']
+        self.ma_period = ma_period or settings.INDICATOR_CACHE_CONFIG['ma_period']
+        self.slope_bars = slope_bars or settings.INDICATOR_CACHE_CONFIG['slope_bars']
+        self.min_bars = max(self.return_bars, self.ma_period + self.slope_bars) + 1
+        self.max_entries = max_entries or candle_store.max_series
+        self._lock = threading.Lock()
+        self._values = OrderedDict()  # (instrument, timeframe) -> (stamp, values), oldest first
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, instrument, timeframe):
+        """
+        Indicator values at the latest bar
+
+        Returns:
+            dict: {'time' (epoch ns), 'close', 'return' (%), 'ma_slope' (%)},
+                or None without enough candles
+        """
+        key = (instrument, timeframe)
+        series = self.candle_store.get(instrument, timeframe)
+        if series is None or len(series) < self.min_bars:
+            # Evicted from the candle store (or too short): drop the entry too
+            with self._lock:
+                if self._values.pop(key, None) is not None:
+                    self.evictions += 1
+            return None
+
+        stamp = (int(series.times[-1]), float(series.close[-1]))
+        with self._lock:
+            cached = self._values.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._values.move_to_end(key)
+                self.hits += 1
+                return cached[1]
+            self.misses += 1
+
+        values = self._compute(series)
+        with self._lock:
+            self._values[key] = (stamp, values)
+            self._values.move_to_end(key)
+            while len(self._values) > self.max_entries:
+                self._values.popitem(last=False)
+                self.evictions += 1
+        return values
+
+    def _compute(self, series):
+        # Only the tail the indicators need
+        close = series.close[-self.min_bars:].astype(np.float64)
+        ma = np.convolve(close, np.full(self.ma_period, 1.0 / self.ma_period), mode='valid')
+        return {
+            'time': int(series.times[-1]),
+            'close': float(close[-1]),
+            'return': float(100 * np.log(close[-1] / close[-1 - self.return_bars])),
+            'ma_slope': float(100 * np.log(ma[-1] / ma[-1 - self.slope_bars])),
+        }
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._values), 'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions}
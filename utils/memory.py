@@ -0,0 +1,167 @@
+"""
+Memory Accounting for V3
+tracemalloc-based per-stage allocation reporting and process RSS gauges
+exposed through /metrics.
+"""
+import os
+import sys
+import tracemalloc
+from contextlib import contextmanager
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from config.settings import get_settings
+from utils.metrics import registry
+
+settings = get_settings()
+
+
+def process_label():
+    """
+    Distinguishes the scanner's and each web worker's gauges in merged /metrics
+
+    Read at collection time, so a worker forked after import still reports
+    its own pid.
+    """
+    return settings.SCANNER_MODE if settings.SCANNER_MODE != 'web' else f"web-{os.getpid()}"
+
+
+# Byte buckets for per-stage allocation histograms (64 KB .. 512 MB)
+MEMORY_BUCKETS = tuple(2 ** power for power in range(16, 30))
+
+STAGE_MEMORY_PEAK = registry.histogram(
+    'screener_stage_memory_peak_bytes',
+    'Peak traced allocation above the stage start (MEMORY_TRACING only)',
+    ('stage',),
+    buckets=MEMORY_BUCKETS
+)
+STAGE_MEMORY_RETAINED = registry.histogram(
+    'screener_stage_memory_retained_bytes',
+    'Traced memory still allocated when the stage ends (MEMORY_TRACING only)',
+    ('stage',),
+    buckets=MEMORY_BUCKETS
+)
+TRACED_MEMORY = registry.gauge(
+    'screener_traced_memory_bytes',
+    'Memory currently traced by tracemalloc'
+)
+CANDLE_STORE_BYTES = registry.gauge(
+    'screener_candle_store_bytes',
+    'Bytes held by the candle store'
+)
+CANDLE_STORE_SERIES = registry.gauge(
+    'screener_candle_store_series',
+    'Instrument/timeframe series held by the candle store'
+)
+PEAK_RSS = registry.gauge(
+    'process_peak_resident_memory_bytes',
+    'Peak resident set size of the process',
+    ('process',)
+)
+RSS = registry.gauge(
+    'process_resident_memory_bytes',
+    'Current resident set size of the process',
+    ('process',)
+)
+
+
+def start_tracing(frames=1):
+    """Enable tracemalloc (costs CPU and memory, so only when requested)"""
+    if not tracemalloc.is_tracing():
+        tracemalloc.start(frames)
+        print("[INFO] tracemalloc memory tracing enabled")
+
+
+def tracing():
+    return tracemalloc.is_tracing()
+
+
+@contextmanager
+def trace_stage(stage):
+    """
+    Record the traced allocations of a scan stage
+
+    No-op unless tracing is enabled. Stages must not nest, since the
+    tracemalloc peak is reset at the start of each one.
+    """
+    if not tracemalloc.is_tracing():
+        yield
+        return
+
+    start, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    try:
+        yield
+    finally:
+        current, peak = tracemalloc.get_traced_memory()
+        STAGE_MEMORY_PEAK.observe(max(peak - start, 0), stage=stage)
+        STAGE_MEMORY_RETAINED.observe(max(current - start, 0), stage=stage)
+
+
+def traced_bytes():
+    """Memory currently traced by tracemalloc (0 when not tracing)"""
+    return tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+
+
+def top_allocations(limit=10):
+    """
+    Largest traced allocation sites
+
+    Returns:
+        list: [{'location', 'size', 'count'}] (empty when not tracing)
+    """
+    if not tracemalloc.is_tracing():
+        return []
+
+    statistics = tracemalloc.take_snapshot().statistics('lineno')
+    return [
+        {
+            'location': f"{os.path.basename(stat.traceback[0].filename)}:{stat.traceback[0].lineno}",
+            'size': stat.size,
+            'count': stat.count
+        }
+        for stat in statistics[:limit]
+    ]
+
+
+def peak_rss_bytes():
+    """Peak RSS from getrusage (None where unavailable)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def current_rss_bytes():
+    """Current RSS from /proc (None where unavailable)"""
+    try:
+        with open('/proc/self/statm') as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+def format_bytes(size):
+    return f"{size / (1024 * 1024):.1f} MB"
+
+
+def collect_memory_metrics():
+    """Registry collector refreshing the RSS and traced-memory gauges"""
+    peak = peak_rss_bytes()
+    if peak is not None:
+        PEAK_RSS.set(peak, process=process_label())
+
+    current = current_rss_bytes()
+    if current is not None:
+        RSS.set(current, process=process_label())
+
+    if tracemalloc.is_tracing():
+        TRACED_MEMORY.set(traced_bytes())
+
+
+registry.add_collector(collect_memory_metrics)
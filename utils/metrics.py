@@ -0,0 +1,257 @@
+"""
+Metrics for V3
+Minimal in-process counters and histograms rendered in the Prometheus text
+exposition format for the /metrics endpoint.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram buckets in seconds (HTTP fetches up to whole scans)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames, labelvalues, extra=None):
+    pairs = list(zip(labelnames, labelvalues))
+    if extra:
+        pairs.append(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    type_name = 'untyped'
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def _key(self, labels):
+        return tuple(str(labels.get(name, '')) for name in self.labelnames)
+
+    def render(self):
+        """Exposition lines for this metric (empty if never observed)"""
+        with self._lock:
+            if not self._values:
+                return []
+            lines = [
+                f'# HELP {self.name} {self.documentation}',
+                f'# TYPE {self.name} {self.type_name}',
+            ]
+            lines.extend(self._render_samples())
+            return lines
+
+
+class Counter(_Metric):
+    type_name = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def _render_samples(self):
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Gauge(_Metric):
+    type_name = 'gauge'
+
+    def set(self, value, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def _render_samples(self):
+        return [
+            f'{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}'
+            for key, value in sorted(self._values.items())
+        ]
+
+
+class Histogram(_Metric):
+    type_name = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = {'counts': [0] * len(self.buckets), 'sum': 0.0, 'count': 0}
+                self._values[key] = state
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state['counts'][i] += 1
+            state['sum'] += value
+            state['count'] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the with-block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _render_samples(self):
+        lines = []
+        for key, state in sorted(self._values.items()):
+            for bound, count in zip(self.buckets, state['counts']):
+                labels = _format_labels(self.labelnames, key, ('le', _format_value(bound)))
+                lines.append(f'{self.name}_bucket{labels} {count}')
+            labels = _format_labels(self.labelnames, key, ('le', '+Inf'))
+            lines.append(f'{self.name}_bucket{labels} {state["count"]}')
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f'{self.name}_sum{labels} {_format_value(state["sum"])}')
+            lines.append(f'{self.name}_count{labels} {state["count"]}')
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+        self._collectors = []
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = cls(name, *args, **kwargs)
+                self._metrics[name] = metric
+            return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()):
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets)
+
+    def add_collector(self, callback):
+        """Register a callback run before each render (e.g. to refresh gauges)"""
+        self._collectors.append(callback)
+
+    def render(self):
+        """
+        Render all metrics in the Prometheus text format
+
+        Returns:
+            str: Exposition text
+        """
+        for callback in self._collectors:
+            try:
+                callback()
+            except Exception as e:
+                print(f"[ERROR] Metrics collector failed: {str(e)}")
+
+        with self._lock:
+            metrics = list(self._metrics.values())
+
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n' if lines else ''
+
+
+# Process-wide registry and the screener's standard metrics
+registry = MetricsRegistry()
+
+STAGE_DURATION = registry.histogram(
+    'screener_stage_duration_seconds',
+    'Time spent in each scan stage',
+    ('stage', 'instrument', 'timeframe')
+)
+SCAN_DURATION = registry.histogram(
+    'screener_scan_duration_seconds',
+    'Wall time of complete scans'
+)
+API_REQUESTS = registry.counter(
+    'screener_api_requests_total',
+    'Outbound API requests by source and outcome',
+    ('source', 'status')
+)
+API_ERRORS = registry.counter(
+    'screener_api_errors_total',
+    'Outbound API errors by source and kind',
+    ('source', 'kind')
+)
+RATE_LIMIT_WAIT = registry.counter(
+    'screener_rate_limit_wait_seconds_total',
+    'Seconds slept to respect provider rate limits',
+    ('source',)
+)
+
+
+def merge_exposition(*texts):
+    """
+    Merge exposition texts from several processes
+
+    Families present in more than one text are emitted once (first HELP/TYPE
+    wins) with all their samples, keeping the output valid.
+
+    Returns:
+        str: Combined exposition text
+    """
+    families = {}
+    order = []
+    current = None
+    for text in texts:
+        for line in text.splitlines():
+            if not line:
+                continue
+            if line.startswith('# '):
+                parts = line.split(' ', 3)
+                if len(parts) < 3:
+                    continue
+                current = parts[2]
+                if current not in families:
+                    families[current] = {'headers': [], 'samples': []}
+                    order.append(current)
+                family = families[current]
+                if not any(h.split(' ', 2)[1] == parts[1] for h in family['headers']):
+                    family['headers'].append(line)
+            elif current is not None:
+                families[current]['samples'].append(line)
+
+    lines = []
+    for name in order:
+        lines.extend(families[name]['headers'])
+        lines.extend(families[name]['samples'])
+    return '\n'.join(lines) + '\n' if lines else ''
+
+
+def timed(stage, instrument='', timeframe=''):
+    """Context manager timing one scan stage into STAGE_DURATION"""
+    return STAGE_DURATION.time(stage=stage, instrument=instrument, timeframe=timeframe)
+
+
+def rate_limit_sleep(seconds, source):
+    """time.sleep() that is accounted in RATE_LIMIT_WAIT"""
+    time.sleep(seconds)
+    RATE_LIMIT_WAIT.inc(seconds, source=source)
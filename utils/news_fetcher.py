@@ -4,48 +4,221 @@ Fetches relevant forex news that may impact the 11 FTMO pairs
 """
 import requests
 import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.api_config import NEWS_API_KEY, FOREX_FACTORY_URL
-from config.instruments import OANDA_PAIRS, YFINANCE_INSTRUMENTS
+from config.settings import get_settings
+from utils.metrics import API_ERRORS, API_REQUESTS, timed
+from utils.event_calendar import event_calendar
+
+settings = get_settings()
+
+# Country names (as they appear upper-cased in headlines) -> currency
+COUNTRY_CURRENCIES = {
+    'UNITED STATES': 'USD',
+    'EUROZONE': 'EUR',
+    'EURO AREA': 'EUR',
+    'UNITED KINGDOM': 'GBP',
+    'BRITAIN': 'GBP',
+    'UK': 'GBP',
+    'JAPAN': 'JPY',
+    'AUSTRALIA': 'AUD',
+}
+
+# Commodity keywords -> instrument
+COMMODITY_KEYWORDS = {
+    'GOLD': 'XAUUSD',
+    'OIL': 'WTI',
+    'CRUDE': 'WTI',
+}
+
+
+def _build_currency_pairs():
+    """{currency: [pairs containing it]} from OANDA_PAIRS"""
+    currency_pairs = {}
+    for pair in settings.OANDA_PAIRS:
+        base, quote = pair.split('_')
+        for currency in (base, quote):
+            currency_pairs.setdefault(currency, []).append(base + quote)
+    return currency_pairs
+
+
+# Pairs affected by news about each currency (built once)
+CURRENCY_PAIRS = _build_currency_pairs()
+
+
+def _build_token_instruments():
+    """Every matchable token -> tuple of instruments it affects"""
+    tokens = {}
+
+    for currency, pairs in CURRENCY_PAIRS.items():
+        tokens[currency] = pairs
+
+    # "EURUSD" as one word mentions both currencies
+    for pair in settings.OANDA_PAIRS:
+        base, quote = pair.split('_')
+        tokens[base + quote] = list(dict.fromkeys(CURRENCY_PAIRS[base] + CURRENCY_PAIRS[quote]))
+
+    for country, currency in COUNTRY_CURRENCIES.items():
+        tokens[country] = CURRENCY_PAIRS.get(currency, [])
+
+    for keyword, instrument in COMMODITY_KEYWORDS.items():
+        tokens[keyword] = [instrument]
+    for _, symbol, _ in settings.YFINANCE_INSTRUMENTS:
+        tokens.setdefault(symbol, [symbol])
+
+    return {token: tuple(instruments) for token, instruments in tokens.items() if instruments}
+
+
+TOKEN_INSTRUMENTS = _build_token_instruments()
+
+# One alternation over all tokens; word boundaries keep AUDIT from matching AUD
+# and TURMOIL from matching OIL. Longest tokens first so EURUSD beats EUR.
+TOKEN_PATTERN = re.compile(
+    r'\b(?:' + '|'.join(
+        re.escape(token).replace(r'\ ', r'\s+')
+        for token in sorted(TOKEN_INSTRUMENTS, key=len, reverse=True)
+    ) + r')\b'
+)
+
+
+def match_instruments(text):
+    """
+    Instruments mentioned in a piece of text, in one regex pass
+
+    Args:
+        text: Any text (matched case-insensitively via upper())
+
+    Returns:
+        set: Instrument names (e.g. {'EURUSD', 'EURAUD'})
+    """
+    instruments = set()
+    for match in TOKEN_PATTERN.finditer(text.upper()):
+        instruments.update(TOKEN_INSTRUMENTS[' '.join(match.group().split())])
+    return instruments
+
+
+class _CachedResponse:
+    __slots__ = ('data', 'fetched_at', 'etag', 'last_modified')
+
+    def __init__(self, data, etag=None, last_modified=None):
+        self.data = data
+        self.fetched_at = time.monotonic()
+        self.etag = etag
+        self.last_modified = last_modified
+
+
+# Responses kept in the per-source cache (NewsAPI sources are per currency list)
+MAX_CACHED_RESPONSES = 32
 
 
 class NewsFetcher:
-    def __init__(self, news_api_key=None):
-        self.news_api_key = news_api_key or NEWS_API_KEY
-        self.forex_factory_url = FOREX_FACTORY_URL
+    def __init__(self, news_api_key=None, calendar=None):
+        self.news_api_key = news_api_key or settings.NEWS_API_KEY
+        self.forex_factory_url = settings.FOREX_FACTORY_URL
+        self.session = requests.Session()
 
-    def get_forex_factory_calendar(self):
+        # Time index of high-impact events (re-built on every calendar fetch)
+        self.calendar = event_calendar if calendar is None else calendar
+
+        # Per-source response cache: {source: _CachedResponse}, least recently used first
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def _fetch_json(self, source, url, params=None, ttl=settings.NEWS_CACHE_TTL):
         """
-        Fetch economic calendar from Forex Factory
+        GET a JSON document with a TTL cache and conditional requests
+
+        A cached response younger than `ttl` is returned without a request.
+        Older ones are revalidated with If-None-Match / If-Modified-Since, so
+        an unchanged document costs a 304 instead of a download. If the
+        request fails, the last good response (if any) is served.
+
+        Args:
+            source: Cache key and metrics label (e.g. 'forexfactory')
+            url: Document URL
+            params: Query parameters
+            ttl: Seconds a response is used without revalidating
 
         Returns:
-            list: Economic events for this week
+            Decoded JSON, or None if nothing could be fetched
         """
-        try:
-            response = requests.get(self.forex_factory_url, timeout=10)
+        with self._cache_lock:
+            cached = self._cache.get(source)
+            if cached is not None:
+                self._cache.move_to_end(source)
 
-            if response.status_code == 200:
-                events = response.json()
+        if cached is not None and time.monotonic() - cached.fetched_at < ttl:
+            return cached.data
 
-                # Filter for high impact events
-                high_impact_events = [
-                    event for event in events
-                    if event.get('impact') == 'High'
-                ]
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers['If-None-Match'] = cached.etag
+            if cached.last_modified:
+                headers['If-Modified-Since'] = cached.last_modified
 
-                return high_impact_events[:20]  # Return top 20 high impact events
-            else:
-                print(f"[WARN] Forex Factory API error: {response.status_code}")
-                return []
+        try:
+            with timed('http_fetch', source, 'news'):
+                response = self.session.get(url, params=params, headers=headers, timeout=10)
+            API_REQUESTS.inc(source=source, status=response.status_code)
+
+            if response.status_code == 304 and cached is not None:
+                cached.fetched_at = time.monotonic()
+                return cached.data
+
+            if response.status_code != 200:
+                API_ERRORS.inc(source=source, kind=f'http_{response.status_code}')
+                print(f"[WARN] {source} error: {response.status_code}")
+                return cached.data if cached is not None else None
+
+            data = response.json()
+            with self._cache_lock:
+                self._cache[source] = _CachedResponse(
+                    data,
+                    etag=response.headers.get('ETag'),
+                    last_modified=response.headers.get('Last-Modified')
+                )
+                self._cache.move_to_end(source)
+                while len(self._cache) > MAX_CACHED_RESPONSES:
+                    self._cache.popitem(last=False)
+            return data
 
         except Exception as e:
-            print(f"[ERROR] Failed to fetch Forex Factory calendar: {str(e)}")
+            API_ERRORS.inc(source=source, kind='exception')
+            print(f"[ERROR] Failed to fetch {source}: {str(e)}")
+            return cached.data if cached is not None else None
+
+    def get_forex_factory_calendar(self):
+        """
+        Fetch economic calendar from Forex Factory
+
+        Returns:
+            list: Economic events for this week
+        """
+        # The weekly calendar rarely changes, so it is cached much longer
+        events = self._fetch_json('forexfactory', self.forex_factory_url, ttl=settings.CALENDAR_CACHE_TTL)
+        if not events:
             return []
 
+        # Index the whole week (not just the 20 displayed) for blackout checks
+        self.calendar.update(events)
+
+        # Filter for high impact events
+        high_impact_events = [
+            event for event in events
+            if event.get('impact') == 'High'
+        ]
+
+        return high_impact_events[:20]  # Return top 20 high impact events
+
     def get_currency_news(self, currencies=['USD', 'EUR', 'GBP', 'JPY', 'AUD']):
         """
         Get latest news for specific currencies
@@ -59,60 +232,39 @@ class NewsFetcher:
         if not self.news_api_key:
             return []
 
-        try:
-            # Build query
-            query = ' OR '.join(currencies)
-
-            url = 'https://newsapi.org/v2/everything'
-            params = {
-                'q': f'{query} AND (forex OR economy OR central bank)',
-                'language': 'en',
-                'sortBy': 'publishedAt',
-                'pageSize': 20,
-                'from': (datetime.now() - timedelta(days=1)).isoformat(),
-                'apiKey': self.news_api_key
-            }
+        # Build query
+        query = ' OR '.join(currencies)
 
-            response = requests.get(url, params=params, timeout=10)
+        url = 'https://newsapi.org/v2/everything'
+        params = {
+            'q': f'{query} AND (forex OR economy OR central bank)',
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': 20,
+            'from': (datetime.now() - timedelta(days=1)).isoformat(),
+            'apiKey': self.news_api_key
+        }
 
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('articles', [])
-            else:
-                print(f"[WARN] News API error: {response.status_code}")
-                return []
-
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch news: {str(e)}")
-            return []
+        data = self._fetch_json(f"newsapi_{'_'.join(currencies).lower()}", url, params)
+        return (data or {}).get('articles', [])
 
     def get_commodity_news(self):
         """Get news for commodities (Gold, Oil)"""
         if not self.news_api_key:
             return []
 
-        try:
-            url = 'https://newsapi.org/v2/everything'
-            params = {
-                'q': '(gold OR oil OR crude) AND (price OR trading)',
-                'language': 'en',
-                'sortBy': 'publishedAt',
-                'pageSize': 10,
-                'from': (datetime.now() - timedelta(days=1)).isoformat(),
-                'apiKey': self.news_api_key
-            }
-
-            response = requests.get(url, params=params, timeout=10)
+        url = 'https://newsapi.org/v2/everything'
+        params = {
+            'q': '(gold OR oil OR crude) AND (price OR trading)',
+            'language': 'en',
+            'sortBy': 'publishedAt',
+            'pageSize': 10,
+            'from': (datetime.now() - timedelta(days=1)).isoformat(),
+            'apiKey': self.news_api_key
+        }
 
-            if response.status_code == 200:
-                data = response.json()
-                return data.get('articles', [])
-            else:
-                return []
-
-        except Exception as e:
-            print(f"[ERROR] Failed to fetch commodity news: {str(e)}")
-            return []
+        data = self._fetch_json('newsapi_commodities', url, params)
+        return (data or {}).get('articles', [])
 
     def categorize_news_by_pairs(self, news_articles, economic_events):
         """
@@ -128,76 +280,45 @@ class NewsFetcher:
         pair_news = {}
 
         # Initialize with all FTMO pairs
-        for pair in OANDA_PAIRS:
+        for pair in settings.OANDA_PAIRS:
             pair_news[pair.replace('_', '')] = []
 
         # Add yfinance instruments
-        for _, symbol, name in YFINANCE_INSTRUMENTS:
+        for _, symbol, name in settings.YFINANCE_INSTRUMENTS:
             pair_news[symbol] = []
 
-        # Categorize news articles
+        # Categorize news articles (one regex pass over each article's text)
         for article in news_articles:
-            title = article.get('title', '').upper()
-            description = article.get('description', '').upper() if article.get('description') else ''
-
-            # Check which currencies are mentioned
-            for pair in OANDA_PAIRS:
-                clean_pair = pair.replace('_', '')
-                base = clean_pair[:3]
-                quote = clean_pair[3:]
-
-                if base in title or base in description or quote in title or quote in description:
-                    pair_news[clean_pair].append({
-                        'title': article.get('title'),
-                        'source': article.get('source', {}).get('name'),
-                        'published_at': article.get('publishedAt'),
-                        'url': article.get('url'),
-                        'type': 'news'
-                    })
-
-            # Check commodities
-            if 'GOLD' in title or 'GOLD' in description:
-                pair_news['XAUUSD'].append({
-                    'title': article.get('title'),
-                    'source': article.get('source', {}).get('name'),
-                    'published_at': article.get('publishedAt'),
-                    'url': article.get('url'),
-                    'type': 'news'
-                })
-
-            if 'OIL' in title or 'CRUDE' in title or 'OIL' in description:
-                pair_news['WTI'].append({
-                    'title': article.get('title'),
-                    'source': article.get('source', {}).get('name'),
-                    'published_at': article.get('publishedAt'),
-                    'url': article.get('url'),
-                    'type': 'news'
-                })
-
-        # Categorize economic events
-        for event in economic_events:
-            country = event.get('country', '')
-            title = event.get('title', '')
-
-            # Map countries to currencies
-            currency_map = {
-                'USD': ['EURUSD', 'USDJPY', 'GBPUSD', 'AUDUSD'],
-                'EUR': ['EURUSD', 'EURAUD'],
-                'GBP': ['GBPUSD', 'GBPJPY', 'GBPAUD'],
-                'JPY': ['USDJPY', 'AUDJPY', 'GBPJPY'],
-                'AUD': ['AUDUSD', 'EURAUD', 'AUDJPY', 'GBPAUD'],
+            text = f"{article.get('title') or ''} {article.get('description') or ''}"
+            instruments = match_instruments(text)
+            if not instruments:
+                continue
+
+            item = {
+                'title': article.get('title'),
+                'source': (article.get('source') or {}).get('name'),
+                'published_at': article.get('publishedAt'),
+                'url': article.get('url'),
+                'type': 'news'
             }
+            for instrument in instruments:
+                pair_news[instrument].append(item)
 
-            for curr, pairs in currency_map.items():
-                if curr in country.upper():
-                    for pair in pairs:
-                        pair_news[pair].append({
-                            'title': title,
-                            'source': 'Forex Factory',
-                            'published_at': event.get('date'),
-                            'impact': event.get('impact'),
-                            'type': 'economic_event'
-                        })
+        # Categorize economic events by their country (currency) code
+        for event in economic_events:
+            instruments = match_instruments(event.get('country', ''))
+            if not instruments:
+                continue
+
+            item = {
+                'title': event.get('title', ''),
+                'source': 'Forex Factory',
+                'published_at': event.get('date'),
+                'impact': event.get('impact'),
+                'type': 'economic_event'
+            }
+            for instrument in instruments:
+                pair_news[instrument].append(item)
 
         # Limit to 5 most recent per pair
         for pair in pair_news:
@@ -214,10 +335,15 @@ class NewsFetcher:
         """
         print("[INFO] Fetching forex news...")
 
-        # Fetch news
-        currency_news = self.get_currency_news()
-        commodity_news = self.get_commodity_news()
-        economic_events = self.get_forex_factory_calendar()
+        # Fetch the three sources concurrently (each is cached separately)
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix='news') as executor:
+            currency_future = executor.submit(self.get_currency_news)
+            commodity_future = executor.submit(self.get_commodity_news)
+            events_future = executor.submit(self.get_forex_factory_calendar)
+
+            currency_news = currency_future.result()
+            commodity_news = commodity_future.result()
+            economic_events = events_future.result()
 
         all_articles = currency_news + commodity_news
 
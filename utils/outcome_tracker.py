@@ -0,0 +1,276 @@
+"""
+Outcome Tracker for V3
+Resolves recorded signals to WIN / LOSS / EXPIRED (signal_outcomes table)
+using the candles already held in the candle store. Only new signals (is_new
+rows) are resolved; repeats of a persisting signal would weight it by its
+duration.
+
+All open signals of an instrument are checked at once: high/low are compared
+with every signal's stop loss and take profit as one (signals x bars) array,
+and the first touch of each level is found with argmax. A bar that touches
+both levels counts as a LOSS, since the candle can't tell which came first.
+"""
+import sys
+import os
+from datetime import datetime, timezone
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import get_settings
+from utils.metrics import registry, timed
+from utils.performance import apply_deltas, performance_deltas
+from utils.risk_calculator import pip_size
+
+settings = get_settings()
+
+SIGNAL_OUTCOMES = registry.counter(
+    'screener_signal_outcomes_total',
+    'Signals resolved by the outcome tracker',
+    ('outcome',)
+)
+
+# Finest first: each signal uses the finest series that reaches back to it
+OUTCOME_TIMEFRAMES = ('M5', 'M15', 'H1')
+
+# Signals per (signals x bars) block, bounding memory for large backlogs
+CHUNK_SIZE = 2048
+
+OPEN_SIGNALS = (
+    "SELECT s.id, s.timestamp, s.instrument, s.signal_type, s.entry_price, s.stop_loss, s.take_profit, "
+    "s.strategy, s.alignment_score, s.confidence "
+    "FROM signals s LEFT JOIN signal_outcomes o ON o.signal_id = s.id "
+    "WHERE o.id IS NULL AND s.is_new AND s.stop_loss IS NOT NULL AND s.take_profit IS NOT NULL"
+)
+
+INSERT_OUTCOME = (
+    "INSERT INTO signal_outcomes "
+    "(signal_id, outcome, close_price, pips_gained, profit_loss, closed_at, duration_hours, notes) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+)
+
+NS_PER_HOUR = 3600 * 10**9
+
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+
+def _to_utc_ns(value):
+    """signals.timestamp (local time, as written by the screener) -> UTC epoch ns"""
+    if isinstance(value, datetime):
+        when = value
+    else:
+        when = datetime.strptime(str(value)[:19], TIMESTAMP_FORMAT)
+    return int(when.astimezone(timezone.utc).timestamp()) * 10**9
+
+
+def _to_local_string(ns):
+    return datetime.fromtimestamp(ns / 1e9).strftime(TIMESTAMP_FORMAT)
+
+
+def resolve_outcomes(times, high, low, close, signal_ns, is_buy, stop_loss, take_profit, expiry_ns):
+    """
+    First stop loss / take profit touch for many signals on one candle series
+
+    Only bars that open after the signal and before its expiry are checked.
+
+    Args:
+        times: Bar open times (int64 ns, ascending)
+        high, low, close: Bar prices
+        signal_ns: Signal times (int64 ns)
+        is_buy: True for BUY signals, False for SELL
+        stop_loss, take_profit: Levels per signal
+        expiry_ns: Signal lifetime in ns
+
+    Returns:
+        tuple of arrays: (outcome code, bar index)
+            code 1 = WIN, -1 = LOSS, 0 = EXPIRED, -2 = still open;
+            bar index is the closing bar (last bar before expiry for EXPIRED)
+    """
+    bars = len(times)
+    start = np.searchsorted(times, signal_ns, side='right')
+    end = np.searchsorted(times, signal_ns + expiry_ns, side='left')
+
+    index = np.arange(bars)
+    window = (index >= start[:, None]) & (index < end[:, None])
+
+    buy = is_buy[:, None]
+    sl = stop_loss[:, None]
+    tp = take_profit[:, None]
+    high = high[None, :]
+    low = low[None, :]
+
+    sl_hit = np.where(buy, low <= sl, high >= sl) & window
+    tp_hit = np.where(buy, high >= tp, low <= tp) & window
+
+    # argmax finds the first True; rows without one get `bars` (never)
+    first_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), bars)
+    first_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), bars)
+
+    loss = (first_sl < bars) & (first_sl <= first_tp)  # Same bar: LOSS
+    win = (first_tp < bars) & ~loss
+    expired = ~loss & ~win & (end < bars)  # Candles reach past the expiry
+
+    code = np.full(len(signal_ns), -2, dtype=np.int8)
+    code[expired] = 0
+    code[win] = 1
+    code[loss] = -1
+
+    bar = np.where(loss, first_sl, np.where(win, first_tp, np.maximum(end - 1, 0)))
+    return code, bar
+
+
+class OutcomeTracker:
+    def __init__(self, database, candle_store, expiry_hours=None, win_rates=None):
+        """
+        Args:
+            database: utils.database.Database holding signals / signal_outcomes
+            candle_store: CandleStore filled by the screener
+            expiry_hours: Signal lifetime (default TRADE_SETUP_CONFIG['expiry_hours'])
+            win_rates: Optional WinRateProvider told about every resolved signal
+        """
+        self.database = database
+        self.candle_store = candle_store
+        self.win_rates = win_rates
+        self.expiry_hours = expiry_hours or settings.TRADE_SETUP_CONFIG['expiry_hours']
+        self.risk_amount = settings.ACCOUNT_SIZE * settings.RISK_PER_TRADE / 100
+
+    def open_signals(self):
+        """Recorded signals without an outcome row"""
+        return self.database.query(OPEN_SIGNALS)
+
+    def update(self, now=None):
+        """
+        Resolve open signals; their outcome rows and the performance table
+        deltas are written in one transaction
+
+        Args:
+            now: datetime used to expire signals with no candle data (default: now)
+
+        Returns:
+            dict: Outcome counts ({'WIN': n, 'LOSS': n, 'EXPIRED': n, 'OPEN': n})
+        """
+        with timed('outcomes'):
+            signals = self.open_signals()
+            rows, still_open = self.evaluate(signals, now)
+
+            # (timestamp, strategy, instrument, outcome, pips, profit, confidence) per outcome
+            signals_by_id = {signal[0]: signal for signal in signals}
+            resolved = []
+            for signal_id, outcome, _, pips, profit, *_ in rows:
+                signal = signals_by_id[signal_id]
+                resolved.append((signal[1], signal[7], signal[2], outcome, pips, profit, signal[9]))
+
+            # Outcome rows and the performance aggregates land together
+            if rows:
+                with self.database.transaction() as cursor:
+                    cursor.executemany(self.database.sql(INSERT_OUTCOME), rows)
+                    apply_deltas(self.database, cursor, performance_deltas(resolved))
+
+        counts = {'WIN': 0, 'LOSS': 0, 'EXPIRED': 0, 'OPEN': still_open}
+        for row in rows:
+            counts[row[1]] += 1
+            SIGNAL_OUTCOMES.inc(outcome=row[1].lower())
+
+        if self.win_rates is not None:
+            for signal_id, outcome, *_ in rows:
+                signal = signals_by_id[signal_id]
+                self.win_rates.record(signal[7], signal[2], signal[8], outcome, signal[1])
+        return counts
+
+    def evaluate(self, signals, now=None):
+        """
+        Outcome rows for open signals
+
+        Args:
+            signals: Rows of (id, timestamp, instrument, signal_type, entry, stop_loss, take_profit, ...)
+            now: datetime for expiring signals without candles (default: now)
+
+        Returns:
+            tuple: ([signal_outcomes rows], number still open)
+        """
+        now_ns = _to_utc_ns(now or datetime.now())
+        expiry_ns = self.expiry_hours * NS_PER_HOUR
+
+        by_instrument = {}
+        for row in signals:
+            by_instrument.setdefault(row[2], []).append(row)
+
+        rows = []
+        still_open = 0
+        for instrument, group in by_instrument.items():
+            ids = np.array([row[0] for row in group], dtype=np.int64)
+            signal_ns = np.array([_to_utc_ns(row[1]) for row in group], dtype=np.int64)
+            is_buy = np.array([row[3] == 'BUY' for row in group])
+            entry = np.array([row[4] for row in group], dtype=np.float64)
+            stop_loss = np.array([row[5] for row in group], dtype=np.float64)
+            take_profit = np.array([row[6] for row in group], dtype=np.float64)
+
+            pip = pip_size(instrument)
+            pending = np.ones(len(group), dtype=bool)
+            has_candles = False
+
+            for timeframe in OUTCOME_TIMEFRAMES:
+                series = self.candle_store.get(instrument, timeframe)
+                if series is None or len(series) == 0:
+                    continue
+                has_candles = True
+
+                # Only signals this series covers from their start: scoring an
+                # older one would skip its first bars and could miss an earlier touch
+                covered = pending & (signal_ns >= series.times[0])
+                pending &= ~covered
+
+                positions = np.flatnonzero(covered)
+                for offset in range(0, len(positions), CHUNK_SIZE):
+                    chunk = positions[offset:offset + CHUNK_SIZE]
+                    code, bar = resolve_outcomes(
+                        series.times, series.high, series.low, series.close,
+                        signal_ns[chunk], is_buy[chunk], stop_loss[chunk], take_profit[chunk], expiry_ns
+                    )
+                    rows.extend(self._outcome_rows(
+                        series, ids[chunk], signal_ns[chunk], is_buy[chunk], entry[chunk],
+                        stop_loss[chunk], take_profit[chunk], code, bar, pip
+                    ))
+                    still_open += int((code == -2).sum())
+
+            # No candles reaching back to the signal: never scored on partial
+            # data, just expired once well past their lifetime
+            if pending.any():
+                lapsed = pending & (signal_ns + expiry_ns < now_ns)
+                note = 'Candles start after the signal' if has_candles else 'No candle data'
+                for signal_id in ids[lapsed]:
+                    rows.append((int(signal_id), 'EXPIRED', None, None, None, None,
+                                 self.expiry_hours, note))
+                still_open += int((pending & ~lapsed).sum())
+
+        return rows, still_open
+
+    def _outcome_rows(self, series, ids, signal_ns, is_buy, entry, stop_loss, take_profit, code, bar, pip):
+        resolved = np.flatnonzero(code != -2)
+        if len(resolved) == 0:
+            return []
+
+        bar = bar[resolved]
+        code = code[resolved]
+        direction = np.where(is_buy[resolved], 1.0, -1.0)
+
+        close_price = np.where(
+            code == -1, stop_loss[resolved],
+            np.where(code == 1, take_profit[resolved], series.close[bar].astype(np.float64))
+        )
+        move = (close_price - entry[resolved]) * direction
+        pips = move / pip
+        risk = np.abs(entry[resolved] - stop_loss[resolved])
+        profit = np.where(risk > 0, move / np.where(risk > 0, risk, 1.0), 0.0) * self.risk_amount
+
+        # Hits close at the touching bar; expiries at the end of the lifetime
+        closed_ns = np.where(code == 0, signal_ns[resolved] + self.expiry_hours * NS_PER_HOUR, series.times[bar])
+        hours = (closed_ns - signal_ns[resolved]) // NS_PER_HOUR
+
+        labels = {1: 'WIN', -1: 'LOSS', 0: 'EXPIRED'}
+        notes = {1: None, -1: None, 0: 'Neither level hit'}
+        return [
+            (int(ids[i]), labels[int(c)], round(float(price), 5), round(float(p), 1), round(float(pl), 2),
+             _to_local_string(int(ns)), int(h), notes[int(c)])
+            for i, c, price, p, pl, ns, h in zip(resolved, code, close_price, pips, profit, closed_ns, hours)
+        ]
@@ -0,0 +1,310 @@
+"""
+Performance Aggregates for V3
+Keeps daily_performance, strategy_performance and instrument_performance
+current as signal outcomes land.
+
+Each batch of outcomes is reduced to per-day / per-strategy / per-instrument
+deltas that are upserted in the same transaction as the outcome rows, so
+reads never re-aggregate signals x signal_outcomes. Rows are per signal day
+(strategy and instrument rows use period 'daily'); /api/performance sums the
+days it is asked for.
+
+Rebuild from scratch (backfills, after deleting outcomes):
+
+    python utils/performance.py --rebuild
+"""
+import argparse
+import sys
+import os
+from datetime import datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PERIOD = 'daily'
+
+# (signal date, strategy, instrument, outcome, pips, profit, confidence) for every
+# new signal's outcome (older databases also hold outcomes of repeated signals)
+ALL_OUTCOMES = (
+    "SELECT s.timestamp, s.strategy, s.instrument, o.outcome, o.pips_gained, o.profit_loss, s.confidence "
+    "FROM signal_outcomes o JOIN signals s ON s.id = o.signal_id WHERE s.is_new"
+)
+
+# Win rate from the running totals (existing row + delta)
+_WIN_RATE = (
+    "CASE WHEN {t}.wins + excluded.wins + {t}.losses + excluded.losses > 0 "
+    "THEN ROUND(100.0 * ({t}.wins + excluded.wins) / "
+    "({t}.wins + excluded.wins + {t}.losses + excluded.losses), 2) END"
+)
+
+UPSERT_DAILY = (
+    "INSERT INTO daily_performance "
+    "(date, total_signals, wins, losses, win_rate, total_pips, total_profit, "
+    "best_trade, worst_trade, average_confidence, confidence_sum) "
+    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+    "ON CONFLICT (date) DO UPDATE SET "
+    "total_signals = daily_performance.total_signals + excluded.total_signals, "
+    "wins = daily_performance.wins + excluded.wins, "
+    "losses = daily_performance.losses + excluded.losses, "
+    f"win_rate = {_WIN_RATE.format(t='daily_performance')}, "
+    "total_pips = COALESCE(daily_performance.total_pips, 0) + excluded.total_pips, "
+    "total_profit = COALESCE(daily_performance.total_profit, 0) + excluded.total_profit, "
+    "best_trade = CASE WHEN daily_performance.best_trade IS NULL OR excluded.best_trade > daily_performance.best_trade "
+    "THEN excluded.best_trade ELSE daily_performance.best_trade END, "
+    "worst_trade = CASE WHEN daily_performance.worst_trade IS NULL OR excluded.worst_trade < daily_performance.worst_trade "
+    "THEN excluded.worst_trade ELSE daily_performance.worst_trade END, "
+    "confidence_sum = COALESCE(daily_performance.confidence_sum, 0) + excluded.confidence_sum, "
+    "average_confidence = ROUND((COALESCE(daily_performance.confidence_sum, 0) + excluded.confidence_sum) / "
+    "(daily_performance.total_signals + excluded.total_signals), 2)"
+)
+
+
+def _upsert_grouped(table, key):
+    return (
+        f"INSERT INTO {table} "
+        f"({key}, period, start_date, end_date, total_signals, wins, losses, win_rate, "
+        "average_pips, total_pips, total_profit, average_confidence, confidence_sum, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP) "
+        f"ON CONFLICT ({key}, period, start_date) DO UPDATE SET "
+        f"total_signals = {table}.total_signals + excluded.total_signals, "
+        f"wins = {table}.wins + excluded.wins, "
+        f"losses = {table}.losses + excluded.losses, "
+        f"win_rate = {_WIN_RATE.format(t=table)}, "
+        f"total_pips = COALESCE({table}.total_pips, 0) + excluded.total_pips, "
+        f"average_pips = ROUND((COALESCE({table}.total_pips, 0) + excluded.total_pips) / "
+        f"({table}.total_signals + excluded.total_signals), 2), "
+        f"total_profit = COALESCE({table}.total_profit, 0) + excluded.total_profit, "
+        f"confidence_sum = COALESCE({table}.confidence_sum, 0) + excluded.confidence_sum, "
+        f"average_confidence = ROUND((COALESCE({table}.confidence_sum, 0) + excluded.confidence_sum) / "
+        f"({table}.total_signals + excluded.total_signals), 2), "
+        "updated_at = CURRENT_TIMESTAMP"
+    )
+
+
+UPSERT_STRATEGY = _upsert_grouped('strategy_performance', 'strategy')
+UPSERT_INSTRUMENT = _upsert_grouped('instrument_performance', 'instrument')
+
+
+class _Totals:
+    __slots__ = ('signals', 'wins', 'losses', 'pips', 'profit', 'confidence', 'best', 'worst')
+
+    def __init__(self):
+        self.signals = self.wins = self.losses = 0
+        self.pips = self.profit = self.confidence = 0.0
+        self.best = self.worst = None
+
+    def add(self, outcome, pips, profit, confidence):
+        self.signals += 1
+        self.wins += outcome == 'WIN'
+        self.losses += outcome == 'LOSS'
+        self.pips += float(pips or 0)
+        self.profit += float(profit or 0)
+        self.confidence += float(confidence or 0)
+        if profit is not None:
+            profit = float(profit)
+            self.best = profit if self.best is None else max(self.best, profit)
+            self.worst = profit if self.worst is None else min(self.worst, profit)
+
+    @property
+    def win_rate(self):
+        resolved = self.wins + self.losses
+        return round(100.0 * self.wins / resolved, 2) if resolved else None
+
+    def averages(self):
+        return round(self.pips / self.signals, 2), round(self.confidence / self.signals, 2)
+
+
+def _signal_date(timestamp):
+    return str(timestamp)[:10]
+
+
+def performance_deltas(outcomes):
+    """
+    Reduce outcomes to upsert rows for the three performance tables
+
+    Args:
+        outcomes: Iterable of (signal timestamp, strategy, instrument, outcome,
+            pips, profit, confidence)
+
+    Returns:
+        dict: {'daily': rows, 'strategy': rows, 'instrument': rows}
+    """
+    daily, by_strategy, by_instrument = {}, {}, {}
+    for timestamp, strategy, instrument, outcome, pips, profit, confidence in outcomes:
+        day = _signal_date(timestamp)
+        for groups, key in ((daily, day), (by_strategy, (strategy, day)), (by_instrument, (instrument, day))):
+            totals = groups.get(key)
+            if totals is None:
+                totals = groups[key] = _Totals()
+            totals.add(outcome, pips, profit, confidence)
+
+    daily_rows = []
+    for day, t in daily.items():
+        _, average_confidence = t.averages()
+        daily_rows.append((day, t.signals, t.wins, t.losses, t.win_rate, round(t.pips, 2),
+                           round(t.profit, 2), t.best, t.worst, average_confidence, t.confidence))
+
+    def grouped_rows(groups):
+        rows = []
+        for (name, day), t in groups.items():
+            average_pips, average_confidence = t.averages()
+            rows.append((name, PERIOD, day, day, t.signals, t.wins, t.losses, t.win_rate, average_pips,
+                         round(t.pips, 2), round(t.profit, 2), average_confidence, t.confidence))
+        return rows
+
+    return {
+        'daily': daily_rows,
+        'strategy': grouped_rows(by_strategy),
+        'instrument': grouped_rows(by_instrument),
+    }
+
+
+def apply_deltas(database, cursor, deltas):
+    """Upsert performance deltas with a cursor inside the caller's transaction"""
+    for statement, rows in ((UPSERT_DAILY, deltas['daily']),
+                            (UPSERT_STRATEGY, deltas['strategy']),
+                            (UPSERT_INSTRUMENT, deltas['instrument'])):
+        if rows:
+            cursor.executemany(database.sql(statement), rows)
+
+
+def rebuild(database):
+    """
+    Recompute all three tables from signals / signal_outcomes in one transaction
+
+    Outcomes are read inside the same transaction, with writes to
+    signal_outcomes blocked until it commits (SQLite's BEGIN IMMEDIATE write
+    lock; a SHARE lock on PostgreSQL). An outcome the live tracker writes
+    meanwhile lands after the rebuild and is applied on top of it, instead
+    of being deleted with the old aggregates.
+
+    Returns:
+        int: Outcomes aggregated
+    """
+    with database.transaction() as cursor:
+        if database.dialect == 'postgres':
+            cursor.execute('LOCK TABLE signal_outcomes IN SHARE MODE')
+        cursor.execute(ALL_OUTCOMES)
+        outcomes = cursor.fetchall()
+        deltas = performance_deltas(outcomes)
+
+        cursor.execute('DELETE FROM daily_performance')
+        cursor.execute(database.sql('DELETE FROM strategy_performance WHERE period = ?'), (PERIOD,))
+        cursor.execute(database.sql('DELETE FROM instrument_performance WHERE period = ?'), (PERIOD,))
+        apply_deltas(database, cursor, deltas)
+    return len(outcomes)
+
+
+def _float(value):
+    """DECIMAL (PostgreSQL) / None -> float / None"""
+    return None if value is None else float(value)
+
+
+def _summarize(name_key, name, signals, wins, losses, pips, profit, confidence):
+    signals = int(signals or 0)
+    wins = int(wins or 0)
+    losses = int(losses or 0)
+    return {
+        name_key: name,
+        'total_signals': signals,
+        'wins': wins,
+        'losses': losses,
+        'expired': signals - wins - losses,
+        'win_rate': round(100.0 * wins / (wins + losses), 2) if wins + losses else None,
+        'total_pips': round(_float(pips) or 0, 2),
+        'average_pips': round((_float(pips) or 0) / signals, 2) if signals else None,
+        'total_profit': round(_float(profit) or 0, 2),
+        'average_confidence': round((_float(confidence) or 0) / signals, 2) if signals else None,
+    }
+
+
+def read_performance(database, days=30):
+    """
+    Performance over the last `days` signal days, read from the aggregate tables
+
+    Returns:
+        dict: {'days', 'since', 'totals', 'daily', 'strategies', 'instruments'}
+    """
+    since = (datetime.now() - timedelta(days=days)).strftime('%Y-%m-%d')
+
+    daily = [
+        {
+            'date': str(row[0]),
+            'total_signals': row[1],
+            'wins': row[2],
+            'losses': row[3],
+            'win_rate': _float(row[4]),
+            'total_pips': _float(row[5]),
+            'total_profit': _float(row[6]),
+            'best_trade': _float(row[7]),
+            'worst_trade': _float(row[8]),
+            'average_confidence': _float(row[9]),
+        }
+        for row in database.query(
+            "SELECT date, total_signals, wins, losses, win_rate, total_pips, total_profit, "
+            "best_trade, worst_trade, average_confidence "
+            "FROM daily_performance WHERE date >= ? ORDER BY date DESC",
+            (since,)
+        )
+    ]
+
+    def grouped(table, key):
+        rows = database.query(
+            f"SELECT {key}, SUM(total_signals), SUM(wins), SUM(losses), SUM(total_pips), "
+            f"SUM(total_profit), SUM(confidence_sum) FROM {table} "
+            f"WHERE period = ? AND start_date >= ? GROUP BY {key}",
+            (PERIOD, since)
+        )
+        summaries = [_summarize(key, *row) for row in rows]
+        return sorted(summaries, key=lambda s: s['total_profit'], reverse=True)
+
+    strategies = grouped('strategy_performance', 'strategy')
+    totals = _summarize(
+        'period', f'{days}d',
+        sum(s['total_signals'] for s in strategies),
+        sum(s['wins'] for s in strategies),
+        sum(s['losses'] for s in strategies),
+        sum(s['total_pips'] for s in strategies),
+        sum(s['total_profit'] for s in strategies),
+        sum((s['average_confidence'] or 0) * s['total_signals'] for s in strategies),
+    )
+
+    return {
+        'days': days,
+        'since': since,
+        'totals': totals,
+        'daily': daily,
+        'strategies': strategies,
+        'instruments': grouped('instrument_performance', 'instrument'),
+    }
+
+
+def main():
+    from utils.database import create_database
+
+    parser = argparse.ArgumentParser(description='Performance aggregate tables')
+    parser.add_argument('--rebuild', action='store_true',
+                        help='Recompute daily/strategy/instrument performance from signal_outcomes')
+    parser.add_argument('--days', type=int, default=30, help='Days to summarize (default: 30)')
+    args = parser.parse_args()
+
+    database = create_database()
+    if database is None:
+        sys.exit(1)
+
+    if args.rebuild:
+        count = rebuild(database)
+        print(f"[OK] Rebuilt performance tables from {count} outcomes")
+
+    performance = read_performance(database, args.days)
+    totals = performance['totals']
+    print(f"\nLast {args.days} days: {totals['total_signals']} resolved signals, "
+          f"win rate {totals['win_rate'] if totals['win_rate'] is not None else '-'}%, "
+          f"{totals['total_pips']} pips, ${totals['total_profit']:,.2f}")
+    for strategy in performance['strategies']:
+        print(f"  {strategy['strategy']:<12} {strategy['total_signals']:>5} signals  "
+              f"win rate {strategy['win_rate'] if strategy['win_rate'] is not None else '-':>6}  "
+              f"${strategy['total_profit']:>12,.2f}")
+
+
+if __name__ == "__main__":
+    main()
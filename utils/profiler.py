@@ -0,0 +1,211 @@
+"""
+Profiler for V3
+On-demand profiling of a single scan: a deterministic mode built on cProfile
+and a low-overhead sampling mode that snapshots the scanning thread's stack.
+"""
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+
+# pstats sort keys accepted by the admin endpoint
+SORT_KEYS = ('cumulative', 'tottime', 'ncalls', 'pcalls', 'filename', 'name', 'line')
+
+# Default interval between stack samples (seconds)
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Shorter intervals turn the sampler into a busy loop holding the GIL
+MIN_SAMPLE_INTERVAL = 0.001
+
+# Only one profile may run at a time (cProfile can't be nested across threads)
+_profile_lock = threading.Lock()
+
+
+class ProfilerBusy(Exception):
+    """Raised when another profile is already running"""
+
+
+def _frame_label(code):
+    """Short 'file:function' label used in collapsed stacks"""
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _function_label(func):
+    """Label for a pstats function key (filename, line, name)"""
+    filename, line, name = func
+    if filename == '~':
+        return name  # built-in
+    return f"{os.path.basename(filename)}:{name}"
+
+
+def _collapsed_from_stats(stats):
+    """
+    Approximate collapsed stacks from cProfile caller data
+
+    cProfile only records caller -> callee edges, so each line is one edge
+    weighted by the callee's own time (microseconds) under that caller.
+    """
+    lines = []
+    for func, (_, _, tottime, _, callers) in stats.stats.items():
+        if not callers:
+            weight = int(tottime * 1e6)
+            if weight:
+                lines.append((_function_label(func), weight))
+            continue
+        for caller, caller_stats in callers.items():
+            weight = int(caller_stats[2] * 1e6)
+            if weight:
+                lines.append((f"{_function_label(caller)};{_function_label(func)}", weight))
+
+    lines.sort(key=lambda item: item[1], reverse=True)
+    return '\n'.join(f"{stack} {weight}" for stack, weight in lines)
+
+
+class StackSampler:
+    """
+    Samples one thread's stack at a fixed interval using sys._current_frames()
+
+    Overhead is one frame walk per interval, so it is safe to run against
+    production-sized scans.
+    """
+
+    def __init__(self, thread_id, interval=DEFAULT_SAMPLE_INTERVAL):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self.sample_count = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, daemon=True, name='stack-sampler')
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+
+            stack = []
+            while frame is not None:
+                stack.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            stack.reverse()
+
+            self.samples[';'.join(stack)] += 1
+            self.sample_count += 1
+
+    def collapsed(self):
+        """Collapsed-stack text ('a;b;c count' per line) for flame graph tools"""
+        return '\n'.join(f"{stack} {count}" for stack, count in self.samples.most_common())
+
+    def top_functions(self, limit=50):
+        """
+        Functions ranked by samples (self = on top of the stack, total = anywhere)
+
+        Returns:
+            list: [{'function', 'self_samples', 'total_samples', 'total_pct'}]
+        """
+        self_counts = Counter()
+        total_counts = Counter()
+        for stack, count in self.samples.items():
+            frames = stack.split(';')
+            self_counts[frames[-1]] += count
+            for name in set(frames):
+                total_counts[name] += count
+
+        total = self.sample_count or 1
+        return [
+            {
+                'function': name,
+                'self_samples': self_counts[name],
+                'total_samples': count,
+                'total_pct': round(count / total * 100, 1)
+            }
+            for name, count in total_counts.most_common(limit)
+        ]
+
+
+def profile_call(func, mode='cprofile', sort='cumulative', limit=50, interval=DEFAULT_SAMPLE_INTERVAL):
+    """
+    Run func() once under a profiler
+
+    Args:
+        func: Zero-argument callable to profile
+        mode: 'cprofile' (deterministic) or 'sample' (stack sampling)
+        sort: pstats sort key for the stats table (cprofile mode)
+        limit: Number of rows in the stats table
+        interval: Seconds between samples (sample mode)
+
+    Returns:
+        dict: {'mode', 'duration', 'stats' (text), 'collapsed' (text),
+               plus 'functions' and 'samples' in sample mode}
+    """
+    if mode not in ('cprofile', 'sample'):
+        raise ValueError(f"Unknown profile mode: {mode}")
+    if sort not in SORT_KEYS:
+        raise ValueError(f"Unknown sort key: {sort} (use one of {', '.join(SORT_KEYS)})")
+    if mode == 'sample' and not interval >= MIN_SAMPLE_INTERVAL:  # also rejects NaN
+        raise ValueError(f"interval must be at least {MIN_SAMPLE_INTERVAL}s")
+
+    if not _profile_lock.acquire(blocking=False):
+        raise ProfilerBusy("A profile is already running")
+
+    try:
+        start = time.perf_counter()
+
+        if mode == 'cprofile':
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                func()
+            finally:
+                profiler.disable()
+            duration = time.perf_counter() - start
+
+            stream = io.StringIO()
+            stats = pstats.Stats(profiler, stream=stream)
+            stats.sort_stats(sort).print_stats(limit)
+            return {
+                'mode': mode,
+                'duration': round(duration, 3),
+                'sort': sort,
+                'stats': stream.getvalue(),
+                'collapsed': _collapsed_from_stats(stats)
+            }
+
+        sampler = StackSampler(threading.get_ident(), interval)
+        sampler.start()
+        try:
+            func()
+        finally:
+            sampler.stop()
+        duration = time.perf_counter() - start
+
+        functions = sampler.top_functions(limit)
+        table = '\n'.join(
+            f"{row['total_samples']:>8} {row['total_pct']:>6.1f}% {row['self_samples']:>8}  {row['function']}"
+            for row in functions
+        )
+        return {
+            'mode': mode,
+            'duration': round(duration, 3),
+            'interval': interval,
+            'samples': sampler.sample_count,
+            'functions': functions,
+            'stats': f"{'total':>8} {'pct':>7} {'self':>8}  function\n{table}",
+            'collapsed': sampler.collapsed()
+        }
+
+    finally:
+        _profile_lock.release()
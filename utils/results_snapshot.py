@@ -0,0 +1,281 @@
+"""
+Results Snapshot for V3
+Immutable, pre-serialized view of the latest scan that the web API can serve
+without touching the scanner's working data.
+"""
+import hashlib
+import json
+import threading
+from types import SimpleNamespace
+from datetime import date, datetime
+
+from utils.change_log import changed_fields
+
+# Keys never exposed through the API (raw DataFrames)
+EXCLUDED_KEYS = ('data_dict',)
+
+
+def json_default(value):
+    """Serialize numpy scalars and timestamps that json can't handle natively"""
+    if hasattr(value, 'item'):
+        return value.item()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def to_json_bytes(data):
+    """Serialize data to compact UTF-8 JSON"""
+    return json.dumps(data, default=json_default, separators=(',', ':')).encode('utf-8')
+
+
+def strip_instrument(data):
+    """Copy of an instrument's results without raw DataFrames"""
+    return {k: v for k, v in data.items() if k not in EXCLUDED_KEYS}
+
+
+def content_etag(body):
+    """Short content hash used as an ETag value"""
+    return hashlib.blake2b(body, digest_size=8).hexdigest()
+
+
+class ResultsSnapshot:
+    """
+    Read-only results of one published state
+
+    Every JSON body is serialized once at publish time, so API requests are
+    just a reference read plus a memory copy.
+    """
+
+    __slots__ = ('scan_id', 'version', 'seq', 'instrument_seqs', 'changes', 'last_update', 'scanning', 'stale',
+                 'screener_results', 'news', 'body', 'news_body', 'instrument_bodies', 'instrument_etags', 'etag',
+                 '_results_body')
+
+    def __init__(self, scan_id=0, version=0, seq=0, instrument_seqs=None, changes=None, last_update=None,
+                 scanning=False, stale=False, screener_results=None, news=None, _reuse=None):
+        if _reuse is not None and screener_results is _reuse.screener_results:
+            # Results unchanged (e.g. only the scanning flag flipped)
+            instrument_bodies = _reuse.instrument_bodies
+            instrument_etags = _reuse.instrument_etags
+            results_body = _reuse._results_body
+        else:
+            screener_results = {
+                instrument: strip_instrument(data)
+                for instrument, data in (screener_results or {}).items()
+            }
+            instrument_bodies = {
+                instrument: to_json_bytes(data)
+                for instrument, data in screener_results.items()
+            }
+            instrument_etags = {
+                instrument: content_etag(instrument_body)
+                for instrument, instrument_body in instrument_bodies.items()
+            }
+            # Splice the per-instrument bodies instead of serializing twice
+            results_body = b'{' + b','.join(
+                to_json_bytes(instrument) + b':' + instrument_body
+                for instrument, instrument_body in instrument_bodies.items()
+            ) + b'}'
+
+        if _reuse is not None and news is _reuse.news:
+            news_body = _reuse.news_body
+        else:
+            news = news or {}
+            news_body = to_json_bytes(news)
+
+        meta_body = to_json_bytes({
+            'last_update': last_update,
+            'scanning': scanning,
+            'stale': stale,
+            'scan_count': scan_id,
+            'scan_id': scan_id,
+            'version': version,
+            'seq': seq
+        })
+        body = (b'{"screener_results":' + results_body + b',"news":' + news_body +
+                b',' + meta_body[1:])
+
+        values = {
+            'scan_id': scan_id,
+            'version': version,
+            'seq': seq,
+            'instrument_seqs': dict(instrument_seqs or {}),
+            'changes': dict(changes or {}),
+            'last_update': last_update,
+            'scanning': scanning,
+            'stale': stale,
+            'screener_results': screener_results,
+            'news': news,
+            'body': body,
+            'news_body': news_body,
+            '_results_body': results_body,
+            'instrument_bodies': instrument_bodies,
+            'instrument_etags': instrument_etags,
+            # Content hash: a per-process counter would repeat after a restart
+            'etag': content_etag(body),
+        }
+        for name, value in values.items():
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("ResultsSnapshot is immutable")
+
+    def replace(self, **changes):
+        """
+        Build the next snapshot with some fields changed
+
+        Args:
+            **changes: Any of scan_id, seq, instrument_seqs, changes,
+                last_update, scanning, stale, screener_results, news
+
+        Returns:
+            ResultsSnapshot: New snapshot with the version bumped
+        """
+        fields = {
+            'scan_id': self.scan_id,
+            'seq': self.seq,
+            'instrument_seqs': self.instrument_seqs,
+            'changes': self.changes,
+            'last_update': self.last_update,
+            'scanning': self.scanning,
+            'stale': self.stale,
+            'screener_results': self.screener_results,
+            'news': self.news,
+        }
+        fields.update(changes)
+        return ResultsSnapshot(version=self.version + 1, _reuse=self, **fields)
+
+    def meta(self):
+        """Scalar fields needed to rebuild this snapshot elsewhere"""
+        return {
+            'scan_id': self.scan_id,
+            'version': self.version,
+            'seq': self.seq,
+            'instrument_seqs': self.instrument_seqs,
+            'changes': self.changes,
+            'last_update': self.last_update,
+            'scanning': self.scanning,
+            'stale': self.stale,
+        }
+
+    @classmethod
+    def from_serialized(cls, meta, instrument_bodies, news_body):
+        """
+        Rebuild a snapshot published by another process
+
+        The pre-serialized bodies are reused as-is (so ETags match across
+        processes); they are decoded once only to expose the dicts.
+
+        Args:
+            meta: Dict from ResultsSnapshot.meta()
+            instrument_bodies: {instrument: JSON bytes}
+            news_body: JSON bytes of the news dict
+        """
+        screener_results = {
+            instrument: json.loads(body) for instrument, body in instrument_bodies.items()
+        }
+        results_body = b'{' + b','.join(
+            to_json_bytes(instrument) + b':' + body
+            for instrument, body in instrument_bodies.items()
+        ) + b'}'
+        serialized = SimpleNamespace(
+            screener_results=screener_results,
+            instrument_bodies=instrument_bodies,
+            instrument_etags={
+                instrument: content_etag(body) for instrument, body in instrument_bodies.items()
+            },
+            _results_body=results_body,
+            news=json.loads(news_body),
+            news_body=news_body,
+        )
+        return cls(screener_results=serialized.screener_results, news=serialized.news,
+                   _reuse=serialized, **meta)
+
+
+class SnapshotStore:
+    """Holds the current snapshot and swaps in new ones atomically"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._snapshot = ResultsSnapshot()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """
+        Register a callback(snapshot) run after every publish
+
+        Callbacks run in publish order while the publisher lock is held, so
+        they see snapshots strictly in sequence.
+        """
+        self._listeners.append(callback)
+
+    @property
+    def current(self):
+        """Latest published snapshot (a plain reference read)"""
+        return self._snapshot
+
+    def publish(self, **changes):
+        """
+        Publish a new snapshot derived from the current one
+
+        Args:
+            **changes: Fields to change (see ResultsSnapshot.replace)
+
+        Returns:
+            ResultsSnapshot: The snapshot now being served
+        """
+        # The lock only serializes publishers; readers never take it
+        with self._lock:
+            snapshot = self._snapshot.replace(**changes)
+            self._snapshot = snapshot
+
+            for callback in self._listeners:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    print(f"[ERROR] Snapshot listener failed: {str(e)}")
+        return snapshot
+
+
+def build_delta_body(snapshot, since):
+    """
+    Serialize the instruments that changed after a sequence number
+
+    Changed fields come from the change log carried by the snapshot, so
+    processes that never scan (web workers) can list them too.
+
+    Args:
+        snapshot: ResultsSnapshot to read from
+        since: Client's last seen sequence number
+
+    Returns:
+        bytes: JSON body reusing the pre-serialized instrument bodies
+    """
+    # A client ahead of the server (e.g. after a restart) must resync fully
+    full = since > snapshot.seq or since < 0
+
+    parts = []
+    for instrument, body in snapshot.instrument_bodies.items():
+        instrument_seq = snapshot.instrument_seqs.get(instrument, 0)
+        if not full and instrument_seq <= since:
+            continue
+
+        changed = None
+        if not full:
+            changed = changed_fields(snapshot.changes.get(instrument), since, snapshot.seq)
+
+        parts.append(
+            to_json_bytes(instrument) + b':{"seq":' + to_json_bytes(instrument_seq) +
+            b',"changed_fields":' + to_json_bytes(changed) + b',"data":' + body + b'}'
+        )
+
+    meta_body = to_json_bytes({
+        'seq': snapshot.seq,
+        'since': since,
+        'full': full,
+        'last_update': snapshot.last_update,
+        'scanning': snapshot.scanning,
+        'stale': snapshot.stale,
+        'scan_id': snapshot.scan_id
+    })
+    return b'{"changes":{' + b','.join(parts) + b'},' + meta_body[1:]
@@ -1,20 +1,67 @@
 """
 Risk Calculator for V3
 FTMO-compliant risk management for 100K account
+
+Pip sizes and pip values come from the instrument spec registry
+(config.instruments.INSTRUMENT_SPECS). calculate_position_sizes() sizes many
+candidate trades in one vectorized pass, e.g. every signal of a scan.
 """
 import sys
 import os
+import math
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.api_config import ACCOUNT_SIZE, RISK_PER_TRADE, MAX_DAILY_LOSS, MAX_TOTAL_LOSS
+from config.settings import get_settings
+from config.instruments import get_instrument_spec
+
+settings = get_settings()
+
+
+def pip_size(instrument):
+    """Price change of one pip (from the instrument spec registry)"""
+    return get_instrument_spec(instrument)['pip_size']
+
+
+def price_digits(instrument):
+    """Decimals quoted for an instrument (one below the pip: 5 for EURUSD, 3 for USDJPY)"""
+    return max(0, round(-math.log10(pip_size(instrument)))) + 1
+
+
+def trade_setup(direction, entry, atr, instrument=None):
+    """
+    ATR-based stop loss and take profit for a signal
+
+    Args:
+        direction: 'BUY' or 'SELL'
+        entry: Entry price
+        atr: H4 ATR
+        instrument: Rounds the prices to the instrument's quote precision
+
+    Returns:
+        tuple: (stop_loss, take_profit), or (None, None) without entry/ATR
+    """
+    if entry is None or not atr or atr != atr:  # atr != atr: NaN
+        return None, None
+
+    risk = atr * settings.TRADE_SETUP_CONFIG['atr_multiplier']
+    reward = risk * settings.TRADE_SETUP_CONFIG['reward_risk']
+    if direction == 'BUY':
+        stop_loss, take_profit = entry - risk, entry + reward
+    else:
+        stop_loss, take_profit = entry + risk, entry - reward
+
+    if instrument is not None:
+        digits = price_digits(instrument)
+        stop_loss, take_profit = round(stop_loss, digits), round(take_profit, digits)
+    return stop_loss, take_profit
 
 
 class RiskCalculator:
     def __init__(self, account_balance=None, risk_percent=None):
-        self.account_balance = account_balance or ACCOUNT_SIZE
-        self.risk_percent = risk_percent or RISK_PER_TRADE
-        self.max_daily_loss_percent = MAX_DAILY_LOSS
-        self.max_total_loss_percent = MAX_TOTAL_LOSS
+        self.account_balance = account_balance or settings.ACCOUNT_SIZE
+        self.risk_percent = risk_percent or settings.RISK_PER_TRADE
+        self.max_daily_loss_percent = settings.MAX_DAILY_LOSS
+        self.max_total_loss_percent = settings.MAX_TOTAL_LOSS
 
     def calculate_position_size(self, entry_price, stop_loss, instrument='EURUSD'):
         """
@@ -31,27 +78,10 @@ class RiskCalculator:
         risk_amount = self.account_balance * (self.risk_percent / 100)
         sl_distance = abs(entry_price - stop_loss)
 
-        # Calculate pip value (varies by instrument)
-        if 'JPY' in instrument:
-            # JPY pairs: 1 pip = 0.01
-            pips = sl_distance * 100
-            pip_value = 10  # For standard lot
-        elif 'XAU' in instrument or 'GOLD' in instrument:
-            # Gold: 1 pip = 0.10
-            pips = sl_distance * 10
-            pip_value = 10
-        elif 'WTI' in instrument or 'OIL' in instrument:
-            # Oil: 1 pip = 0.01
-            pips = sl_distance * 100
-            pip_value = 10
-        elif 'NAS' in instrument:
-            # NAS100: 1 pip = 0.10
-            pips = sl_distance * 10
-            pip_value = 1
-        else:
-            # Standard forex pairs: 1 pip = 0.0001
-            pips = sl_distance * 10000
-            pip_value = 10  # For standard lot
+        # Pip size and value per standard lot vary by instrument
+        spec = get_instrument_spec(instrument)
+        pips = sl_distance / spec['pip_size']
+        pip_value = spec['pip_value']
 
         # Calculate lot size
         position_size = risk_amount / (pips * pip_value) if pips > 0 else 0
@@ -168,7 +198,8 @@ class RiskCalculator:
         rr_ratio = tp_distance / sl_distance if sl_distance > 0 else 0
 
         # Calculate potential profit
-        potential_profit = position_info['position_size_lots'] * (tp_distance * 10000) * position_info['pip_value']
+        tp_pips = tp_distance / pip_size(instrument)
+        potential_profit = position_info['position_size_lots'] * tp_pips * position_info['pip_value']
 
         return {
             'instrument': instrument,
@@ -180,16 +211,156 @@ class RiskCalculator:
             'potential_profit': round(potential_profit, 2),
             'rr_ratio': round(rr_ratio, 2),
             'sl_pips': position_info['sl_distance_pips'],
-            'tp_pips': round((tp_distance * 10000 if 'JPY' not in instrument else tp_distance * 100), 1),
+            'tp_pips': round(tp_pips, 1),
             'risk_percent': position_info['risk_percent']
         }
 
+    def calculate_position_sizes(self, trades):
+        """
+        Trade recommendations for many candidate trades in one vectorized pass
+
+        Same figures as get_trade_recommendation() per trade: the arithmetic
+        is vectorized, but results are rounded with round() as the scalar path
+        does (np.round can differ on ties). Trades without a take profit get
+        one at 2:1 (calculate_take_profit()).
+
+        Args:
+            trades: List of dicts with 'instrument', 'entry', 'stop_loss' and
+                optionally 'take_profit'
+
+        Returns:
+            list: get_trade_recommendation() dicts, in the order of trades
+        """
+        if not trades:
+            return []
+
+        # Only the scanner and the batch endpoint size in bulk; web workers
+        # importing this module stay free of numpy
+        import numpy as np
+
+        instruments = [trade['instrument'] for trade in trades]
+        specs = [get_instrument_spec(instrument) for instrument in instruments]
+        pip = np.array([spec['pip_size'] for spec in specs], dtype=np.float64)
+        pip_value = np.array([spec['pip_value'] for spec in specs], dtype=np.float64)
+        entry = np.array([trade['entry'] for trade in trades], dtype=np.float64)
+        stop_loss = np.array([trade['stop_loss'] for trade in trades], dtype=np.float64)
+        take_profit = np.array([trade.get('take_profit') or np.nan for trade in trades], dtype=np.float64)
+
+        def rounded(values, digits):
+            return np.array([round(value, digits) for value in values.tolist()], dtype=np.float64)
+
+        sl_distance = np.abs(entry - stop_loss)
+        missing_tp = np.isnan(take_profit)
+        default_tp = rounded(np.where(entry > stop_loss, entry + 2 * sl_distance, entry - 2 * sl_distance), 5)
+        take_profit = np.where(missing_tp, default_tp, take_profit)
+        tp_distance = np.abs(take_profit - entry)
+
+        risk_amount = self.account_balance * (self.risk_percent / 100)
+        sl_pips = sl_distance / pip
+        tp_pips = tp_distance / pip
+        with np.errstate(divide='ignore', invalid='ignore'):
+            lots = np.where(sl_pips > 0, risk_amount / (sl_pips * pip_value), 0.0)
+            rr_ratio = np.where(sl_distance > 0, tp_distance / sl_distance, 0.0)
+        lots = rounded(lots, 2)
+        actual_risk = lots * sl_pips * pip_value
+        potential_profit = lots * tp_pips * pip_value
+
+        columns = {
+            'position_size': lots,
+            'risk_amount': rounded(actual_risk, 2),
+            'potential_profit': rounded(potential_profit, 2),
+            'rr_ratio': rounded(rr_ratio, 2),
+            'sl_pips': rounded(sl_pips, 1),
+            'tp_pips': rounded(tp_pips, 1),
+            'risk_percent': rounded(actual_risk / self.account_balance * 100, 2),
+        }
+        columns = {key: values.tolist() for key, values in columns.items()}
+        take_profit = take_profit.tolist()
+
+        return [
+            {
+                'instrument': instrument,
+                'entry': trade['entry'],
+                'stop_loss': trade['stop_loss'],
+                'take_profit': trade.get('take_profit') or take_profit[i],
+                **{key: values[i] for key, values in columns.items()},
+            }
+            for i, (instrument, trade) in enumerate(zip(instruments, trades))
+        ]
+
+    def aggregate_exposure(self, positions, correlation, threshold=None):
+        """
+        Combined risk of several positions taken together
+
+        Each position's stop-loss risk is signed by direction, and the
+        correlated risk is sqrt(w' C w). Two highly correlated positions in
+        the same direction count close to one doubled bet, and opposite
+        directions partly hedge. Pairs without enough shared bars count as
+        uncorrelated and are listed in 'unknown_pairs'.
+
+        Args:
+            positions: List of dicts with 'instrument', 'direction' ('BUY'/'SELL')
+                and optionally 'risk_amount' (default: one trade at risk_percent)
+            correlation: CorrelationEngine.matrix() result
+            threshold: |correlation| at which a pair is reported
+                (default CORRELATION_CONFIG['high_correlation'])
+
+        Returns:
+            dict: Aggregate exposure
+        """
+        threshold = settings.CORRELATION_CONFIG['high_correlation'] if threshold is None else threshold
+        default_risk = self.account_balance * (self.risk_percent / 100)
+        index = {name: i for i, name in enumerate(correlation['instruments'])}
+        matrix = correlation['matrix']
+
+        legs = []
+        for position in positions:
+            sign = 1 if position['direction'] == 'BUY' else -1
+            legs.append((position['instrument'], sign * position.get('risk_amount', default_risk)))
+
+        variance = 0.0
+        correlated, unknown = [], []
+        for a, (name_a, weight_a) in enumerate(legs):
+            variance += weight_a * weight_a
+            for name_b, weight_b in legs[a + 1:]:
+                i, j = index.get(name_a), index.get(name_b)
+                rho = matrix[i][j] if i is not None and j is not None else None
+                if rho is None:
+                    unknown.append([name_a, name_b])
+                    continue
+                variance += 2 * weight_a * weight_b * rho
+                # Correlation of the two positions' P&L (direction applied)
+                position_rho = rho if (weight_a > 0) == (weight_b > 0) else -rho
+                if abs(rho) >= threshold:
+                    correlated.append({
+                        'instruments': [name_a, name_b],
+                        'correlation': rho,
+                        'position_correlation': round(position_rho, 4),
+                        'hedged': position_rho < 0,
+                    })
+
+        total_risk = sum(abs(weight) for _, weight in legs)
+        correlated_risk = math.sqrt(max(variance, 0.0))
+        max_daily_loss = self.account_balance * (self.max_daily_loss_percent / 100)
+
+        return {
+            'timeframe': correlation.get('timeframe'),
+            'positions': len(legs),
+            'total_risk': round(total_risk, 2),
+            'correlated_risk': round(correlated_risk, 2),
+            'correlated_risk_percent': round(correlated_risk / self.account_balance * 100, 2),
+            'effective_bets': round(total_risk ** 2 / variance, 2) if variance > 0 else 0,
+            'correlated_pairs': sorted(correlated, key=lambda p: -abs(p['correlation'])),
+            'unknown_pairs': unknown,
+            'within_daily_limit': total_risk <= max_daily_loss,
+        }
+
 
 if __name__ == "__main__":
     # Test risk calculator
     print("Testing Risk Calculator...")
-    print(f"Account Size: ${ACCOUNT_SIZE:,}")
-    print(f"Risk per Trade: {RISK_PER_TRADE}%\n")
+    print(f"Account Size: ${settings.ACCOUNT_SIZE:,}")
+    print(f"Risk per Trade: {settings.RISK_PER_TRADE}%\n")
 
     calculator = RiskCalculator()
 
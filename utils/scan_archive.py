@@ -0,0 +1,410 @@
+"""
+Scan Archive for V3
+Every scan's full results as date-partitioned Parquet files.
+
+One row per (scan, instrument, timeframe) holds that timeframe's trend, ADX,
+cross and pullback readings next to the instrument's signals, confidence
+breakdowns and key levels, under
+
+    <SCAN_ARCHIVE_DIR>/date=YYYY-MM-DD/scan-*.parquet
+
+Reads go through pyarrow.dataset, so date ranges prune whole partitions and
+instrument/timeframe/column filters are pushed down to the row groups:
+
+    archive.query(start='2026-03-01', end='2026-03-31', instrument='EURUSD',
+                  timeframe='H4', where=pc.field('ma_cross_type').isin(['GOLDEN', 'DEATH']))
+
+A day's small per-scan files are compacted into one sorted file once the day
+is over. pyarrow is optional; without it the archive is disabled.
+
+    python utils/scan_archive.py --instrument EURUSD --timeframe H4 --start 2026-03-01 --end 2026-03-31
+"""
+import argparse
+import glob
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TIMEFRAMES = ('M5', 'M15', 'H1', 'H4', 'D')
+
+# (prefix, results key, confidence key) per strategy
+STRATEGIES = (
+    ('sma', 'sma', 'sma_confidence'),
+    ('ma_cross', 'ma_cross', 'ma_cross_confidence'),
+    ('ma_pullback', 'ma_pullback', 'ma_pullback_confidence'),
+)
+
+BREAKDOWN_FACTORS = ('timeframe_alignment', 'ma_convergence', 'trend_strength', 'volatility', 'win_rate', 'event_risk',
+                     'currency_strength')
+
+PIVOTS = ('PP', 'R1', 'R2', 'R3', 'S1', 'S2', 'S3')
+
+COMPACTED_FILE = 'compacted.parquet'
+
+
+def _pyarrow():
+    """pyarrow modules, or None if it isn't installed"""
+    try:
+        import pyarrow
+        import pyarrow.compute
+        import pyarrow.dataset
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def archive_schema(pa):
+    """Arrow schema of the archive rows"""
+    fields = [
+        ('scan_time', pa.timestamp('s', tz='UTC')),
+        ('scan_id', pa.int32()),
+        ('instrument', pa.string()),
+        ('timeframe', pa.string()),
+        # Per-timeframe readings
+        ('sma_trend', pa.int8()),
+        ('sma_adx', pa.string()),
+        ('sma_adx_value', pa.float32()),
+        ('ma_cross_signal', pa.int8()),
+        ('ma_cross_type', pa.string()),
+        ('ma_cross_strength', pa.float32()),
+        ('ma_pullback_signal', pa.int8()),
+        ('ma_pullback_type', pa.string()),
+        ('ma_pullback_strength', pa.float32()),
+        ('supertrend', pa.int8()),
+        ('synthetic', pa.bool_()),  # Candles derived from the majors (utils/synthetic_rates.py)
+        # Instrument-level results (repeated for each timeframe)
+        ('overall_signal', pa.string()),
+        ('best_strategy', pa.string()),
+        ('best_confidence', pa.int16()),
+    ]
+    for prefix, _, _ in STRATEGIES:
+        fields += [
+            (f'{prefix}_overall', pa.string()),
+            (f'{prefix}_score', pa.int16()),
+            (f'{prefix}_confidence', pa.int16()),
+        ]
+        fields += [(f'{prefix}_{factor}', pa.int16()) for factor in BREAKDOWN_FACTORS]
+    fields += [
+        ('current_price', pa.float64()),
+        ('atr_h4', pa.float64()),
+        ('atr_h1', pa.float64()),
+        ('pattern_h4', pa.string()),
+        ('pattern_h1', pa.string()),
+    ]
+    fields += [(f'pivot_{name.lower()}', pa.float64()) for name in PIVOTS]
+    fields += [
+        ('key_levels', pa.list_(pa.struct([
+            ('type', pa.string()),
+            ('price', pa.float64()),
+            ('timeframe', pa.string()),
+        ]))),
+    ]
+    return pa.schema(fields)
+
+
+def _float(value):
+    return None if value is None else float(value)
+
+
+def _int(value):
+    return None if value is None else int(value)
+
+
+def build_archive_rows(results, scan_id, scan_time):
+    """
+    Flatten one scan into archive rows
+
+    Args:
+        results: {instrument: analyze_instrument() results}
+        scan_id: Scan number
+        scan_time: Aware datetime of the scan
+
+    Returns:
+        list: Row dicts matching archive_schema()
+    """
+    rows = []
+    for instrument, data in results.items():
+        sma = data.get('sma') or {}
+        ma_cross = data.get('ma_cross') or {}
+        ma_pullback = data.get('ma_pullback') or {}
+        supertrend = data.get('supertrend') or {}
+        technical = data.get('technical_analysis') or {}
+        pivots = technical.get('daily_pivots') or {}
+        synthetic = (data.get('synthetic') or {}).get('timeframes') or ()
+
+        common = {
+            'scan_time': scan_time,
+            'scan_id': scan_id,
+            'instrument': instrument,
+            'overall_signal': data.get('overall_signal'),
+            'best_strategy': data.get('best_strategy'),
+            'best_confidence': _int(data.get('best_confidence')),
+            'current_price': _float(technical.get('current_price')),
+            'atr_h4': _float(technical.get('atr_h4')),
+            'atr_h1': _float(technical.get('atr_h1')),
+            'pattern_h4': technical.get('pattern_h4'),
+            'pattern_h1': technical.get('pattern_h1'),
+            'key_levels': [
+                {'type': level['type'], 'price': _float(level['price']), 'timeframe': level['timeframe']}
+                for level in technical.get('key_levels') or []
+            ],
+        }
+        for prefix, results_key, confidence_key in STRATEGIES:
+            strategy = data.get(results_key) or {}
+            confidence = data.get(confidence_key) or {}
+            breakdown = confidence.get('breakdown') or {}
+            common[f'{prefix}_overall'] = strategy.get('overall')
+            common[f'{prefix}_score'] = _int(strategy.get('score'))
+            common[f'{prefix}_confidence'] = _int(confidence.get('confidence'))
+            for factor in BREAKDOWN_FACTORS:
+                common[f'{prefix}_{factor}'] = _int(breakdown.get(factor))
+        for name in PIVOTS:
+            common[f'pivot_{name.lower()}'] = _float(pivots.get(name))
+
+        for tf in TIMEFRAMES:
+            row = dict(common)
+            row.update({
+                'timeframe': tf,
+                'sma_trend': _int(sma.get(tf)),
+                'sma_adx': sma.get(f'{tf}_adx'),
+                'sma_adx_value': _float(sma.get(f'{tf}_adx_value')),
+                'ma_cross_signal': _int(ma_cross.get(tf)),
+                'ma_cross_type': ma_cross.get(f'{tf}_cross'),
+                'ma_cross_strength': _float(ma_cross.get(f'{tf}_strength')),
+                'ma_pullback_signal': _int(ma_pullback.get(tf)),
+                'ma_pullback_type': ma_pullback.get(f'{tf}_pullback'),
+                'ma_pullback_strength': _float(ma_pullback.get(f'{tf}_strength')),
+                'supertrend': _int(supertrend.get(tf)),
+                'synthetic': tf in synthetic,
+            })
+            rows.append(row)
+    return rows
+
+
+class ScanArchive:
+    def __init__(self, directory, max_pending=10):
+        """
+        Args:
+            directory: Archive root (partition directories are created below it)
+            max_pending: Scans waiting to be written before new ones are dropped
+
+        Raises:
+            ImportError: pyarrow is not installed
+        """
+        self.pa = _pyarrow()
+        if self.pa is None:
+            raise ImportError("pyarrow is required for the scan archive (pip install pyarrow)")
+
+        self.directory = directory
+        self.schema = archive_schema(self.pa)
+        self.max_pending = max_pending
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._last_date = None
+        # One writer thread keeps files of the same partition from racing
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='scan-archive')
+
+    def submit(self, results, scan_id=None):
+        """
+        Archive a scan in the background (never blocks)
+
+        Returns:
+            bool: False if too many scans were pending and this one was dropped
+        """
+        with self._lock:
+            if self._pending >= self.max_pending:
+                print("[ERROR] Scan archive is behind - scan not archived")
+                return False
+            self._pending += 1
+
+        scan_time = datetime.now(timezone.utc).replace(microsecond=0)
+        self._executor.submit(self._write_in_background, results, scan_id, scan_time)
+        return True
+
+    def _write_in_background(self, results, scan_id, scan_time):
+        try:
+            self.write_scan(results, scan_id, scan_time)
+        except Exception as e:
+            print(f"[ERROR] Failed to archive scan: {str(e)}")
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def partition_path(self, day):
+        return os.path.join(self.directory, f'date={day}')
+
+    def write_scan(self, results, scan_id=None, scan_time=None):
+        """
+        Write one scan as a Parquet file in its date partition
+
+        Returns:
+            str: Path of the written file (None if there was nothing to write)
+        """
+        scan_time = scan_time or datetime.now(timezone.utc).replace(microsecond=0)
+        rows = build_archive_rows(results, scan_id, scan_time)
+        if not rows:
+            return None
+
+        day = scan_time.strftime('%Y-%m-%d')
+        directory = self.partition_path(day)
+        os.makedirs(directory, exist_ok=True)
+
+        table = self.pa.Table.from_pylist(rows, schema=self.schema)
+        name = f"scan-{scan_time.strftime('%H%M%S')}-{scan_id or 0}.parquet"
+        path = os.path.join(directory, name)
+        # Dot-prefixed temp file: dataset discovery skips it until the rename
+        temp_path = os.path.join(directory, f'.{name}.tmp')
+        self.pa.parquet.write_table(table, temp_path, compression='zstd')
+        os.replace(temp_path, path)
+
+        # First scan of a new day: the previous days are complete
+        if self._last_date is not None and self._last_date != day:
+            self.compact(before=day)
+        self._last_date = day
+        return path
+
+    def compact(self, before=None):
+        """
+        Merge each finished day's per-scan files into one sorted file
+
+        Sorting by instrument/timeframe/time gives tight row-group statistics,
+        so filtered reads skip most of the file.
+
+        Args:
+            before: Only compact days before this 'YYYY-MM-DD' (default: today, UTC)
+
+        Returns:
+            int: Partitions compacted
+        """
+        before = before or datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        compacted = 0
+        for directory in sorted(glob.glob(os.path.join(self.directory, 'date=*'))):
+            day = directory.rsplit('=', 1)[-1]
+            files = sorted(glob.glob(os.path.join(directory, 'scan-*.parquet')))
+            if day >= before or not files:
+                continue
+
+            existing = os.path.join(directory, COMPACTED_FILE)
+            sources = files + ([existing] if os.path.exists(existing) else [])
+            table = self.pa.concat_tables(
+                [self.pa.parquet.read_table(path, schema=self.schema) for path in sources]
+            ).sort_by([('instrument', 'ascending'), ('timeframe', 'ascending'), ('scan_time', 'ascending')])
+
+            temp_path = os.path.join(directory, f'.{COMPACTED_FILE}.tmp')
+            self.pa.parquet.write_table(table, temp_path, compression='zstd', row_group_size=10000)
+            os.replace(temp_path, existing)
+            for path in files:
+                os.remove(path)
+            compacted += 1
+        return compacted
+
+    def dataset(self):
+        """pyarrow Dataset over the whole archive (date is a partition column)"""
+        return self.pa.dataset.dataset(
+            self.directory,
+            schema=self.schema.append(self.pa.field('date', self.pa.string())),
+            format='parquet',
+            partitioning='hive',
+        )
+
+    def query(self, start=None, end=None, instrument=None, timeframe=None, where=None, columns=None):
+        """
+        Read archived rows with partition pruning and filter pushdown
+
+        Args:
+            start, end: Inclusive 'YYYY-MM-DD' UTC dates
+            instrument: Instrument name or list of names
+            timeframe: Timeframe or list of timeframes
+            where: Extra pyarrow.compute expression (e.g. pc.field('sma_trend') == 1)
+            columns: Columns to read (default: all)
+
+        Returns:
+            pyarrow.Table (call .to_pandas() for a DataFrame)
+        """
+        if not os.path.isdir(self.directory):
+            return self.schema.empty_table()
+
+        field = self.pa.compute.field
+        conditions = []
+        if start:
+            conditions.append(field('date') >= str(start))
+        if end:
+            conditions.append(field('date') <= str(end))
+        for name, value in (('instrument', instrument), ('timeframe', timeframe)):
+            if value is None:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                conditions.append(field(name).isin(list(value)))
+            else:
+                conditions.append(field(name) == value)
+        if where is not None:
+            conditions.append(where)
+
+        expression = None
+        for condition in conditions:
+            expression = condition if expression is None else expression & condition
+
+        return self.dataset().to_table(columns=columns, filter=expression)
+
+
+def create_scan_archive():
+    """ScanArchive from config, or None if disabled or pyarrow is missing"""
+    from config.settings import get_settings
+    settings = get_settings()
+
+    if not settings.SCAN_ARCHIVE:
+        return None
+    try:
+        archive = ScanArchive(settings.SCAN_ARCHIVE_DIR)
+    except ImportError as e:
+        print(f"[WARN] Scan archive disabled: {str(e)}")
+        return None
+
+    print(f"[OK] Archiving scans to {settings.SCAN_ARCHIVE_DIR}")
+    return archive
+
+
+def main():
+    from config.settings import get_settings
+    settings = get_settings()
+
+    parser = argparse.ArgumentParser(description='Query the Parquet scan archive')
+    parser.add_argument('--start', help='First date (YYYY-MM-DD, UTC)')
+    parser.add_argument('--end', help='Last date (YYYY-MM-DD, UTC)')
+    parser.add_argument('--instrument', action='append', help='Instrument (repeatable)')
+    parser.add_argument('--timeframe', action='append', help='Timeframe (repeatable)')
+    parser.add_argument('--columns', help='Comma-separated columns to read')
+    parser.add_argument('--compact', action='store_true', help="Compact finished days first")
+    parser.add_argument('--output', help='Write the result to this .parquet or .csv file')
+    args = parser.parse_args()
+
+    try:
+        archive = ScanArchive(settings.SCAN_ARCHIVE_DIR)
+    except ImportError as e:
+        print(f"[ERROR] {str(e)}")
+        sys.exit(1)
+
+    if args.compact:
+        print(f"[OK] Compacted {archive.compact()} partitions")
+
+    columns = args.columns.split(',') if args.columns else None
+    table = archive.query(args.start, args.end, args.instrument, args.timeframe, columns=columns)
+    print(f"{table.num_rows} rows, {table.num_columns} columns")
+
+    if args.output:
+        if args.output.endswith('.csv'):
+            table.to_pandas().to_csv(args.output, index=False)
+        else:
+            archive.pa.parquet.write_table(table, args.output, compression='zstd')
+        print(f"[OK] Wrote {args.output}")
+    elif table.num_rows:
+        print(table.slice(0, 20).to_pandas().to_string())
+
+
+if __name__ == "__main__":
+    main()
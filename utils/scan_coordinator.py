@@ -0,0 +1,129 @@
+"""
+Scan Coordinator for V3
+Single-flight coordination of screener scans: only one scan runs at a time,
+and every caller that asks for a scan while one is in flight joins it and
+receives the same result instead of starting another.
+"""
+import threading
+from datetime import datetime
+
+
+class ScanTicket:
+    """Handle for a single scan run, shared by every caller that joined it"""
+
+    def __init__(self, scan_number):
+        self.scan_number = scan_number
+        self.started_at = datetime.now()
+        self.finished_at = None
+        self.result = None
+        self.error = None
+        self._done = threading.Event()
+
+    def done(self):
+        """Return True once the scan has finished (successfully or not)"""
+        return self._done.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Block until the scan finishes
+
+        Args:
+            timeout: Seconds to wait (None waits forever)
+
+        Returns:
+            bool: True if the scan finished within the timeout
+        """
+        return self._done.wait(timeout)
+
+    def _finish(self, result=None, error=None):
+        self.result = result
+        self.error = error
+        self.finished_at = datetime.now()
+        self._done.set()
+
+
+class ScanCoordinator:
+    def __init__(self, scan_function):
+        """
+        Args:
+            scan_function: Callable run for each scan; its return value is
+                handed to every caller that joined that scan
+        """
+        self.scan_function = scan_function
+        self._lock = threading.Lock()
+        self._current = None
+        self._last = None
+        self._scan_number = 0
+
+    @property
+    def scanning(self):
+        """True while a scan is in flight"""
+        with self._lock:
+            return self._current is not None
+
+    @property
+    def last_ticket(self):
+        """Ticket of the most recently finished scan (or None)"""
+        with self._lock:
+            return self._last
+
+    def _claim(self):
+        """
+        Join the in-flight scan or claim a new one
+
+        Returns:
+            tuple: (ticket, owner) - owner is True if the caller must run it
+        """
+        with self._lock:
+            if self._current is not None:
+                return self._current, False
+
+            self._scan_number += 1
+            self._current = ScanTicket(self._scan_number)
+            return self._current, True
+
+    def _run(self, ticket):
+        """Execute the scan for a claimed ticket and release it"""
+        result = None
+        error = None
+        try:
+            result = self.scan_function()
+        except Exception as e:
+            error = e
+            print(f"[ERROR] Scan #{ticket.scan_number} failed: {str(e)}")
+
+        with self._lock:
+            self._current = None
+            self._last = ticket
+
+        ticket._finish(result, error)
+
+    def request_scan(self):
+        """
+        Start a scan in a background thread, or join the one in flight
+
+        Returns:
+            tuple: (ticket, started) - started is False when joining
+        """
+        ticket, owner = self._claim()
+        if owner:
+            threading.Thread(target=self._run, args=(ticket,), daemon=True).start()
+        return ticket, owner
+
+    def run_scan(self, timeout=None):
+        """
+        Run a scan in the calling thread, or wait for the one in flight
+
+        Args:
+            timeout: Max seconds to wait when joining another caller's scan
+
+        Returns:
+            ScanTicket: The finished (or, on timeout, still running) ticket
+        """
+        ticket, owner = self._claim()
+        if owner:
+            self._run(ticket)
+        else:
+            print(f"[INFO] Joining in-flight scan #{ticket.scan_number}")
+            ticket.wait(timeout)
+        return ticket
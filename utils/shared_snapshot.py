@@ -0,0 +1,161 @@
+"""
+Shared Snapshot for V3
+Hands the scanner process's latest results snapshot to gunicorn web workers
+through a memory-mapped file, so workers never run scans themselves.
+
+File layout:
+    MAGIC (8 bytes) | header length (uint32 LE) | header JSON | blobs
+
+The header holds the snapshot meta plus offsets of the pre-serialized JSON
+bodies inside the blob region. Files are written to a temporary name and
+renamed into place, so readers always see a complete snapshot.
+"""
+import json
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+
+from utils.results_snapshot import ResultsSnapshot
+
+MAGIC = b'FXSNAP01'
+HEADER_LENGTH = struct.Struct('<I')
+
+
+class SharedSnapshotWriter:
+    def __init__(self, path):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def write(self, snapshot):
+        """
+        Atomically replace the shared file with a snapshot
+
+        Args:
+            snapshot: ResultsSnapshot to publish
+        """
+        blobs = []
+        offset = 0
+        instruments = []
+        for instrument, body in snapshot.instrument_bodies.items():
+            instruments.append([instrument, offset, len(body)])
+            blobs.append(body)
+            offset += len(body)
+
+        news = [offset, len(snapshot.news_body)]
+        blobs.append(snapshot.news_body)
+
+        header = json.dumps({
+            'meta': snapshot.meta(),
+            'instruments': instruments,
+            'news': news,
+            'written_at': time.time()
+        }, separators=(',', ':')).encode('utf-8')
+
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(prefix='.snapshot-', dir=directory)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(MAGIC)
+                f.write(HEADER_LENGTH.pack(len(header)))
+                f.write(header)
+                for blob in blobs:
+                    f.write(blob)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+
+def read_snapshot_file(path):
+    """
+    Load a snapshot file written by SharedSnapshotWriter
+
+    Returns:
+        ResultsSnapshot or None if the file is missing or invalid
+    """
+    try:
+        with open(path, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if mm[:len(MAGIC)] != MAGIC:
+                    print(f"[WARN] Ignoring invalid snapshot file: {path}")
+                    return None
+
+                start = len(MAGIC)
+                (header_length,) = HEADER_LENGTH.unpack_from(mm, start)
+                start += HEADER_LENGTH.size
+                header = json.loads(mm[start:start + header_length])
+                blob_start = start + header_length
+
+                instrument_bodies = {
+                    instrument: mm[blob_start + offset:blob_start + offset + length]
+                    for instrument, offset, length in header['instruments']
+                }
+                news_offset, news_length = header['news']
+                news_body = mm[blob_start + news_offset:blob_start + news_offset + news_length]
+
+        return ResultsSnapshot.from_serialized(header['meta'], instrument_bodies, news_body)
+
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"[ERROR] Failed to read snapshot file {path}: {str(e)}")
+        return None
+
+
+class SharedSnapshotReader:
+    """
+    Drop-in replacement for SnapshotStore in web workers
+
+    `current` re-checks the file at most every poll_interval seconds and only
+    re-reads it when the scanner has replaced it.
+    """
+
+    def __init__(self, path, poll_interval=1.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self._lock = threading.Lock()
+        self._snapshot = ResultsSnapshot()
+        self._file_id = None
+        self._next_check = 0.0
+        self.published_at = None  # mtime (epoch seconds) of the loaded file
+
+    @property
+    def current(self):
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._refresh(now)
+        return self._snapshot
+
+    def age(self):
+        """Seconds since the scanner published the current snapshot (None before the first)"""
+        self.current
+        return None if self.published_at is None else max(time.time() - self.published_at, 0.0)
+
+    def _refresh(self, now):
+        with self._lock:
+            if now < self._next_check:
+                return
+            self._next_check = now + self.poll_interval
+
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                return
+
+            file_id = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            if file_id == self._file_id:
+                return
+
+            snapshot = read_snapshot_file(self.path)
+            if snapshot is not None:
+                self._snapshot = snapshot
+                self._file_id = file_id
+                self.published_at = stat.st_mtime
@@ -0,0 +1,208 @@
+"""
+Signal Recorder for V3
+Writes every scan's signals to the signals table (database_schema.sql).
+
+Every scan is recorded, but a signal that persists across scans is one trade
+idea, not one per scan: rows are flagged is_new only when the direction
+differs from the previous recorded scan (including after a neutral scan).
+Outcomes, win rates and performance are evaluated on those rows only.
+
+record_scan() only queues the results; a background thread turns them into
+rows and writes each scan in one batched transaction, so the scan loop never
+waits on the database. The same thread then resolves open signals with the
+outcome tracker.
+"""
+import queue
+import sys
+import os
+import threading
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import registry, timed
+from utils.risk_calculator import trade_setup
+from utils.win_rates import alignment_score
+
+SIGNALS_RECORDED = registry.counter(
+    'screener_signals_recorded_total',
+    'Signal rows written to the database'
+)
+SIGNAL_SCANS_DROPPED = registry.counter(
+    'screener_signal_scans_dropped_total',
+    'Scans not recorded because the writer queue was full or the write failed'
+)
+SIGNAL_QUEUE_DEPTH = registry.gauge(
+    'screener_signal_queue_depth',
+    'Scans waiting for the signal writer'
+)
+
+# (strategy key, results key, confidence key) per recorded strategy
+STRATEGIES = (
+    ('sma_trend', 'sma', 'sma_confidence'),
+    ('ma_cross', 'ma_cross', 'ma_cross_confidence'),
+    ('ma_pullback', 'ma_pullback', 'ma_pullback_confidence'),
+)
+
+TIMEFRAMES = ('M5', 'M15', 'H1', 'H4', 'D')
+
+SIGNAL_COLUMNS = (
+    'timestamp', 'instrument', 'strategy', 'signal_type', 'confidence',
+    'entry_price', 'stop_loss', 'take_profit',
+    'm5_signal', 'm15_signal', 'h1_signal', 'h4_signal', 'd_signal',
+    'm5_adx', 'm15_adx', 'h1_adx', 'h4_adx', 'd_adx',
+    'overall_score', 'alignment_score',
+    'daily_pivot', 'r1', 'r2', 'r3', 's1', 's2', 's3',
+    'pattern', 'scan_id', 'is_new',
+)
+
+# Directions of the most recently recorded scan, to seed is_new after a restart
+LAST_SCAN_DIRECTIONS = (
+    "SELECT instrument, strategy, signal_type FROM signals "
+    "WHERE scan_id = (SELECT scan_id FROM signals ORDER BY id DESC LIMIT 1)"
+)
+
+INSERT_SIGNAL = (
+    f"INSERT INTO signals ({', '.join(SIGNAL_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(SIGNAL_COLUMNS))})"
+)
+
+
+def signal_direction(signal):
+    """'STRONG BUY' -> 'BUY', 'SELL' -> 'SELL', anything else -> None"""
+    if 'BUY' in signal:
+        return 'BUY'
+    if 'SELL' in signal:
+        return 'SELL'
+    return None
+
+
+def _number(value):
+    """numpy scalars -> float (None stays None)"""
+    return None if value is None else float(value)
+
+
+def build_signal_rows(results, scan_id=None, previous=None):
+    """
+    signals rows for one scan: one per instrument and directional strategy
+
+    Args:
+        results: {instrument: analyze_instrument() results}
+        scan_id: Scan number stored with each row
+        previous: {(instrument, strategy): direction} of the previous recorded
+            scan; rows whose direction differs are flagged is_new
+
+    Returns:
+        list: Tuples in SIGNAL_COLUMNS order
+    """
+    previous = previous or {}
+    rows = []
+    for instrument, data in results.items():
+        technical = data.get('technical_analysis') or {}
+        entry = _number(technical.get('current_price'))
+        atr = _number(technical.get('atr_h4'))
+        pivots = technical.get('daily_pivots') or {}
+        pivot_values = tuple(_number(pivots.get(key)) for key in ('PP', 'R1', 'R2', 'R3', 'S1', 'S2', 'S3'))
+        pattern = technical.get('pattern_h4', 'NONE')
+
+        for strategy, results_key, confidence_key in STRATEGIES:
+            signals = data.get(results_key) or {}
+            direction = signal_direction(signals.get('overall', 'NEUTRAL'))
+            if direction is None:
+                continue
+
+            stop_loss, take_profit = trade_setup(direction, entry, atr, instrument)
+            confidence = (data.get(confidence_key) or {}).get('confidence', 0)
+
+            rows.append((
+                data.get('timestamp'), instrument, strategy, direction, confidence,
+                entry, stop_loss, take_profit,
+                *(signals.get(tf) for tf in TIMEFRAMES),
+                *(signals.get(f'{tf}_adx') for tf in TIMEFRAMES),
+                signals.get('score'), alignment_score(signals),
+                *pivot_values,
+                pattern, scan_id, previous.get((instrument, strategy)) != direction,
+            ))
+    return rows
+
+
+class SignalRecorder:
+    def __init__(self, database, max_queue=20, outcome_tracker=None):
+        """
+        Args:
+            database: utils.database.Database
+            max_queue: Scans held before new ones are dropped
+            outcome_tracker: Optional OutcomeTracker run after each write
+        """
+        self.database = database
+        self.outcome_tracker = outcome_tracker
+        self._previous = None  # {(instrument, strategy): direction}; loaded by the writer
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = threading.Thread(target=self._run, daemon=True, name='signal-writer')
+        self._thread.start()
+
+    def record_scan(self, results, scan_id=None):
+        """
+        Queue one scan's results for writing (never blocks)
+
+        Returns:
+            bool: False if the queue was full and the scan was dropped
+        """
+        try:
+            self._queue.put_nowait((results, scan_id))
+        except queue.Full:
+            SIGNAL_SCANS_DROPPED.inc()
+            print("[ERROR] Signal writer queue full - scan not recorded")
+            return False
+        SIGNAL_QUEUE_DEPTH.set(self._queue.qsize())
+        return True
+
+    def write_scan(self, results, scan_id=None):
+        """Write one scan's rows in a single transaction; returns the row count"""
+        if self._previous is None:
+            # Continue from the last recorded scan so a restart doesn't flag
+            # every persisting signal as new
+            self._previous = {
+                (instrument, strategy): direction
+                for instrument, strategy, direction in self.database.query(LAST_SCAN_DIRECTIONS)
+            }
+
+        rows = build_signal_rows(results, scan_id, self._previous)
+        with timed('record_signals'):
+            count = self.database.executemany(INSERT_SIGNAL, rows)
+        SIGNALS_RECORDED.inc(count)
+        self._previous = {(row[1], row[2]): row[3] for row in rows}
+        return count
+
+    @property
+    def pending(self):
+        return self._queue.qsize()
+
+    def stop(self, timeout=10):
+        """Write what is queued (up to timeout), then stop the writer"""
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            SIGNAL_QUEUE_DEPTH.set(self._queue.qsize())
+
+            results, scan_id = item
+            try:
+                count = self.write_scan(results, scan_id)
+                print(f"[OK] Recorded {count} signals (scan {scan_id})")
+            except Exception as e:
+                SIGNAL_SCANS_DROPPED.inc()
+                print(f"[ERROR] Failed to record signals: {str(e)}")
+
+            if self.outcome_tracker:
+                try:
+                    counts = self.outcome_tracker.update()
+                    print(f"[OK] Signal outcomes: {counts['WIN']} win, {counts['LOSS']} loss, "
+                          f"{counts['EXPIRED']} expired, {counts['OPEN']} open")
+                except Exception as e:
+                    print(f"[ERROR] Failed to update signal outcomes: {str(e)}")
@@ -0,0 +1,270 @@
+"""
+Synthetic Cross Rates for V3
+Cross pairs (EURAUD, AUDJPY, GBPJPY, GBPAUD) derived from the USD majors.
+
+Each currency's price in USD comes from its major (EURUSD, or 1/USDJPY), and
+a cross is base-in-USD / quote-in-USD, i.e. a product of the majors raised
+to +1 / -1. Opens and closes of the same bar are simultaneous quotes, so
+they triangulate exactly (up to mid-price rounding). Highs and lows do not,
+because the legs' extremes rarely happen at the same moment. The product of
+the legs' highs only bounds the cross's high, so the cross's wick above
+max(open, close) is approximated as the root-sum-square of the legs' wicks
+in log space. Synthetic frames carry attrs['synthetic'] and list 'high' and
+'low' in attrs['approximated'].
+
+SYNTHETIC_CROSSES=all saves 4 of the 8 OANDA instruments' requests per scan
+(20 of 55 requests overall). The accuracy report compares synthetic and
+native candles per pair/timeframe to decide which crosses to synthesize:
+
+    python utils/synthetic_rates.py --timeframes M15,H1,H4
+"""
+import argparse
+import sys
+import os
+
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.instruments import get_display_name
+from config.settings import get_settings
+from utils.metrics import registry
+from utils.risk_calculator import pip_size
+
+settings = get_settings()
+
+SYNTHETIC_SERIES = registry.counter(
+    'screener_synthetic_series_total',
+    'Cross-pair candle series derived from the majors instead of fetched',
+    ('instrument',)
+)
+
+APPROXIMATED = ('high', 'low')
+
+
+def _split(pair):
+    base, quote = pair.split('_')
+    return base, quote
+
+
+def usd_legs(cross, pairs=settings.OANDA_PAIRS):
+    """
+    Majors and exponents whose product is the cross
+
+    Args:
+        cross: OANDA name, e.g. 'EUR_AUD'
+
+    Returns:
+        tuple: ((major, +1/-1), ...), or None if the cross has a USD leg or a
+            currency without a USD major
+    """
+    base, quote = _split(cross)
+    if 'USD' in (base, quote):
+        return None
+
+    def in_usd(currency):
+        # (major, exponent) giving the currency's price in USD
+        if f'{currency}_USD' in pairs:
+            return f'{currency}_USD', 1
+        if f'USD_{currency}' in pairs:
+            return f'USD_{currency}', -1
+        return None
+
+    base_leg, quote_leg = in_usd(base), in_usd(quote)
+    if base_leg is None or quote_leg is None:
+        return None
+    return base_leg, (quote_leg[0], -quote_leg[1])
+
+
+# Crosses that can be derived from the majors in OANDA_PAIRS
+CROSS_LEGS = {pair: usd_legs(pair) for pair in settings.OANDA_PAIRS if usd_legs(pair) is not None}
+
+
+def configured_crosses(value):
+    """SYNTHETIC_CROSSES setting -> OANDA names of the crosses to synthesize"""
+    value = (value or '').strip()
+    if value.lower() in ('', '0', 'false', 'no'):
+        return ()
+    if value.lower() in ('1', 'all', 'true', 'yes'):
+        return tuple(CROSS_LEGS)
+
+    wanted = {name.strip().upper().replace('/', '').replace('_', '') for name in value.split(',') if name.strip()}
+    unknown = wanted - {get_display_name(pair) for pair in CROSS_LEGS}
+    if unknown:
+        print(f"[WARN] SYNTHETIC_CROSSES: no majors to derive {', '.join(sorted(unknown))}")
+    return tuple(pair for pair in CROSS_LEGS if get_display_name(pair) in wanted)
+
+
+def synthesize(legs):
+    """
+    Cross candles from its legs' candles
+
+    Args:
+        legs: ((CandleSeries, exponent), ...) from usd_legs()
+
+    Returns:
+        pd.DataFrame: Connector-format frame (UTC index, OHLCV) over the bars
+            all legs share, or None if they share none
+    """
+    times = legs[0][0].times
+    for series, _ in legs[1:]:
+        times = np.intersect1d(times, series.times, assume_unique=True)
+    if not len(times):
+        return None
+
+    log_open = np.zeros(len(times))
+    log_close = np.zeros(len(times))
+    wick_up = np.zeros(len(times))
+    wick_down = np.zeros(len(times))
+    volume = None
+
+    for series, exponent in legs:
+        index = np.searchsorted(series.times, times)
+        o, h, l, c = (np.log(getattr(series, name)[index].astype(np.float64)) for name in ('open', 'high', 'low', 'close'))
+        log_open += exponent * o
+        log_close += exponent * c
+        upper = h - np.maximum(o, c)
+        lower = np.minimum(o, c) - l
+        # An inverted leg's low wick is the cross's high wick
+        up, down = (upper, lower) if exponent > 0 else (lower, upper)
+        wick_up += up ** 2
+        wick_down += down ** 2
+        leg_volume = series.volume[index]
+        volume = leg_volume if volume is None else np.minimum(volume, leg_volume)
+
+    top = np.maximum(log_open, log_close)
+    bottom = np.minimum(log_open, log_close)
+
+    index = pd.DatetimeIndex(times.view('datetime64[ns]')).tz_localize('UTC')
+    index.name = 'time'
+    frame = pd.DataFrame({
+        'open': np.exp(log_open),
+        'high': np.exp(top + np.sqrt(wick_up)),
+        'low': np.exp(bottom - np.sqrt(wick_down)),
+        'close': np.exp(log_close),
+        'volume': volume,
+    }, index=index)
+    frame.attrs['synthetic'] = True
+    frame.attrs['approximated'] = list(APPROXIMATED)
+    return frame
+
+
+def synthesize_from_store(cross, timeframe, candle_store):
+    """
+    Cross candles from the majors in the candle store
+
+    The legs must end on the same bar; a leg that failed to refresh this scan
+    (older last bar) makes the caller fetch the cross natively instead.
+
+    Returns:
+        pd.DataFrame or None
+    """
+    legs = CROSS_LEGS.get(cross)
+    if legs is None:
+        return None
+
+    series = []
+    for major, exponent in legs:
+        leg = candle_store.get(get_display_name(major), timeframe)
+        if leg is None or len(leg) == 0:
+            return None
+        series.append((leg, exponent))
+
+    if len({int(leg.times[-1]) for leg, _ in series}) > 1:
+        return None
+
+    frame = synthesize(series)
+    if frame is not None:
+        SYNTHETIC_SERIES.inc(instrument=get_display_name(cross))
+    return frame
+
+
+def compare(native, synthetic, instrument):
+    """
+    Accuracy of synthetic candles against native ones (bars both have)
+
+    Returns:
+        dict: {'bars', and per column 'mean_pips' / 'max_pips' errors, plus
+            'range_ratio' (mean synthetic / native high-low range)}, or None
+    """
+    joined = native[list(APPROXIMATED) + ['open', 'close']].join(
+        synthetic[list(APPROXIMATED) + ['open', 'close']], how='inner', rsuffix='_synthetic'
+    )
+    if joined.empty:
+        return None
+
+    pip = pip_size(get_display_name(instrument))
+    report = {'bars': len(joined)}
+    for column in ('open', 'high', 'low', 'close'):
+        error = (joined[f'{column}_synthetic'] - joined[column]).abs() / pip
+        report[f'{column}_mean_pips'] = round(float(error.mean()), 2)
+        report[f'{column}_max_pips'] = round(float(error.max()), 2)
+
+    native_range = joined['high'] - joined['low']
+    synthetic_range = joined['high_synthetic'] - joined['low_synthetic']
+    ratio = (synthetic_range / native_range.where(native_range > 0)).dropna()
+    report['range_ratio'] = round(float(ratio.mean()), 3) if len(ratio) else None
+    return report
+
+
+def accuracy_report(connector, crosses=None, timeframes=settings.TIMEFRAMES, count=500):
+    """
+    Fetch majors and native crosses and compare them with the synthetic crosses
+
+    Args:
+        connector: OandaConnector
+        crosses: OANDA names (default: every derivable cross)
+
+    Returns:
+        dict: {display name: {timeframe: compare() result or None}}
+    """
+    from utils.candle_store import CandleStore
+
+    crosses = tuple(crosses or CROSS_LEGS)
+    majors = sorted({major for cross in crosses for major, _ in CROSS_LEGS[cross]})
+    report = {}
+
+    for tf in timeframes:
+        store = CandleStore(max_series=len(majors))
+        for major in majors:
+            store.put(get_display_name(major), tf, connector.get_candles(major, tf, count=count))
+
+        for cross in crosses:
+            native = connector.get_candles(cross, tf, count=count)
+            synthetic = synthesize_from_store(cross, tf, store)
+            result = None
+            if native is not None and synthetic is not None:
+                result = compare(native, synthetic, cross)
+            report.setdefault(get_display_name(cross), {})[tf] = result
+
+    return report
+
+
+def main():
+    from connectors.oanda_connector import OandaConnector
+
+    parser = argparse.ArgumentParser(description='Synthetic vs native cross-pair candles')
+    parser.add_argument('--pairs', help='Crosses, e.g. EURAUD,GBPJPY (default: all derivable)')
+    parser.add_argument('--timeframes', default=','.join(settings.TIMEFRAMES), help='Timeframes (default: all)')
+    parser.add_argument('--count', type=int, default=500, help='Candles per request (default: 500)')
+    args = parser.parse_args()
+
+    crosses = configured_crosses(args.pairs) if args.pairs else tuple(CROSS_LEGS)
+    timeframes = [tf.strip() for tf in args.timeframes.split(',') if tf.strip()]
+    report = accuracy_report(OandaConnector(), crosses, timeframes, args.count)
+
+    print(f"\n{'Pair':<8} {'TF':<4} {'Bars':>5}  {'Close':>11}  {'Open':>11}  {'High':>11}  {'Low':>11}  {'Range':>6}")
+    print(f"{'':<19}  {'mean / max pips':>11}")
+    for instrument, by_timeframe in report.items():
+        for tf, result in by_timeframe.items():
+            if result is None:
+                print(f"{instrument:<8} {tf:<4} {'-':>5}  (no data)")
+                continue
+            cells = [f"{result[f'{column}_mean_pips']:>5.1f}/{result[f'{column}_max_pips']:<5.1f}"
+                     for column in ('close', 'open', 'high', 'low')]
+            ratio = result['range_ratio'] if result['range_ratio'] is not None else '-'
+            print(f"{instrument:<8} {tf:<4} {result['bars']:>5}  {'  '.join(cells)}  {ratio:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,15 @@
 Technical Analysis Module for V3
 Includes pivot points, support/resistance levels, and pattern recognition
 """
+import sys
+import os
+
 import pandas as pd
 import numpy as np
 
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.metrics import timed
+
 
 class TechnicalAnalyzer:
     def __init__(self):
@@ -211,20 +217,23 @@ class TechnicalAnalyzer:
 
         # Get daily pivot points
         if 'D' in data_dict and data_dict['D'] is not None:
-            analysis['daily_pivots'] = self.calculate_pivot_points(data_dict['D'])
+            with timed('technical_analysis', instrument, 'D'):
+                analysis['daily_pivots'] = self.calculate_pivot_points(data_dict['D'])
 
         # Get H4 S/R levels
         if 'H4' in data_dict and data_dict['H4'] is not None:
-            analysis['h4_sr_levels'] = self.find_support_resistance(data_dict['H4'])
-            analysis['atr_h4'] = self.calculate_atr(data_dict['H4'])
-            analysis['pattern_h4'] = self.identify_price_action_pattern(data_dict['H4'])
+            with timed('technical_analysis', instrument, 'H4'):
+                analysis['h4_sr_levels'] = self.find_support_resistance(data_dict['H4'])
+                analysis['atr_h4'] = self.calculate_atr(data_dict['H4'])
+                analysis['pattern_h4'] = self.identify_price_action_pattern(data_dict['H4'])
             analysis['current_price'] = data_dict['H4']['close'].iloc[-1]
 
         # Get H1 S/R levels
         if 'H1' in data_dict and data_dict['H1'] is not None:
-            analysis['h1_sr_levels'] = self.find_support_resistance(data_dict['H1'])
-            analysis['atr_h1'] = self.calculate_atr(data_dict['H1'])
-            analysis['pattern_h1'] = self.identify_price_action_pattern(data_dict['H1'])
+            with timed('technical_analysis', instrument, 'H1'):
+                analysis['h1_sr_levels'] = self.find_support_resistance(data_dict['H1'])
+                analysis['atr_h1'] = self.calculate_atr(data_dict['H1'])
+                analysis['pattern_h1'] = self.identify_price_action_pattern(data_dict['H1'])
             if analysis['current_price'] is None:
                 analysis['current_price'] = data_dict['H1']['close'].iloc[-1]
 
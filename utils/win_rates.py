@@ -0,0 +1,189 @@
+"""
+Win Rates for V3
+Historical win rates from signal_outcomes, kept in memory for the scorer.
+
+Counts are loaded once from the database and then updated incrementally by
+the outcome tracker as signals resolve, so a lookup during scoring is a dict
+read instead of a 90-day aggregate query. Only WIN and LOSS count.
+
+The window is whole days: signals dated within the last lookback_days days
+(by signal timestamp). Counts are kept per day, and a day is subtracted as it
+leaves the window, so a long-running process scores with the same counts a
+fresh load() would give.
+"""
+import sys
+import os
+import threading
+from datetime import date, datetime, timedelta
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.settings import get_settings
+
+settings = get_settings()
+
+TIMEFRAMES = ('M5', 'M15', 'H1', 'H4', 'D')
+
+LOAD_COUNTS = (
+    "SELECT DATE(s.timestamp), s.strategy, s.instrument, s.alignment_score, o.outcome, COUNT(*) "
+    "FROM signals s JOIN signal_outcomes o ON o.signal_id = s.id "
+    "WHERE o.outcome IN ('WIN', 'LOSS') AND s.is_new AND s.timestamp >= ? "
+    "GROUP BY DATE(s.timestamp), s.strategy, s.instrument, s.alignment_score, o.outcome"
+)
+
+
+def alignment_score(signal_data):
+    """Number of timeframes (0-5) agreeing with the majority direction"""
+    values = [signal_data.get(tf) or 0 for tf in TIMEFRAMES]
+    return max(sum(1 for v in values if v > 0), sum(1 for v in values if v < 0))
+
+
+def signal_day(timestamp):
+    """signals.timestamp (text on SQLite, TIMESTAMP on PostgreSQL) -> date"""
+    if isinstance(timestamp, datetime):
+        return timestamp.date()
+    if isinstance(timestamp, date):
+        return timestamp
+    return date.fromisoformat(str(timestamp)[:10])
+
+
+def alignment_bucket(score):
+    """Alignment score -> bucket ('full', 'strong', 'moderate', 'weak')"""
+    if score is None:
+        return None
+    if score >= 5:
+        return 'full'
+    if score == 4:
+        return 'strong'
+    if score == 3:
+        return 'moderate'
+    return 'weak'
+
+
+class WinRateProvider:
+    def __init__(self, min_samples=None, lookback_days=None):
+        """
+        Args:
+            min_samples: Resolved signals needed before a win rate is trusted;
+                sparser keys fall back to coarser ones
+            lookback_days: Days of signals counted
+                (default WIN_RATE_CONFIG['lookback_days'])
+        """
+        self.min_samples = min_samples or settings.WIN_RATE_CONFIG['min_samples']
+        self.lookback_days = lookback_days or settings.WIN_RATE_CONFIG['lookback_days']
+        self._lock = threading.Lock()
+        # (strategy, instrument, bucket) -> [wins, losses]; instrument/bucket
+        # None are the per-instrument and per-strategy rollups
+        self._counts = {}
+        # Signal date -> {key: [wins, losses]}, subtracted from _counts as the
+        # date leaves the window
+        self._days = {}
+        self._window_start = None
+        self.loaded_at = None
+
+    @staticmethod
+    def _keys(strategy, instrument, bucket):
+        # Most specific first; dict.fromkeys drops repeats when instrument/bucket is None
+        return tuple(dict.fromkeys((
+            (strategy, instrument, bucket),
+            (strategy, instrument, None),
+            (strategy, None, None),
+        )))
+
+    def _start(self, today=None):
+        """First signal date inside the window"""
+        return (today or date.today()) - timedelta(days=self.lookback_days)
+
+    def _expire(self):
+        """Subtract the days that have left the window (lock held)"""
+        start = self._start()
+        if start == self._window_start:
+            return
+        for day in [day for day in self._days if day < start]:
+            for key, (wins, losses) in self._days.pop(day).items():
+                counts = self._counts[key]
+                counts[0] -= wins
+                counts[1] -= losses
+                if counts == [0, 0]:
+                    del self._counts[key]
+        self._window_start = start
+
+    def load(self, database):
+        """
+        Rebuild the counts from signals / signal_outcomes in the window
+
+        Args:
+            database: utils.database.Database
+
+        Returns:
+            int: Resolved signals loaded
+        """
+        start = self._start()
+        counts, days = {}, {}
+        total = 0
+        for day, strategy, instrument, score, outcome, count in database.query(LOAD_COUNTS, (start.isoformat(),)):
+            column = 0 if outcome == 'WIN' else 1
+            day_counts = days.setdefault(signal_day(day), {})
+            for key in self._keys(strategy, instrument, alignment_bucket(score)):
+                counts.setdefault(key, [0, 0])[column] += count
+                day_counts.setdefault(key, [0, 0])[column] += count
+            total += count
+
+        with self._lock:
+            self._counts = counts
+            self._days = days
+            self._window_start = start
+            self.loaded_at = datetime.now()
+        return total
+
+    def record(self, strategy, instrument, score, outcome, timestamp):
+        """
+        Count one resolved signal
+
+        Outcomes other than WIN/LOSS, and signals dated before the window,
+        are ignored.
+
+        Args:
+            timestamp: The signal's timestamp (decides which day it counts for)
+        """
+        if outcome not in ('WIN', 'LOSS'):
+            return
+        column = 0 if outcome == 'WIN' else 1
+        day = signal_day(timestamp)
+        with self._lock:
+            self._expire()
+            if day < self._window_start:
+                return
+            day_counts = self._days.setdefault(day, {})
+            for key in self._keys(strategy, instrument, alignment_bucket(score)):
+                self._counts.setdefault(key, [0, 0])[column] += 1
+                day_counts.setdefault(key, [0, 0])[column] += 1
+
+    def win_rate(self, strategy, instrument=None, score=None):
+        """
+        Win rate for the most specific key with enough samples
+
+        Tries (strategy, instrument, alignment bucket), then (strategy,
+        instrument), then the strategy alone.
+
+        Returns:
+            tuple: (win rate 0-1, samples), or None if no key has min_samples
+        """
+        if self._start() != self._window_start:
+            with self._lock:
+                self._expire()
+        for key in self._keys(strategy, instrument, alignment_bucket(score)):
+            counts = self._counts.get(key)
+            if counts is None:
+                continue
+            wins, losses = counts
+            samples = wins + losses
+            if samples >= self.min_samples:
+                return wins / samples, samples
+        return None
+
+    def __len__(self):
+        return len(self._counts)
+
+
+# Process-wide provider, loaded at startup and fed by the outcome tracker
+win_rates = WinRateProvider()
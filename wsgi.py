@@ -1,5 +1,10 @@
 """
 WSGI entry point for production deployment with Gunicorn
+
+Use gunicorn.conf.py, which runs the workers in 'web' mode and starts the
+dedicated scanner process:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
 """
 from app import app
 